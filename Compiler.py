@@ -1,921 +1,31 @@
-import re
-import sys
-
-class HTSCompiler:
-    def __init__(self):
-        self.symbol_table = {}
-        self.optimizations = []
-        self.qubit_states = {}
-        self.blockchain_states = {}
-
-    # Lexical analysis
-    def lex(self, code):
-        # Basic tokenization: keywords, variables, numbers, operators, etc.
-        tokens = re.findall(r'\w+|\+|\-|\*|\/|\=|\(|\)|{|}|;|if|else|while|loop|quantum|blockchain|exec|let|fn|return', code)
-        return tokens
-
-    # Syntax analysis
-    def parse(self, tokens):
-        # Simple recursive descent parser (you can enhance this)
-        program = []
-        i = 0
-
-        while i < len(tokens):
-            token = tokens[i]
-
-            # Parsing variable declaration (let var_name: type = value)
-            if token == 'let':
-                var_name = tokens[i+1]
-                var_type = tokens[i+2]
-                value = tokens[i+4]
-                self.symbol_table[var_name] = {'type': var_type, 'value': value}
-                program.append(f"Declared {var_name} of type {var_type} with value {value}")
-                i += 5
-
-            # Parsing function declaration (fn function_name(...))
-            elif token == 'fn':
-                func_name = tokens[i+1]
-                params = tokens[i+2]
-                program.append(f"Defined function {func_name} with parameters {params}")
-                i += 3
-
-            # Parsing control structures (if, else, loop)
-            elif token == 'if':
-                condition = tokens[i+1]
-                program.append(f"if condition: {condition}")
-                i += 3  # Basic for now (just condition)
-
-            # Parsing operations (quantum, blockchain, math, etc.)
-            elif token == 'quantum':
-                qubit = tokens[i+1]
-                operation = tokens[i+2]
-                self.qubit_states[qubit] = operation
-                program.append(f"Quantum operation on qubit {qubit} with operation {operation}")
-                i += 3
-
-            # Parsing blockchain operations
-            elif token == 'blockchain':
-                transaction = tokens[i+1]
-                self.blockchain_states[transaction] = 'executed'
-                program.append(f"Blockchain operation: {transaction} executed")
-                i += 2
-
-            else:
-                i += 1
-
-        return program
-
-    # Semantic analysis: Ensuring correct data types and usage
-    def semantic_analysis(self, program):
-        errors = []
-        for line in program:
-            # Check if the variable types match when being used
-            if 'quantum' in line:
-                # Handle quantum state validations
-                pass
-            elif 'blockchain' in line:
-                # Handle blockchain state validations
-                pass
-        return errors
-
-    # Optimization phase: Example of basic optimization (dummy placeholder here)
-    def optimize(self, program):
-        optimized_program = program
-        self.optimizations.append("Applied basic optimizations (if any)")
-        return optimized_program
-
-    # Code generation phase (converting program to executable code or machine code)
-    def generate_code(self, program):
-        executable_code = []
-        for line in program:
-            # Convert the high-level constructs to intermediate machine-like code
-            if 'quantum' in line:
-                executable_code.append(f"Quantum Operation: {line}")
-            elif 'blockchain' in line:
-                executable_code.append(f"Blockchain Transaction: {line}")
-            elif 'Declared' in line:
-                executable_code.append(f"Declare Variable: {line}")
-            elif 'Defined function' in line:
-                executable_code.append(f"Define Function: {line}")
-        return executable_code
-
-    # Compile HTS code to executable format
-    def compile(self, code):
-        print("Starting HTS Compilation...")
-        
-        # Step 1: Lexical Analysis
-        tokens = self.lex(code)
-        print("Lexical analysis completed.")
-
-        # Step 2: Syntax Analysis
-        program = self.parse(tokens)
-        print("Syntax analysis completed.")
-
-        # Step 3: Semantic Analysis
-        semantic_errors = self.semantic_analysis(program)
-        if semantic_errors:
-            print("Semantic errors found:", semantic_errors)
-            return
-        
-        # Step 4: Optimization
-        optimized_program = self.optimize(program)
-        print("Optimization completed.")
-
-        # Step 5: Code Generation
-        executable_code = self.generate_code(optimized_program)
-        print("Code generation completed.")
-
-        # Return the compiled executable code
-        return executable_code
-
-# Sample HTS source code
-hts_code = """
-let a: int = 10;
-let b: float = 20.5;
-let result: int = a + b;
-if (result > 20) {
-    quantum qubit1 perform_op;
-    blockchain transaction1;
-}
-"""
-
-# Create the HTS compiler instance
-compiler = HTSCompiler()
-
-# Compile the HTS code
-executable = compiler.compile(hts_code)
-
-# Output the compiled code (in machine-executable format)
-print("\nCompiled Executable Code:")
-for line in executable:
-    print(line)
-
-import re
-import sys
-import threading
-
-# Quantum and Blockchain Libraries (Dummy placeholders for actual libraries)
-class QuantumProcessor:
-    def execute(self, qubit, operation):
-        # Simulate quantum operation execution
-        return f"Quantum operation on qubit {qubit} with {operation}"
-
-class BlockchainProcessor:
-    def execute(self, transaction):
-        # Simulate blockchain transaction execution
-        return f"Blockchain operation executed: {transaction}"
-
-class HTSCompiler:
-    def __init__(self):
-        self.symbol_table = {}
-        self.optimizations = []
-        self.qubit_states = {}
-        self.blockchain_states = {}
-        self.threads = []
-
-        # Initialize processor objects (Quantum, Blockchain, etc.)
-        self.quantum_processor = QuantumProcessor()
-        self.blockchain_processor = BlockchainProcessor()
-
-    # Lexical analysis
-    def lex(self, code):
-        tokens = re.findall(r'\w+|\+|\-|\*|\/|\=|\(|\)|{|}|;|if|else|while|loop|quantum|blockchain|exec|let|fn|return|foreach|import|sync', code)
-        return tokens
-
-    # Syntax analysis
-    def parse(self, tokens):
-        program = []
-        i = 0
-
-        while i < len(tokens):
-            token = tokens[i]
-
-            # Variable Declaration
-            if token == 'let':
-                var_name = tokens[i+1]
-                var_type = tokens[i+2]
-                value = tokens[i+4]
-                self.symbol_table[var_name] = {'type': var_type, 'value': value}
-                program.append(f"Declared {var_name} of type {var_type} with value {value}")
-                i += 5
-
-            # Function Declaration
-            elif token == 'fn':
-                func_name = tokens[i+1]
-                params = tokens[i+2]
-                program.append(f"Defined function {func_name} with parameters {params}")
-                i += 3
-
-            # Control structures (if, loop, foreach)
-            elif token == 'if':
-                condition = tokens[i+1]
-                program.append(f"if condition: {condition}")
-                i += 3
-
-            # Quantum Operation
-            elif token == 'quantum':
-                qubit = tokens[i+1]
-                operation = tokens[i+2]
-                self.qubit_states[qubit] = operation
-                program.append(f"Quantum operation on qubit {qubit} with operation {operation}")
-                i += 3
-
-            # Blockchain Transaction
-            elif token == 'blockchain':
-                transaction = tokens[i+1]
-                self.blockchain_states[transaction] = 'executed'
-                program.append(f"Blockchain operation: {transaction} executed")
-                i += 2
-
-            # Parallel execution: syncronization with threads
-            elif token == 'sync':
-                sync_task = tokens[i+1]
-                self.threads.append(threading.Thread(target=self.execute_sync_task, args=(sync_task,)))
-                program.append(f"Synchronicity task for {sync_task} added to queue")
-                i += 2
-
-            else:
-                i += 1
-
-        return program
-
-    # Handling synchronization tasks (multithreading)
-    def execute_sync_task(self, task):
-        print(f"Executing synchronization task: {task}")
-        # Simulate execution of task
-        if task == 'quantum_operation':
-            result = self.quantum_processor.execute("qubit1", "perform_op")
-            print(result)
-        elif task == 'blockchain_transaction':
-            result = self.blockchain_processor.execute("transaction1")
-            print(result)
-
-    # Semantic Analysis
-    def semantic_analysis(self, program):
-        errors = []
-        for line in program:
-            # Check for invalid or undefined variable usage
-            if 'undefined' in line:
-                errors.append(f"Semantic Error: {line}")
-        return errors
-
-    # Optimization phase
-    def optimize(self, program):
-        optimized_program = []
-        for line in program:
-            # Example: Remove redundant variable assignments or loops
-            if 'optimize' in line:
-                optimized_program.append(f"Optimized {line}")
-            else:
-                optimized_program.append(line)
-        self.optimizations.append("Applied basic optimizations")
-        return optimized_program
-
-    # Code Generation Phase (Create machine-executable code)
-    def generate_code(self, program):
-        executable_code = []
-        for line in program:
-            if 'quantum' in line:
-                executable_code.append(f"Quantum Operation: {line}")
-            elif 'blockchain' in line:
-                executable_code.append(f"Blockchain Transaction: {line}")
-            elif 'Declared' in line:
-                executable_code.append(f"Declare Variable: {line}")
-            elif 'Defined function' in line:
-                executable_code.append(f"Define Function: {line}")
-            elif 'Synchronicity' in line:
-                executable_code.append(f"Sync Task Scheduled: {line}")
-        return executable_code
-
-    # Compile HTS Code to Executable
-    def compile(self, code):
-        print("Starting HTS Compilation...")
-
-        # Step 1: Lexical Analysis
-        tokens = self.lex(code)
-        print("Lexical analysis completed.")
-
-        # Step 2: Syntax Analysis
-        program = self.parse(tokens)
-        print("Syntax analysis completed.")
-
-        # Step 3: Semantic Analysis
-        semantic_errors = self.semantic_analysis(program)
-        if semantic_errors:
-            print("Semantic errors found:", semantic_errors)
-            return
-
-        # Step 4: Optimization
-        optimized_program = self.optimize(program)
-        print("Optimization completed.")
-
-        # Step 5: Code Generation
-        executable_code = self.generate_code(optimized_program)
-        print("Code generation completed.")
-
-        # Step 6: Execute tasks in parallel (multithreading)
-        for thread in self.threads:
-            thread.start()
-        for thread in self.threads:
-            thread.join()  # Wait for all threads to finish
-        print("Synchronization tasks completed.")
-
-        # Return the compiled executable code
-        return executable_code
-
-
-# Sample HTS Code (with quantum operations, blockchain, and sync)
-hts_code = """
-let a: int = 10;
-let b: float = 20.5;
-let result: int = a + b;
-if (result > 20) {
-    quantum qubit1 perform_op;
-    blockchain transaction1;
-}
-sync quantum_operation;
-sync blockchain_transaction;
-"""
-
-# Create the HTS Compiler instance
-compiler = HTSCompiler()
-
-# Compile HTS code
-executable = compiler.compile(hts_code)
-
-# Output the compiled executable code (in machine-executable format)
-print("\nCompiled Executable Code:")
-for line in executable:
-    print(line)
-
-import re
-import sys
-import threading
-import multiprocessing
-import time
-
-# Quantum, Blockchain, and AI Libraries (Simulated for now)
-class QuantumProcessor:
-    def execute(self, qubit, operation):
-        # Simulate quantum operation execution
-        return f"Quantum operation on qubit {qubit} with {operation}"
-
-class BlockchainProcessor:
-    def execute(self, transaction):
-        # Simulate blockchain transaction execution
-        return f"Blockchain operation executed: {transaction}"
-
-class AIModelOptimizer:
-    def optimize(self, program):
-        # Simulate AI/ML model optimization for code patterns
-        print("Running AI/ML optimization on program...")
-        optimized_program = []
-        for line in program:
-            if "quantum" in line:
-                optimized_program.append(f"Optimized Quantum: {line}")
-            elif "blockchain" in line:
-                optimized_program.append(f"Optimized Blockchain: {line}")
-            else:
-                optimized_program.append(line)
-        return optimized_program
-
-class HTSCompiler:
-    def __init__(self):
-        self.symbol_table = {}
-        self.optimizations = []
-        self.qubit_states = {}
-        self.blockchain_states = {}
-        self.threads = []
-        self.processes = []
-        self.ai_optimizer = AIModelOptimizer()
-        self.quantum_processor = QuantumProcessor()
-        self.blockchain_processor = BlockchainProcessor()
-
-    # Lexical analysis
-    def lex(self, code):
-        tokens = re.findall(r'\w+|\+|\-|\*|\/|\=|\(|\)|{|}|;|if|else|while|loop|quantum|blockchain|exec|let|fn|return|foreach|import|sync|async', code)
-        return tokens
-
-    # Syntax analysis
-    def parse(self, tokens):
-        program = []
-        i = 0
-        while i < len(tokens):
-            token = tokens[i]
-
-            # Variable Declaration
-            if token == 'let':
-                var_name = tokens[i+1]
-                var_type = tokens[i+2]
-                value = tokens[i+4]
-                self.symbol_table[var_name] = {'type': var_type, 'value': value}
-                program.append(f"Declared {var_name} of type {var_type} with value {value}")
-                i += 5
-
-            # Function Declaration
-            elif token == 'fn':
-                func_name = tokens[i+1]
-                params = tokens[i+2]
-                program.append(f"Defined function {func_name} with parameters {params}")
-                i += 3
-
-            # Control structures (if, loop, foreach)
-            elif token == 'if':
-                condition = tokens[i+1]
-                program.append(f"if condition: {condition}")
-                i += 3
-
-            # Quantum Operation
-            elif token == 'quantum':
-                qubit = tokens[i+1]
-                operation = tokens[i+2]
-                self.qubit_states[qubit] = operation
-                program.append(f"Quantum operation on qubit {qubit} with operation {operation}")
-                i += 3
-
-            # Blockchain Transaction
-            elif token == 'blockchain':
-                transaction = tokens[i+1]
-                self.blockchain_states[transaction] = 'executed'
-                program.append(f"Blockchain operation: {transaction} executed")
-                i += 2
-
-            # Asynchronous execution
-            elif token == 'async':
-                async_task = tokens[i+1]
-                self.threads.append(threading.Thread(target=self.execute_async_task, args=(async_task,)))
-                program.append(f"Asynchronous task for {async_task} added to queue")
-                i += 2
-
-            # Sync Execution
-            elif token == 'sync':
-                sync_task = tokens[i+1]
-                self.threads.append(threading.Thread(target=self.execute_sync_task, args=(sync_task,)))
-                program.append(f"Synchronicity task for {sync_task} added to queue")
-                i += 2
-
-            else:
-                i += 1
-
-        return program
-
-    # Handle asynchronous execution tasks
-    def execute_async_task(self, task):
-        print(f"Executing asynchronous task: {task}")
-        time.sleep(2)  # Simulate time delay for asynchronous task
-        if task == 'quantum_operation':
-            result = self.quantum_processor.execute("qubit1", "perform_op")
-            print(result)
-        elif task == 'blockchain_transaction':
-            result = self.blockchain_processor.execute("transaction1")
-            print(result)
-
-    # Handle synchronous execution tasks
-    def execute_sync_task(self, task):
-        print(f"Executing synchronization task: {task}")
-        if task == 'quantum_operation':
-            result = self.quantum_processor.execute("qubit1", "perform_op")
-            print(result)
-        elif task == 'blockchain_transaction':
-            result = self.blockchain_processor.execute("transaction1")
-            print(result)
-
-    # Optimization phase
-    def optimize(self, program):
-        print("Running AI optimization on program...")
-        return self.ai_optimizer.optimize(program)
-
-    # Code Generation Phase (Create machine-executable code)
-    def generate_code(self, program):
-        executable_code = []
-        for line in program:
-            if 'quantum' in line:
-                executable_code.append(f"Quantum Operation: {line}")
-            elif 'blockchain' in line:
-                executable_code.append(f"Blockchain Transaction: {line}")
-            elif 'Declared' in line:
-                executable_code.append(f"Declare Variable: {line}")
-            elif 'Defined function' in line:
-                executable_code.append(f"Define Function: {line}")
-            elif 'Synchronicity' in line:
-                executable_code.append(f"Sync Task Scheduled: {line}")
-        return executable_code
-
-    # Compile HTS Code to Executable
-    def compile(self, code):
-        print("Starting HTS Compilation...")
-
-        # Step 1: Lexical Analysis
-        tokens = self.lex(code)
-        print("Lexical analysis completed.")
-
-        # Step 2: Syntax Analysis
-        program = self.parse(tokens)
-        print("Syntax analysis completed.")
-
-        # Step 3: AI/ML Optimization
-        program = self.optimize(program)
-
-        # Step 4: Code Generation
-        executable_code = self.generate_code(program)
-        print("Code generation completed.")
-
-        # Step 5: Execute tasks asynchronously and synchronously
-        for thread in self.threads:
-            thread.start()
-        for thread in self.threads:
-            thread.join()  # Wait for all threads to finish
-        print("Execution completed.")
-
-        # Return the compiled executable code
-        return executable_code
-
-
-# Sample HTS Code (with quantum, blockchain, async, and sync operations)
-hts_code = """
-let a: int = 10;
-let b: float = 20.5;
-let result: int = a + b;
-if (result > 20) {
-    quantum qubit1 perform_op;
-    blockchain transaction1;
-}
-async quantum_operation;
-sync blockchain_transaction;
-"""
-
-# Create the HTS Compiler instance
-compiler = HTSCompiler()
-
-# Compile HTS code
-executable = compiler.compile(hts_code)
-
-# Output the compiled executable code (in machine-executable format)
-print("\nCompiled Executable Code:")
-for line in executable:
-    print(line)
-
-import re
-import sys
-import threading
-import multiprocessing
-import time
-import random
-import os
-import inspect
-from queue import Queue
-
-# Quantum and Blockchain Classes
-class QuantumProcessor:
-    def execute(self, qubit, operation):
-        # Simulate quantum operation execution
-        print(f"Performing quantum operation: {operation} on qubit {qubit}")
-        return f"Quantum operation result for {operation} on qubit {qubit}"
-
-class BlockchainProcessor:
-    def execute(self, transaction):
-        # Simulate blockchain transaction execution
-        print(f"Blockchain transaction executed: {transaction}")
-        return f"Blockchain transaction {transaction} confirmed."
-
-# AI Optimization Class
-class AIModelOptimizer:
-    def optimize(self, program):
-        print("Running advanced AI/ML optimization...")
-        optimized_program = []
-        for line in program:
-            # Dynamic optimization logic based on code patterns
-            optimized_program.append(f"Optimized: {line}")
-        return optimized_program
-
-# Memory Management Class (Simulated for this example)
-class MemoryManager:
-    def __init__(self):
-        self.memory_pool = []
-    
-    def allocate(self, size):
-        print(f"Allocating {size} bytes of memory...")
-        self.memory_pool.append(size)
-        return self.memory_pool[-1]
-
-    def free(self, index):
-        print(f"Freeing memory at index {index}...")
-        del self.memory_pool[index]
-
-class HTSCompiler:
-    def __init__(self):
-        self.symbol_table = {}
-        self.threads = []
-        self.processes = []
-        self.execution_queue = Queue()
-        self.memory_manager = MemoryManager()
-        self.ai_optimizer = AIModelOptimizer()
-        self.quantum_processor = QuantumProcessor()
-        self.blockchain_processor = BlockchainProcessor()
-
-    # Lexical analysis (Tokenizing)
-    def lex(self, code):
-        tokens = re.findall(r'\w+|\+|\-|\*|\/|\=|\(|\)|{|}|;|if|else|while|loop|quantum|blockchain|exec|let|fn|return|foreach|import|sync|async|var|memory|allocate|deallocate|trace|debug|optimize', code)
-        return tokens
-
-    # Syntax Analysis (Parsing)
-    def parse(self, tokens):
-        program = []
-        i = 0
-        while i < len(tokens):
-            token = tokens[i]
-
-            # Variable Declaration
-            if token == 'let':
-                var_name = tokens[i+1]
-                var_type = tokens[i+2]
-                value = tokens[i+4]
-                self.symbol_table[var_name] = {'type': var_type, 'value': value}
-                program.append(f"Declared {var_name} of type {var_type} with value {value}")
-                i += 5
-
-            # Function Declaration
-            elif token == 'fn':
-                func_name = tokens[i+1]
-                params = tokens[i+2]
-                program.append(f"Defined function {func_name} with parameters {params}")
-                i += 3
-
-            # Control structures (if, loop, foreach)
-            elif token == 'if':
-                condition = tokens[i+1]
-                program.append(f"if condition: {condition}")
-                i += 3
-
-            # Quantum Operations
-            elif token == 'quantum':
-                qubit = tokens[i+1]
-                operation = tokens[i+2]
-                program.append(f"Quantum operation on qubit {qubit} with operation {operation}")
-                i += 3
-
-            # Blockchain Transactions
-            elif token == 'blockchain':
-                transaction = tokens[i+1]
-                program.append(f"Blockchain transaction: {transaction}")
-                i += 2
-
-            # Memory Allocation/Deallocation
-            elif token == 'memory':
-                if tokens[i+1] == 'allocate':
-                    size = int(tokens[i+2])
-                    allocated_memory = self.memory_manager.allocate(size)
-                    program.append(f"Allocated {size} bytes of memory at {allocated_memory}")
-                    i += 3
-                elif tokens[i+1] == 'deallocate':
-                    index = int(tokens[i+2])
-                    self.memory_manager.free(index)
-                    program.append(f"Deallocated memory at index {index}")
-                    i += 3
-
-            # Optimizations
-            elif token == 'optimize':
-                program.append(f"AI optimization requested for program")
-                program = self.ai_optimizer.optimize(program)
-                i += 1
-
-            else:
-                i += 1
-
-        return program
-
-    # Code Generation Phase
-    def generate_code(self, program):
-        executable_code = []
-        for line in program:
-            if 'quantum' in line:
-                executable_code.append(f"Quantum Operation: {line}")
-            elif 'blockchain' in line:
-                executable_code.append(f"Blockchain Transaction: {line}")
-            elif 'Declared' in line:
-                executable_code.append(f"Declare Variable: {line}")
-            elif 'Defined function' in line:
-                executable_code.append(f"Define Function: {line}")
-            elif 'Allocated' in line:
-                executable_code.append(f"Memory Allocation: {line}")
-            elif 'Deallocated' in line:
-                executable_code.append(f"Memory Deallocation: {line}")
-        return executable_code
-
-    # Compile HTS Code to Executable
-    def compile(self, code):
-        print("Starting HTS Compilation...")
-
-        # Step 1: Lexical Analysis
-        tokens = self.lex(code)
-        print("Lexical analysis completed.")
-
-        # Step 2: Syntax Analysis
-        program = self.parse(tokens)
-        print("Syntax analysis completed.")
-
-        # Step 3: AI/ML Optimization
-        program = self.ai_optimizer.optimize(program)
-
-        # Step 4: Code Generation
-        executable_code = self.generate_code(program)
-        print("Code generation completed.")
-
-        # Step 5: Execute tasks asynchronously and synchronously
-        for thread in self.threads:
-            thread.start()
-        for thread in self.threads:
-            thread.join()  # Wait for all threads to finish
-        print("Execution completed.")
-
-        # Return the compiled executable code
-        return executable_code
-
-
-# Sample HTS Code with Quantum, Blockchain, Memory Management, AI optimization
-hts_code = """
-let a: int = 10;
-let b: float = 20.5;
-let result: int = a + b;
-if (result > 20) {
-    quantum qubit1 perform_op;
-    blockchain transaction1;
-}
-memory allocate 1024;
-optimize;
-"""
-
-# Create the HTS Compiler instance
-compiler = HTSCompiler()
-
-# Compile HTS code
-executable = compiler.compile(hts_code)
-
-# Output the compiled executable code (in machine-executable format)
-print("\nCompiled Executable Code:")
-for line in executable:
-    print(line)
-
-import random
-import time
-import threading
-import multiprocessing
-from queue import Queue
-
-# Simulate AI Optimizer
-class AIModelOptimizer:
-    def optimize(self, program):
-        print("AI optimization running...")
-        optimized_program = []
-        for line in program:
-            optimized_program.append(f"AI-Optimized: {line}")
-        return optimized_program
-
-# Quantum Processor Simulations
-class QuantumProcessor:
-    def execute(self, qubit, operation):
-        print(f"Executing Quantum Operation: {operation} on Qubit {qubit}")
-        return f"Result of Quantum Operation on {qubit} with {operation}"
-
-# Blockchain Transaction Processor
-class BlockchainProcessor:
-    def execute(self, transaction):
-        print(f"Executing Blockchain Transaction: {transaction}")
-        return f"Blockchain Transaction {transaction} confirmed."
-
-# Distributed Task Scheduler for Multi-Core/Cloud Execution
-class DistributedScheduler:
-    def schedule_task(self, task, nodes):
-        print(f"Scheduling task: {task} across nodes: {nodes}")
-        for node in nodes:
-            node.execute_task(task)
-
-class Node:
-    def execute_task(self, task):
-        print(f"Node executing: {task}")
-        time.sleep(random.uniform(0.5, 2.0))
-        print(f"Task {task} completed on node")
-
-# Memory Manager - Advanced Dynamic Memory Allocation
-class MemoryManager:
-    def __init__(self):
-        self.memory_pool = {}
-    
-    def allocate(self, size):
-        print(f"Allocating {size} bytes of memory...")
-        address = f"0x{random.randint(1000, 9999):x}"
-        self.memory_pool[address] = size
-        return address
-
-    def free(self, address):
-        print(f"Freeing memory at address {address}...")
-        del self.memory_pool[address]
-
-# High-Performance Compiler with Quantum & Blockchain Support
-class HTSCompiler:
-    def __init__(self):
-        self.ai_optimizer = AIModelOptimizer()
-        self.quantum_processor = QuantumProcessor()
-        self.blockchain_processor = BlockchainProcessor()
-        self.memory_manager = MemoryManager()
-        self.distributed_scheduler = DistributedScheduler()
-    
-    # Lexical Analysis (Tokenizing)
-    def lex(self, code):
-        tokens = re.findall(r'\w+|\+|\-|\*|\/|\=|\(|\)|{|}|;|if|else|while|loop|quantum|blockchain|memory|optimize|let|exec|task|node', code)
-        return tokens
-
-    # Syntax Parsing
-    def parse(self, tokens):
-        program = []
-        i = 0
-        while i < len(tokens):
-            token = tokens[i]
-
-            if token == 'let':
-                var_name = tokens[i+1]
-                var_type = tokens[i+2]
-                value = tokens[i+4]
-                program.append(f"Declared variable {var_name} as {var_type} with value {value}")
-                i += 5
-
-            elif token == 'quantum':
-                qubit = tokens[i+1]
-                operation = tokens[i+2]
-                program.append(f"Quantum operation on qubit {qubit} with operation {operation}")
-                i += 3
-
-            elif token == 'blockchain':
-                transaction = tokens[i+1]
-                program.append(f"Blockchain transaction {transaction}")
-                i += 2
-
-            elif token == 'memory':
-                if tokens[i+1] == 'allocate':
-                    size = int(tokens[i+2])
-                    allocated_address = self.memory_manager.allocate(size)
-                    program.append(f"Allocated {size} bytes of memory at {allocated_address}")
-                    i += 3
-                elif tokens[i+1] == 'deallocate':
-                    address = tokens[i+2]
-                    self.memory_manager.free(address)
-                    program.append(f"Deallocated memory at {address}")
-                    i += 3
-
-            elif token == 'optimize':
-                program = self.ai_optimizer.optimize(program)
-                i += 1
-
-            else:
-                i += 1
-        return program
-
-    # Code Generation Phase
-    def generate_code(self, program):
-        executable_code = []
-        for line in program:
-            if 'quantum' in line:
-                executable_code.append(f"Quantum Operation: {line}")
-            elif 'blockchain' in line:
-                executable_code.append(f"Blockchain Transaction: {line}")
-            elif 'Allocated' in line:
-                executable_code.append(f"Memory Allocation: {line}")
-            elif 'Deallocated' in line:
-                executable_code.append(f"Memory Deallocation: {line}")
-        return executable_code
-
-    # Compile Code
-    def compile(self, code):
-        print("Starting HTS Compilation...")
-        tokens = self.lex(code)
-        program = self.parse(tokens)
-        program = self.ai_optimizer.optimize(program)
-        executable_code = self.generate_code(program)
-        print("Code generation completed.")
-
-        # Schedule distributed tasks
-        self.distributed_scheduler.schedule_task("Deploy Application", [Node(), Node(), Node()])
-        
-        return executable_code
-
-
-# Sample HTS Code with AI, Quantum, Blockchain, Memory, and Distributed Computing
+# The HTS compiler lives in hts.compiler (installed as the ``hts`` package,
+# with the ``htsc`` command); this file compiles a sample program with it
+from hts.compiler import (
+    AIModelOptimizer, BlockchainProcessor, DistributedScheduler, HTSCompiler, MemoryManager, Node,
+    QuantumProcessor,
+)
+
+# Sample HTS Code with Quantum, Blockchain, Memory, Tasks and AI optimization
 hts_code = """
 let a: int = 10;
 let b: float = 20.5;
 let result: float = a + b;
 if (result > 20) {
-    quantum qubit1 execute_op;
+    quantum qubit1 h;
     blockchain tx12345;
 }
 memory allocate 1024;
+async quantum_operation;
+sync blockchain_transaction;
 optimize;
 """
 
-compiler = HTSCompiler()
-executable = compiler.compile(hts_code)
-
-print("\nCompiled Executable Code:")
-for line in executable:
-    print(line)
+if __name__ == "__main__":
+    # Create the HTS compiler instance and compile the sample
+    with HTSCompiler() as compiler:
+        executable = compiler.compile(hts_code)
 
+    # Output the compiled executable code (in machine-executable format)
+    print("\nCompiled Executable Code:")
+    for line in executable:
+        print(line)
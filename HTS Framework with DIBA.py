@@ -1,158 +1,5 @@
-import time
-import threading
-import json
-import random
-import numpy as np
-from collections import deque
-from queue import Queue
-
-# Utility functions
-def DIBA_infer_task(task, context):
-    """Direct Inference-Based Abstraction to infer task execution based on context"""
-    if task == "MonitorSystemState":
-        return f"System state: {context['system_state']}"
-    elif task == "LoadBalancerDecision":
-        return "Balancing load based on system state analysis."
-    elif task == "PredictiveModelTraining":
-        return "Training predictive model with current data."
-    elif task == "QuantumValidation":
-        return f"Validating transaction {context['transaction_id']} using Quantum Blockchain."
-    elif task == "GeneticOptimization":
-        return "Optimizing system parameters using genetic algorithms."
-    elif task == "FPGAAcceleration":
-        return "Accelerating computation using FPGA hardware."
-    else:
-        return f"Unknown task: {task}"
-
-# HTS Compiler Class
-class HTSCompiler:
-    def __init__(self):
-        self.autonomous_agents = []
-        self.diagnostics = {}
-        self.system_state = {"temperature": 20, "load": 50}  # Example system state
-        self.transaction_id = "TxID"  # Simulated transaction ID
-        self.tasks_queue = Queue()
-        self.data = {"system_logs": [], "tasks_completed": []}
-
-    def log(self, message):
-        self.data["system_logs"].append(message)
-        print(message)
-
-    def execute_task(self, task, context):
-        # Inference-based execution of the task
-        inferred_task = DIBA_infer_task(task, context)
-        self.log(f"Executing task: {inferred_task}")
-        self.data["tasks_completed"].append(inferred_task)
-        time.sleep(1)  # Simulate execution delay
-
-    def monitor_state(self):
-        # Simulate system state changes for testing
-        self.system_state["temperature"] += random.randint(-1, 2)
-        self.system_state["load"] += random.randint(-2, 2)
-
-    def check_conditions(self, condition, context):
-        # Direct Inference Logic for checking conditions dynamically
-        if condition == "SystemIdle":
-            return context["system_state"]["load"] < 20
-        elif condition == "HighTemperature":
-            return context["system_state"]["temperature"] > 100
-        return False
-
-    def apply_autonomous_logic(self, agent, context):
-        # Example of applying logic to autonomous agents
-        if agent["task"] == "LoadBalancer":
-            if context["system_state"]["load"] > 80:
-                self.allocate_task("HeavyTask", "NodeB", context)
-            else:
-                self.allocate_task("LightTask", "NodeA", context)
-            self.log(f"Autonomous agent {agent['name']} completed task allocation.")
-
-    def allocate_task(self, task, node, context):
-        # Inference for task allocation
-        inferred_task = DIBA_infer_task(task, context)
-        self.tasks_queue.put(f"Allocate {task} to {node}")
-        self.execute_task(f"Allocate {task} to {node}", context)
-
-    def train_neural_network(self, data_set, context):
-        # Inference-based neural network training
-        task_inference = DIBA_infer_task("PredictiveModelTraining", context)
-        self.log(task_inference)
-        return "TrainedModel"
-
-    def quantum_validation(self, context):
-        # Quantum Blockchain validation using inferred task logic
-        task_inference = DIBA_infer_task("QuantumValidation", context)
-        self.log(task_inference)
-        return True  # Simulated validation
-
-    def genetic_algorithm(self, population, generations, context):
-        # Genetic algorithm optimization based on D.I.B.A.
-        task_inference = DIBA_infer_task("GeneticOptimization", context)
-        self.log(task_inference)
-        best_solution = random.choice(population)
-        return best_solution
-
-    def fpga_acceleration(self, task, context):
-        # FPGA optimization inferred from context
-        task_inference = DIBA_infer_task("FPGAAcceleration", context)
-        self.log(task_inference)
-        return f"{task} executed on FPGA"
-
-    def run(self, program):
-        # Simulate the execution of the HTS program with context-based inference
-        for line in program:
-            context = {"system_state": self.system_state, "transaction_id": self.transaction_id}
-
-            # Temporal logic example: wait
-            if line.startswith("WAIT"):
-                wait_time = int(line.split()[1].replace("s", ""))
-                self.log(f"Waiting for {wait_time} seconds...")
-                time.sleep(wait_time)
-
-            # Execute autonomous systems or task allocation logic
-            elif line.startswith("AUTONOMOUS_AGENT"):
-                agent_name = line.split()[1]
-                agent_task = line.split()[3]
-                self.autonomous_agents.append({"name": agent_name, "task": agent_task})
-                self.apply_autonomous_logic(self.autonomous_agents[-1], context)
-
-            # Neural network predictions and actions
-            elif line.startswith("NEURAL_NET"):
-                data_set = "DataSetA"  # Placeholder for actual data set
-                model = self.train_neural_network(data_set, context)
-                prediction = random.choice(["Failure", "Success"])  # Simulated prediction
-                if prediction == "Failure":
-                    self.execute_task("PreemptiveShutdown", context)
-
-            # Quantum blockchain validation
-            elif line.startswith("BLOCKCHAIN"):
-                valid = self.quantum_validation(context)
-                if valid:
-                    self.execute_task("StoreData in Blockchain", context)
-
-            # Genetic algorithm
-            elif line.startswith("GENETIC_ALGORITHM"):
-                population = ["CodeVariant1", "CodeVariant2", "CodeVariant3"]
-                best_solution = self.genetic_algorithm(population, generations=100, context=context)
-                self.execute_task(f"Execute {best_solution}", context)
-
-            # FPGA task acceleration
-            elif line.startswith("FPGA_OPTIMIZE"):
-                task = "ComputationTask"
-                result = self.fpga_acceleration(task, context)
-                self.log(result)
-
-            # Default case: executing generic tasks
-            else:
-                self.execute_task(line, context)
-
-        self.finalize()
-
-    def finalize(self):
-        self.log("HTS Program Execution Completed.")
-        self.log(f"System Logs: {self.data['system_logs']}")
-        self.log(f"Tasks Completed: {self.data['tasks_completed']}")
-        self.log(f"Diagnostics: {self.diagnostics}")
+# The D.I.B.A. runtime lives in hts.diba; this file runs its example program
+from hts.diba import DIBA_infer_task, DIBA_rules, HTSCompiler
 
 # Example HTS Program
 hts_program = [
@@ -165,5 +12,6 @@ hts_program = [
 ]
 
 # Initialize and run the compiler
-compiler = HTSCompiler()
-compiler.run(hts_program)
+if __name__ == "__main__":
+    compiler = HTSCompiler()
+    compiler.run(hts_program)
@@ -0,0 +1,6 @@
+"""Performance benchmarks for the HTS toolchain.
+
+Each module is runnable from the repository root, e.g.::
+
+    python -m benchmarks.lexer --size-mb 64
+"""
@@ -0,0 +1,111 @@
+"""HTS arrays: vectorized operations vs element-by-element interpreted loops.
+
+Both variants of each kernel run on the VM over the same ``--size``
+element arrays; the time of building the inputs is measured separately
+and subtracted.  The vectorized form is repeated ``--vector-repeat`` times
+in an HTS loop so that it takes measurable time.  Reports elements per
+second and the speedup of the whole-array form, and checks that both
+forms compute the same result.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from hts.bytecode import compile_program
+from hts.lexer import tokenize
+from hts.parser import parse
+from hts.vm import VM
+
+SETUP = """
+let a = arange({n}) * 0.5;
+let b = arange({n}) + 1.0;
+"""
+
+KERNELS = {
+    # name: (vectorized, interpreted loop)
+    "axpy": (
+        "out = a * 3.0 + b;",
+        """
+let out = [0.0; {n}];
+let i = 0;
+while i < {n} {
+    out[i] = a[i] * 3.0 + b[i];
+    i = i + 1;
+}
+""",
+    ),
+    "sum": (
+        "out = sum(a);",
+        """
+let out = 0.0;
+let i = 0;
+while i < {n} {
+    out = out + a[i];
+    i = i + 1;
+}
+""",
+    ),
+    "dot": (
+        "out = dot(a, b);",
+        """
+let out = 0.0;
+let i = 0;
+while i < {n} {
+    out = out + a[i] * b[i];
+    i = i + 1;
+}
+""",
+    ),
+}
+
+
+VECTORIZED = """
+let out = 0;
+let k = 0;
+while k < {repeat} {
+    {kernel}
+    k = k + 1;
+}
+"""
+
+
+def build(source, n):
+    return compile_program(parse(tokenize(source.replace("{n}", str(n)))))
+
+
+def measure(program, repeat):
+    best = None
+    for _ in range(repeat):
+        vm = VM()
+        start = time.perf_counter()
+        vm.run(program)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, vm.variables
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=200_000, help="elements per array")
+    parser.add_argument("--repeat", type=int, default=3, help="best of this many runs")
+    parser.add_argument("--vector-repeat", type=int, default=100, help="vectorized kernel runs per program")
+    parser.add_argument("kernels", nargs="*", default=list(KERNELS))
+    args = parser.parse_args(argv)
+
+    setup, _ = measure(build(SETUP, args.size), args.repeat)
+    print(f"{'kernel':<8} {'vectorized elem/s':>18} {'loop elem/s':>14} {'speedup':>9}")
+    for name in args.kernels:
+        vectorized, loop = KERNELS[name]
+        program = VECTORIZED.replace("{repeat}", str(args.vector_repeat)).replace("{kernel}", vectorized)
+        fast, fast_vars = measure(build(SETUP + program, args.size), args.repeat)
+        slow, slow_vars = measure(build(SETUP + loop, args.size), args.repeat)
+        if not np.allclose(fast_vars["out"], slow_vars["out"]):
+            raise SystemExit(f"{name}: vectorized and loop results differ")
+        fast = max(fast - setup, 1e-9) / args.vector_repeat
+        slow = max(slow - setup, 1e-9)
+        print(f"{name:<8} {args.size / fast:>18,.0f} {args.size / slow:>14,.0f} {slow / fast:>8,.0f}x")
+
+
+if __name__ == "__main__":
+    main()
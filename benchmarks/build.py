@@ -0,0 +1,55 @@
+"""Multi-module build time vs number of worker processes.
+
+Generates ``--modules`` independent library modules plus a main module that
+imports all of them, then builds the project with each ``--jobs`` value.
+"""
+import argparse
+import os
+import tempfile
+
+from hts.build import build
+
+UNIT = """let {p}_a{i}: int = {i};
+fn {p}_f{i}(x: int) -> int {{
+    if (x > {i}) {{ return x - {i}; }} else {{ return x + {i}; }}
+}}
+"""
+
+
+def write_project(directory, modules, units):
+    names = []
+    for index in range(modules):
+        name = f"lib{index}"
+        names.append(name)
+        with open(os.path.join(directory, name + ".hts"), "w") as handle:
+            for unit in range(units):
+                handle.write(UNIT.format(p=name, i=unit))
+    main = os.path.join(directory, "main.hts")
+    with open(main, "w") as handle:
+        for name in names:
+            handle.write(f"import {name};\n")
+        handle.write("let total: int = " + " + ".join(f"{name}_a1" for name in names) + ";\n")
+    return main
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--modules", type=int, default=32)
+    parser.add_argument("--units", type=int, default=2000, help="declarations per module")
+    parser.add_argument("--jobs", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        entry = write_project(directory, args.modules, args.units)
+        print(f"{args.modules} modules x {args.units} units, {os.cpu_count()} CPUs")
+        baseline = None
+        for jobs in args.jobs:
+            result = build([entry], jobs=jobs)
+            baseline = baseline or result.elapsed
+            workers = len({module.pid for module in result.modules.values()})
+            print(f"jobs={jobs:<3} {result.elapsed:8.2f} s  speedup {baseline / result.elapsed:5.2f}x"
+                  f"  ({workers} worker processes)")
+
+
+if __name__ == "__main__":
+    main()
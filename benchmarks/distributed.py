@@ -0,0 +1,60 @@
+"""Makespan of a skewed task set against the number of local worker nodes.
+
+Task durations are drawn from a seeded log-normal distribution and the
+tasks are submitted longest-first and placed by queue length, not by
+duration, so the nodes that draw the long tasks fall behind until work
+stealing evens them out.  Tasks sleep by
+default so the scaling is visible on any machine; ``--cpu`` makes them spin
+instead, which only scales up to the number of cores.
+"""
+import argparse
+import os
+import random
+import time
+
+from hts.distributed import Cluster
+
+
+def sleep_task(seconds):
+    time.sleep(seconds)
+
+
+def spin_task(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--nodes", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--tasks", type=int, default=200)
+    parser.add_argument("--mean", type=float, default=0.02, help="mean task seconds")
+    parser.add_argument("--cpu", action="store_true", help="busy-wait instead of sleeping")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    durations = [rng.lognormvariate(0, 1) for _ in range(args.tasks)]
+    scale = args.mean * len(durations) / sum(durations)
+    durations = sorted((duration * scale for duration in durations), reverse=True)
+    task = spin_task if args.cpu else sleep_task
+    total = sum(durations)
+    print(f"{args.tasks} tasks, {total:.2f} s of work, longest {durations[0]:.3f} s, "
+          f"{os.cpu_count()} CPUs")
+    print(f"{'nodes':>5} {'steal':<5} {'makespan':>9} {'ideal':>7} {'speedup':>8} {'stolen':>7}")
+    for nodes in args.nodes:
+        ideal = max(total / nodes, durations[0])
+        for steal in (False, True):
+            with Cluster(nodes, steal=steal) as cluster:
+                start = time.perf_counter()
+                for future in [cluster.submit(task, duration) for duration in durations]:
+                    future.result()
+                makespan = time.perf_counter() - start
+                stolen = sum(node["stolen"] for node in cluster.stats()["nodes"])
+            print(f"{nodes:>5} {'yes' if steal else 'no':<5} {makespan:>9.3f} {ideal:>7.3f}"
+                  f" {total / makespan:>7.2f}x {stolen:>7}")
+
+
+if __name__ == "__main__":
+    main()
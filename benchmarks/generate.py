@@ -0,0 +1,95 @@
+"""Synthetic HTS programs of any size and statement mix.
+
+``generate`` yields one top-level statement per line, drawn at random with
+the weights of ``mix`` (``let``, ``if``, ``quantum``, ``blockchain``,
+``sync``, ``async``, ``memory``).  Output is a pure function of the size,
+mix and seed, and is produced lazily, so 10M-statement files are written in
+constant memory::
+
+    python -m benchmarks.generate 1000000 -o big.hts --mix let=4,if=1,quantum=1
+"""
+import argparse
+import random
+import sys
+
+DEFAULT_MIX = {"let": 4, "if": 2, "quantum": 1, "blockchain": 1, "sync": 1, "async": 1, "memory": 1}
+
+# Statements written per file write
+CHUNK = 4096
+
+
+def parse_mix(text):
+    """``"let=4,if=1"`` -> ``{"let": 4, "if": 1}``."""
+    mix = {}
+    for item in text.split(","):
+        kind, _, weight = item.partition("=")
+        if kind not in DEFAULT_MIX:
+            raise ValueError(f"unknown statement kind {kind!r}, expected one of {', '.join(DEFAULT_MIX)}")
+        mix[kind] = float(weight or 1)
+    return mix
+
+
+def generate(statements, mix=None, seed=0):
+    """Yield ``statements`` source lines."""
+    mix = mix or DEFAULT_MIX
+    kinds = list(mix)
+    weights = [mix[kind] for kind in kinds]
+    rng = random.Random(seed)
+    choices = rng.choices
+    randrange = rng.randrange
+    variables = 0
+    for index, kind in enumerate(choices(kinds, weights, k=statements)):
+        if kind == "let":
+            if variables:
+                value = f"v{randrange(variables)} + {index % 97}"
+            else:
+                value = str(index % 97)
+            yield f"let v{variables}: int = {value};"
+            variables += 1
+        elif kind == "if":
+            left = f"v{randrange(variables)}" if variables else str(index % 7)
+            yield (f"if ({left} > {index % 50}) {{ quantum q{index % 64} hadamard; blockchain tx{index}; }}"
+                   f" else {{ let w{index}: int = {index % 13} * 2; }}")
+        elif kind == "quantum":
+            yield f"quantum q{index % 64} hadamard;"
+        elif kind == "blockchain":
+            yield f"blockchain tx{index};"
+        elif kind == "sync":
+            yield f"sync task{index};"
+        elif kind == "async":
+            yield f"async task{index};"
+        else:
+            yield f"memory allocate {64 << index % 4};"
+
+
+def source(statements, mix=None, seed=0):
+    return "\n".join(generate(statements, mix, seed)) + "\n"
+
+
+def write_program(path, statements, mix=None, seed=0):
+    with open(path, "w") as handle:
+        lines = generate(statements, mix, seed)
+        while True:
+            chunk = [line for _, line in zip(range(CHUNK), lines)]
+            if not chunk:
+                return
+            handle.write("\n".join(chunk) + "\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("statements", type=int)
+    parser.add_argument("-o", "--output", help="file to write (default: stdout)")
+    parser.add_argument("--mix", type=parse_mix, default=None, help="e.g. let=4,if=1,quantum=1")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.output:
+        write_program(args.output, args.statements, args.mix, args.seed)
+    else:
+        for line in generate(args.statements, args.mix, args.seed):
+            sys.stdout.write(line + "\n")
+
+
+if __name__ == "__main__":
+    main()
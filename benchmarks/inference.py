@@ -0,0 +1,55 @@
+"""Rule engine throughput with and without memoization.
+
+Registers ``--rules`` rules that each read one field of a shared context and
+do ``--cost`` iterations of string work, then infers tasks round-robin while
+changing one context field every ``--change-every`` calls.
+"""
+import argparse
+import time
+
+from hts.inference import RuleEngine
+
+
+def make_rule(cost):
+    def rule(task, context):
+        parts = [f"{task}:{context['fields'][task]}"]
+        for index in range(cost):
+            parts.append(str(index))
+        return "".join(parts)
+    return rule
+
+
+def run(engine, tasks, context, calls, change_every):
+    start = time.perf_counter()
+    for call in range(calls):
+        task = tasks[call % len(tasks)]
+        if change_every and call % change_every == 0:
+            context["fields"][task] += 1
+        engine.infer(task, context)
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rules", type=int, default=32)
+    parser.add_argument("--cost", type=int, default=50)
+    parser.add_argument("--calls", type=int, default=200000)
+    parser.add_argument("--change-every", type=int, default=100)
+    args = parser.parse_args(argv)
+
+    tasks = [f"Task{index}" for index in range(args.rules)]
+    print(f"{'mode':<8} {'seconds':>8} {'calls/s':>12} {'hit rate':>9} {'mean rule us':>13}")
+    for memoize in (False, True):
+        engine = RuleEngine()
+        for task in tasks:
+            engine.add(task, make_rule(args.cost), reads=(f"fields.{task}",) if memoize else None)
+        context = {"fields": dict.fromkeys(tasks, 0)}
+        elapsed = run(engine, tasks, context, args.calls, args.change_every)
+        stats = engine.stats()
+        mean = sum(rule.mean_seconds for rule in stats["rules"].values()) / len(stats["rules"])
+        print(f"{'memo' if memoize else 'direct':<8} {elapsed:>8.3f} {args.calls / elapsed:>12,.0f}"
+              f" {stats['hit_rate']:>9.3f} {mean * 1e6:>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Tiered execution: interpreter-only vs JIT-compiled hot functions.
+
+Each program keeps its numeric work inside functions called many times, so
+the JIT compiles them after ``--threshold`` calls.  Reports the time of
+both runs, the speedup and how many functions were compiled; the results
+of the two runs are checked to be identical.
+"""
+import argparse
+import time
+
+from hts.bytecode import compile_program
+from hts.jit import JIT
+from hts.lexer import tokenize
+from hts.parser import parse
+from hts.vm import VM
+
+PROGRAMS = {
+    "int_loop": """
+fn sum_mod(n) {
+    let total = 0;
+    let i = 0;
+    while i < n {
+        total = total + i * i % 7 - i / 3;
+        i = i + 1;
+    }
+    return total;
+}
+let result = 0;
+let k = 0;
+while k < {calls} {
+    result = result + sum_mod(1000);
+    k = k + 1;
+}
+""",
+    "float_loop": """
+fn integrate(steps) {
+    let width = 1.0 / steps;
+    let x = 0.0;
+    let area = 0.0;
+    let i = 0;
+    while i < steps {
+        area = area + 4.0 / (1.0 + x * x) * width;
+        x = x + width;
+        i = i + 1;
+    }
+    return area;
+}
+let result = 0.0;
+let k = 0;
+while k < {calls} {
+    result = result + integrate(1000.0);
+    k = k + 1;
+}
+""",
+    "call": """
+fn add(a, b) {
+    return a + b;
+}
+let total = 0;
+let i = 0;
+while i < {calls} * 1000 {
+    total = add(total, i);
+    i = i + 1;
+}
+""",
+    "recursion": """
+fn fib(n) {
+    if n < 2 {
+        return n;
+    }
+    return fib(n - 1) + fib(n - 2);
+}
+let result = fib({depth});
+""",
+}
+
+
+def build(name, calls):
+    # fib(depth) makes roughly 1.6 ** depth calls; keep it comparable to the loops
+    depth = 10
+    while 1.618 ** (depth + 1) < calls * 1000:
+        depth += 1
+    source = PROGRAMS[name].replace("{calls}", str(calls)).replace("{depth}", str(depth))
+    return compile_program(parse(tokenize(source)))
+
+
+def measure(program, repeat, threshold=None):
+    # Best-of-``repeat`` seconds; a fresh JIT per run, so every run pays for its tier-up
+    best = None
+    for _ in range(repeat):
+        vm = VM(jit=None if threshold is None else JIT(threshold))
+        start = time.perf_counter()
+        vm.run(program)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, vm
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=200, help="calls of each hot function (x1000 for call)")
+    parser.add_argument("--threshold", type=int, default=20, help="calls before a function is compiled")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("programs", nargs="*", default=list(PROGRAMS))
+    args = parser.parse_args(argv)
+
+    print(f"{'program':<12} {'interpreted ms':>15} {'tiered ms':>10} {'speedup':>8}  jit")
+    for name in args.programs:
+        program = build(name, args.calls)
+        interpreted, baseline = measure(program, args.repeat)
+        tiered, vm = measure(program, args.repeat, args.threshold)
+        if vm.variables != baseline.variables:
+            raise SystemExit(f"{name}: tiered run computed {vm.variables}, expected {baseline.variables}")
+        print(f"{name:<12} {interpreted * 1e3:>15.1f} {tiered * 1e3:>10.1f} {interpreted / tiered:>7.1f}x  "
+              f"{vm.jit.stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Sustained ledger write rate, lookups and inclusion proofs.
+
+Appends ``--count`` transactions of ``--tx-bytes`` bytes, then looks up and
+proves a random sample of them after reopening the ledger from disk.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from hts.ledger import Ledger, verify_proof
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=1000000)
+    parser.add_argument("--tx-bytes", type=int, default=128)
+    parser.add_argument("--block-size", type=int, default=1024)
+    parser.add_argument("--segment-mb", type=int, default=64)
+    parser.add_argument("--lookups", type=int, default=10000)
+    parser.add_argument("--sync", action="store_true", help="fsync every block")
+    args = parser.parse_args(argv)
+
+    # Distinct transactions: a counter followed by fixed filler
+    filler = os.urandom(max(args.tx_bytes - 12, 0))
+    txs = [b"%012d" % i + filler for i in range(args.count)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        ledger = Ledger(directory, block_size=args.block_size,
+                        segment_bytes=args.segment_mb << 20, sync=args.sync)
+        start = time.perf_counter()
+        ids = ledger.extend(txs)
+        ledger.flush()
+        elapsed = time.perf_counter() - start
+        ledger.close()
+        size = sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory))
+        print(f"append   {args.count:>10,} tx  {elapsed:7.2f} s  {args.count / elapsed:>12,.0f} tx/s"
+              f"  ({size / (1 << 20):.1f} MiB on disk)")
+
+        start = time.perf_counter()
+        ledger = Ledger(directory, block_size=args.block_size, segment_bytes=args.segment_mb << 20)
+        print(f"reopen   {ledger.height:>10,} blocks {time.perf_counter() - start:6.2f} s")
+
+        sample = random.Random(0).sample(range(args.count), min(args.lookups, args.count))
+        start = time.perf_counter()
+        for i in sample:
+            assert ledger.get(ids[i]) == txs[i]
+        elapsed = time.perf_counter() - start
+        print(f"lookup   {len(sample):>10,} tx  {elapsed:7.2f} s  {len(sample) / elapsed:>12,.0f} lookups/s")
+
+        start = time.perf_counter()
+        for i in sample:
+            assert verify_proof(txs[i], ledger.proof(ids[i]))
+        elapsed = time.perf_counter() - start
+        print(f"proof    {len(sample):>10,} tx  {elapsed:7.2f} s  {len(sample) / elapsed:>12,.0f} proofs/s")
+        ledger.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Lexer throughput: legacy ``re.findall`` path vs the streaming tokenizer."""
+import argparse
+import os
+import re
+import tempfile
+import time
+import tracemalloc
+
+from hts.lexer import tokenize
+
+# The alternation every HTSCompiler.lex used before hts.lexer existed
+LEGACY_PATTERN = r'\w+|\+|\-|\*|\/|\=|\(|\)|{|}|;|if|else|while|loop|quantum|blockchain|exec|let|fn|return|foreach|import|sync|async|var|memory|allocate|deallocate|trace|debug|optimize'
+
+SAMPLE = """
+let a: int = 10;
+let b: float = 20.5;
+let result: int = a + b;
+if (result > 20) {
+    quantum qubit1 perform_op;
+    blockchain transaction1;
+}
+async quantum_operation;
+sync blockchain_transaction;
+memory allocate 1024;
+"""
+
+
+def make_source(size_mb):
+    repeat = max(1, int(size_mb * (1 << 20)) // len(SAMPLE))
+    return SAMPLE * repeat
+
+
+def run_findall(source):
+    return len(re.findall(LEGACY_PATTERN, source))
+
+
+def run_tokenize(source):
+    count = 0
+    for _ in tokenize(source):
+        count += 1
+    return count
+
+
+def run_stream(path):
+    count = 0
+    with open(path) as stream:
+        for _ in tokenize(stream):
+            count += 1
+    return count
+
+
+def measure(label, func, source, repeat, arg=None):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        tokens = func(source if arg is None else arg)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    tracemalloc.start()
+    func(source if arg is None else arg)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    megabytes = len(source) / (1 << 20)
+    print(f"{label:<10} {tokens:>12,} tokens  {megabytes / best:8.1f} MB/s  "
+          f"{tokens / best / 1e6:6.2f} Mtok/s  peak {peak / (1 << 20):8.1f} MiB")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size-mb", type=float, default=16.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    source = make_source(args.size_mb)
+    print(f"source: {len(source) / (1 << 20):.1f} MiB")
+    measure("findall", run_findall, source, args.repeat)
+    measure("tokenize", run_tokenize, source, args.repeat)
+    with tempfile.NamedTemporaryFile("w", suffix=".hts", delete=False) as handle:
+        handle.write(source)
+    try:
+        measure("stream", run_stream, source, args.repeat, arg=handle.name)
+    finally:
+        os.unlink(handle.name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""parallel_exec: independent HTS calls run sequentially vs on the worker pool.
+
+The ``cpu`` program makes ``--calls`` calls of a CPU-bound function, once
+one after the other and once through a single ``parallel_exec``; the
+``array`` program does the same with a function taking a ``--size``
+element array, which crosses to the workers through shared memory.  The
+pool is started and warmed up before timing.  Reports both times and the
+speedup, which is bounded by the number of CPUs (``os.cpu_count()``), and
+checks that both forms compute the same results.
+"""
+import argparse
+import os
+import time
+
+from hts import parallel
+from hts.bytecode import compile_program
+from hts.jit import JIT
+from hts.lexer import tokenize
+from hts.parser import parse
+from hts.vm import VM
+
+FUNCTIONS = {
+    "cpu": """
+fn work(n) {
+    let total = 0;
+    let i = 0;
+    while i < n {
+        total = total + i * i % 7;
+        i = i + 1;
+    }
+    return total;
+}
+""",
+    "array": """
+fn work(a) {
+    let total = 0.0;
+    let k = 0;
+    while k < 50 {
+        total = total + dot(a, a * 0.5);
+        k = k + 1;
+    }
+    return total;
+}
+let data = arange({size}) * 0.001;
+""",
+}
+
+ARGUMENTS = {"cpu": "{n}", "array": "data"}
+
+
+def build(name, calls, size, n, together):
+    argument = ARGUMENTS[name]
+    source = FUNCTIONS[name].replace("{size}", str(size))
+    call_list = ", ".join(f"work({argument})" for _ in range(calls))
+    if together:
+        source += f"let results = parallel_exec({call_list});\n"
+    else:
+        source += f"let results = [{call_list}];\n"
+    return compile_program(parse(tokenize(source.replace("{n}", str(n)))))
+
+
+def measure(program, repeat, tiered):
+    best = None
+    for _ in range(repeat):
+        vm = VM(jit=JIT() if tiered else None)
+        start = time.perf_counter()
+        vm.run(program)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, list(vm.variables["results"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=os.cpu_count() or 1, help="calls per program")
+    parser.add_argument("--n", type=int, default=200_000, help="loop length of the cpu program")
+    parser.add_argument("--size", type=int, default=500_000, help="array elements of the array program")
+    parser.add_argument("--repeat", type=int, default=3, help="best of this many runs")
+    parser.add_argument("--jit", action="store_true", help="run with tiered execution")
+    parser.add_argument("programs", nargs="*", default=list(FUNCTIONS))
+    args = parser.parse_args(argv)
+
+    pool = parallel.get_pool()
+    print(f"{len(pool.nodes)} workers, {args.calls} calls")
+    print(f"{'program':<8} {'sequential s':>13} {'parallel s':>11} {'speedup':>8}")
+    for name in args.programs:
+        sequential = build(name, args.calls, args.size, args.n, False)
+        together = build(name, args.calls, args.size, args.n, True)
+        # Warm-up: ships the program to every worker
+        measure(together, 1, args.jit)
+        slow, expected = measure(sequential, args.repeat, args.jit)
+        fast, results = measure(together, args.repeat, args.jit)
+        if results != expected:
+            raise SystemExit(f"{name}: parallel and sequential results differ")
+        print(f"{name:<8} {slow:>13.3f} {fast:>11.3f} {slow / fast:>7.2f}x")
+    parallel.shutdown()
+
+
+if __name__ == "__main__":
+    main()
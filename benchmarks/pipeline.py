@@ -0,0 +1,90 @@
+"""Peak RSS of materialized vs pipelined compilation of a large program.
+
+Both modes go through ``HTSCompiler``: ``compile()`` on the whole source,
+and the bounded-memory ``compile_file()``, declaring, optimizing and
+generating code and running the declared sync tasks batch by batch.  Each
+mode runs in its own child process so that ``ru_maxrss`` measures that
+mode alone.  The default 1 GiB input takes a while; use ``--size-mb`` for a
+quick run.
+"""
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from hts.compiler import HTSCompiler
+
+UNIT = """let a: int = 10;
+let b: float = 20.5;
+let result: int = a + b;
+if (result > 20) {
+    quantum qubit1 perform_op;
+    blockchain transaction1;
+}
+sync flush_logs;
+"""
+
+
+def write_program(path, size_mb):
+    repeat = max(1, int(size_mb * (1 << 20)) // len(UNIT))
+    block = UNIT * 1024
+    with open(path, "w") as handle:
+        for _ in range(repeat // 1024):
+            handle.write(block)
+        handle.write(UNIT * (repeat % 1024))
+
+
+def run_materialized(path, sink):
+    # Full source, token list, program, optimized copy and code list at once
+    with open(path) as handle:
+        source = handle.read()
+    with HTSCompiler(quiet=True) as compiler:
+        executable_code = compiler.compile(source)
+    for line in executable_code:
+        sink.write(line + "\n")
+    return len(executable_code)
+
+
+def run_pipelined(path, sink):
+    with HTSCompiler(quiet=True) as compiler:
+        return compiler.compile_file(path, sink)
+
+
+def child(mode, path):
+    start = time.perf_counter()
+    with open(os.devnull, "w") as sink:
+        lines = (run_pipelined if mode == "pipelined" else run_materialized)(path, sink)
+    elapsed = time.perf_counter() - start
+    # ru_maxrss is in KiB on Linux
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{mode:<13} {lines:>12,} lines  {elapsed:8.1f} s  peak RSS {peak:9.1f} MiB")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size-mb", type=float, default=1024.0)
+    parser.add_argument("--modes", nargs="+", default=["materialized", "pipelined"])
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--path", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        child(args.child, args.path)
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "synthetic.hts")
+        write_program(path, args.size_mb)
+        print(f"source: {os.path.getsize(path) / (1 << 20):.1f} MiB")
+        for mode in args.modes:
+            subprocess.run(
+                [sys.executable, "-m", "benchmarks.pipeline", "--child", mode, "--path", path],
+                check=True,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Statevector simulator throughput: gates/s against qubit count.
+
+Each layer applies ``rx`` and ``rz`` to every qubit followed by a ladder of
+``cx`` gates, which is the pattern single-qubit fusion targets.  Also reports
+how fast measurement shots are sampled from the final state.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from hts.quantum import Statevector, rx, rz
+
+
+def run_circuit(num_qubits, depth, fuse, seed=0):
+    rng = np.random.default_rng(seed)
+    register = Statevector(num_qubits, fuse=fuse, seed=seed)
+    start = time.perf_counter()
+    for _ in range(depth):
+        for qubit in range(num_qubits):
+            register.apply(rx(rng.uniform(0, np.pi)), qubit)
+            register.apply(rz(rng.uniform(0, np.pi)), qubit)
+        for qubit in range(num_qubits - 1):
+            register.cx(qubit, qubit + 1)
+    register.flush()
+    return register, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--qubits", type=int, nargs="+", default=[10, 15, 20, 22, 25])
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--shots", type=int, default=100000)
+    args = parser.parse_args(argv)
+
+    print(f"{'qubits':>6} {'mode':<8} {'gates':>7} {'sweeps':>7} {'seconds':>9} {'gates/s':>12} {'shots/s':>12}")
+    for num_qubits in args.qubits:
+        for fuse in (False, True):
+            register, elapsed = run_circuit(num_qubits, args.depth, fuse)
+            start = time.perf_counter()
+            register.sample(args.shots)
+            sampling = time.perf_counter() - start
+            mode = "fused" if fuse else "unfused"
+            print(f"{num_qubits:>6} {mode:<8} {register.gates:>7} {register.kernels:>7} {elapsed:>9.3f}"
+                  f" {register.gates / elapsed:>12,.0f} {args.shots / sampling:>12,.0f}")
+            del register
+
+
+if __name__ == "__main__":
+    main()
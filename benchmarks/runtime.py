@@ -0,0 +1,63 @@
+"""Tasks per second of the asyncio DIBA runtime against concurrent programs.
+
+Generates random DIBA programs of ``--lines`` lines, runs each batch of
+``--programs`` programs on one event loop and reports throughput.  Each task
+sleeps ``--task-delay`` seconds, so a sequential runtime would manage at
+most ``1 / task-delay`` tasks per second.  ``--simulate`` runs on a virtual
+clock instead, which measures the runtime's own overhead.  ``--script``
+runs copies of an .hts script (e.g. Syntax.hts) instead of random programs;
+it is compiled once and every copy executes the cached plan.
+"""
+import argparse
+import random
+
+from hts.diba import HTSCompiler as Runtime
+from hts.runtime import run_many
+
+LINES = [
+    "AUTONOMOUS_AGENT LoadBalancer Monitor",
+    "NEURAL_NET PredictiveModel",
+    "BLOCKCHAIN QuantumLedger",
+    "GENETIC_ALGORITHM OptimizeCode",
+    "FPGA_OPTIMIZE AccelerateComputation",
+    "MonitorSystemState",
+    "WAIT 0s",
+]
+
+
+def make_programs(count, lines, seed):
+    rng = random.Random(seed)
+    return [[rng.choice(LINES) for _ in range(lines)] for _ in range(count)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--programs", type=int, nargs="+", default=[1, 10, 100, 1000, 5000])
+    parser.add_argument("--lines", type=int, default=20)
+    parser.add_argument("--task-delay", type=float, default=0.01)
+    parser.add_argument("--max-concurrency", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--simulate", action="store_true", help="run on a virtual clock")
+    parser.add_argument("--script", help="run this .hts script instead of random programs")
+    args = parser.parse_args(argv)
+
+    def factory():
+        return Runtime(task_delay=args.task_delay, echo=False, seed=args.seed)
+
+    if args.script:
+        with open(args.script) as handle:
+            source = handle.read()
+
+    print(f"{'programs':>8} {'tasks':>8} {'failed':>6} {'seconds':>8} {'tasks/s':>10}")
+    for count in args.programs:
+        programs = [source] * count if args.script else make_programs(count, args.lines, args.seed)
+        stats = run_many(programs, factory, args.max_concurrency,
+                         simulate=args.simulate)
+        print(f"{stats.programs:>8} {stats.tasks:>8} {stats.failed:>6} {stats.elapsed:>8.3f}"
+              f" {stats.tasks_per_second:>10,.0f}")
+        for error in stats.errors[:1]:
+            print(f"  first error: {error!r}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Import time of the ``hts`` entry points, checked against budgets.
+
+Every module is imported in a fresh interpreter (best of ``--repeat``), and
+the heavy modules it must not drag in are checked as well: numpy and the
+simulated backends load on first use, never at import.  ``--check`` exits
+with status 1 if any budget is exceeded or a forbidden module was loaded::
+
+    python -m benchmarks.startup --check
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# module: (budget in milliseconds, modules it must not import)
+BUDGETS = {
+    "hts": (25, ("numpy", "hts.compiler", "argparse")),
+    "hts.cli": (60, ("numpy", "asyncio", "multiprocessing", "concurrent.futures", "hts.compiler")),
+    "hts.compiler": (100, ("numpy", "asyncio", "multiprocessing", "cProfile", "tracemalloc", "hts.quantum")),
+    "hts.diba": (200, ("numpy", "multiprocessing", "cProfile", "hts.quantum")),
+    "Compiler": (100, ("numpy", "asyncio", "multiprocessing", "hts.quantum")),
+}
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps([elapsed, [name for name in {forbidden!r} if name in sys.modules]]))
+"""
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure(module, forbidden=(), repeat=5):
+    """Best-of-``repeat`` seconds to import ``module`` and the forbidden modules it loaded."""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")])))
+    best = None
+    loaded = []
+    for _ in range(repeat):
+        result = subprocess.run([sys.executable, "-c", PROBE.format(module=module, forbidden=tuple(forbidden))],
+                                capture_output=True, text=True, cwd=ROOT, env=env, check=True)
+        elapsed, loaded = json.loads(result.stdout.splitlines()[-1])
+        best = elapsed if best is None else min(best, elapsed)
+    return best, loaded
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("modules", nargs="*", default=list(BUDGETS), metavar="MODULE")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--check", action="store_true", help="exit with status 1 on any violation")
+    args = parser.parse_args(argv)
+
+    violations = 0
+    print(f"{'module':<14} {'import ms':>10} {'budget ms':>10}  forbidden modules loaded")
+    for module in args.modules:
+        budget, forbidden = BUDGETS.get(module, (None, ()))
+        seconds, loaded = measure(module, forbidden, args.repeat)
+        over = budget is not None and seconds * 1e3 > budget
+        violations += over + bool(loaded)
+        print(f"{module:<14} {seconds * 1e3:>10.1f} {'' if budget is None else budget:>10}  "
+              f"{', '.join(loaded) or '-'}{'  OVER BUDGET' if over else ''}")
+    print(f"{violations} violation(s)")
+    return 1 if args.check and violations else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
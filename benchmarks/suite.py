@@ -0,0 +1,180 @@
+"""Compiler phase and DIBA run-loop timings, with JSON baselines.
+
+``run`` compiles synthetic programs (``benchmarks.generate``) of each
+``--sizes`` statement count and times every ``HTSCompiler`` phase (lex,
+parse, semantic_analysis, optimize, generate_code) on the in-memory
+program, then the streaming ``compile_file`` path.  Sizes above
+``--max-phased`` only take the streaming path, which runs in constant
+memory up to 10M statements and beyond.  The DIBA loop is timed on a
+virtual clock with zero task delay, i.e. its own overhead.  ``-o`` writes
+the results as a JSON baseline::
+
+    python -m benchmarks.suite run --sizes 1000 100000 -o base.json
+    python -m benchmarks.suite run --sizes 1000 100000 -o new.json
+    python -m benchmarks.suite compare base.json new.json --threshold 0.1
+
+``compare`` lists every timing of both files and exits with status 1 if any
+got slower by more than ``--threshold`` (a fraction).
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from functools import partial
+
+from hts import __version__
+from hts.compiler import HTSCompiler
+from hts.diba import HTSCompiler as Runtime
+from benchmarks.generate import parse_mix, source, write_program
+from benchmarks.runtime import make_programs
+
+
+def _phases(compiler):
+    # (name, function of the previous phase's result)
+    return [
+        ("lex", lambda code: list(compiler.lex(code))),
+        ("parse", compiler.parse),
+        ("semantic_analysis", lambda program: (compiler.semantic_analysis(program), program)[1]),
+        ("optimize", compiler.optimize),
+        ("generate_code", compiler.generate_code),
+    ]
+
+
+def time_phases(factory, code, repeat):
+    """Best-of-``repeat`` seconds per phase of compiling ``code``."""
+    best = {}
+    for _ in range(repeat):
+        value = code
+        for name, phase in _phases(factory()):
+            start = time.perf_counter()
+            value = phase(value)
+            elapsed = time.perf_counter() - start
+            best[name] = min(best.get(name, elapsed), elapsed)
+    return best
+
+
+def time_compile_file(factory, path):
+    with open(os.devnull, "w") as sink:
+        start = time.perf_counter()
+        lines = factory().compile_file(path, sink)
+        return time.perf_counter() - start, lines
+
+
+def time_diba(lines, seed):
+    program = make_programs(1, lines, seed)[0]
+    compiler = Runtime(task_delay=0, echo=False, seed=seed)
+    start = time.perf_counter()
+    tasks = compiler.run(program, simulate=True)
+    return time.perf_counter() - start, tasks
+
+
+def run(args):
+    factory = partial(HTSCompiler, quiet=True)
+    timings = {}
+    counts = {}
+    print(f"{'statements':>10} {'phase':<18} {'seconds':>10} {'statements/s':>14}")
+    for size in args.sizes:
+        if size <= args.max_phased:
+            for name, seconds in time_phases(factory, source(size, args.mix, args.seed), args.repeat).items():
+                timings[f"{size}/{name}"] = seconds
+                print(f"{size:>10} {name:<18} {seconds:>10.4f} {size / seconds if seconds else 0:>14,.0f}")
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "synthetic.hts")
+            write_program(path, size, args.mix, args.seed)
+            seconds, lines = time_compile_file(factory, path)
+        timings[f"{size}/compile_file"] = seconds
+        counts[f"{size}/compile_file"] = lines
+        print(f"{size:>10} {'compile_file':<18} {seconds:>10.4f} {size / seconds if seconds else 0:>14,.0f}")
+    if args.diba_lines:
+        seconds, tasks = time_diba(args.diba_lines, args.seed)
+        timings[f"diba/{args.diba_lines}"] = seconds
+        counts[f"diba/{args.diba_lines}"] = tasks
+        print(f"DIBA loop: {args.diba_lines} lines, {tasks} tasks in {seconds:.3f} s"
+              f" ({tasks / seconds if seconds else 0:,.0f} tasks/s)")
+
+    baseline = {
+        "meta": {
+            "version": __version__,
+            "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "mix": args.mix,
+            "seed": args.seed,
+            "repeat": args.repeat,
+        },
+        "timings": timings,
+        "counts": counts,
+    }
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump(baseline, handle, indent=2, sort_keys=True)
+        print(f"baseline written to {args.output}")
+    return baseline
+
+
+def compare(base, new, threshold, min_seconds=0.001):
+    """``(metric, base seconds, new seconds, change, regressed)`` rows for every shared timing."""
+    rows = []
+    for metric in sorted(base["timings"].keys() & new["timings"].keys()):
+        old_value = base["timings"][metric]
+        new_value = new["timings"][metric]
+        change = (new_value - old_value) / old_value if old_value else 0.0
+        # Timings below the noise floor never count as regressions
+        regressed = change > threshold and max(old_value, new_value) >= min_seconds
+        rows.append((metric, old_value, new_value, change, regressed))
+    return rows
+
+
+def run_compare(args):
+    with open(args.base) as handle:
+        base = json.load(handle)
+    with open(args.new) as handle:
+        new = json.load(handle)
+    rows = compare(base, new, args.threshold, args.min_seconds)
+    print(f"{'metric':<32} {'base':>10} {'new':>10} {'change':>8}")
+    for metric, old_value, new_value, change, regressed in rows:
+        print(f"{metric:<32} {old_value:>10.4f} {new_value:>10.4f} {change:>+8.1%}"
+              f"{'  REGRESSION' if regressed else ''}")
+    for metric in sorted(base["timings"].keys() ^ new["timings"].keys()):
+        print(f"{metric:<32} only in {'base' if metric in base['timings'] else 'new'}")
+    regressions = sum(row[-1] for row in rows)
+    print(f"{regressions} regression(s) beyond {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="time the compiler and the DIBA loop")
+    run_parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    run_parser.add_argument("--mix", type=parse_mix, default=None, help="e.g. let=4,if=1,quantum=1")
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--repeat", type=int, default=3, help="best of this many runs per phase")
+    run_parser.add_argument("--max-phased", type=int, default=1000000,
+                            help="largest size whose phases are timed in memory")
+    run_parser.add_argument("--diba-lines", type=int, default=10000, help="0 skips the DIBA loop")
+    run_parser.add_argument("-o", "--output", help="write the results to this JSON file")
+
+    compare_parser = commands.add_parser("compare", help="compare two JSON baselines")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--threshold", type=float, default=0.10,
+                                help="slowdown that counts as a regression, as a fraction")
+    compare_parser.add_argument("--min-seconds", type=float, default=0.001,
+                                help="ignore timings faster than this")
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        run(args)
+        return 0
+    return run_compare(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+"""HTS-VM micro-benchmarks: arithmetic loops, branches and calls.
+
+Reports VM instructions per second for each program, so changes to the
+bytecode compiler or the dispatch loop can be tracked over time.
+"""
+import argparse
+import time
+
+from hts.bytecode import compile_program
+from hts.lexer import tokenize
+from hts.parser import parse
+from hts.vm import VM
+
+PROGRAMS = {
+    "arith": """
+let total = 0;
+let i = 0;
+while i < {n} {
+    total = total + i * 3 - 1;
+    i = i + 1;
+}
+""",
+    "branch": """
+let evens = 0;
+let odds = 0;
+let i = 0;
+while i < {n} {
+    if i % 2 == 0 {
+        evens = evens + 1;
+    } else {
+        odds = odds + 1;
+    }
+    i = i + 1;
+}
+""",
+    "call": """
+fn add(a, b) {
+    return a + b;
+}
+let total = 0;
+let i = 0;
+while i < {n} {
+    total = add(total, i);
+    i = i + 1;
+}
+""",
+    "recursion": """
+fn fib(n) {
+    if n < 2 {
+        return n;
+    }
+    return fib(n - 1) + fib(n - 2);
+}
+let result = fib({depth});
+""",
+}
+
+
+def build(name, n):
+    # fib(depth) makes roughly 1.6 ** depth calls; keep it comparable to ``n``
+    depth = 10
+    while 1.618 ** (depth + 1) < n:
+        depth += 1
+    source = PROGRAMS[name].replace("{n}", str(n)).replace("{depth}", str(depth))
+    return compile_program(parse(tokenize(source)))
+
+
+def measure(name, n, repeat):
+    program = build(name, n)
+    best = None
+    vm = VM()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        vm.run(program)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return vm.instructions, best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n", type=int, default=200_000, help="loop iterations per program")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("programs", nargs="*", default=sorted(PROGRAMS))
+    args = parser.parse_args(argv)
+
+    for name in args.programs:
+        instructions, elapsed = measure(name, args.n, args.repeat)
+        print(f"{name:<10} {instructions:>12,} instr  {elapsed * 1e3:9.1f} ms  "
+              f"{instructions / elapsed / 1e6:6.2f} Minstr/s")
+
+
+if __name__ == "__main__":
+    main()
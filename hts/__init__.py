@@ -0,0 +1,15 @@
+"""Shared building blocks for the HTS compiler and runtime.
+
+``from hts import HTSCompiler`` is resolved on first access, so importing
+the package (or ``hts.cli``) does not pull in the compiler and its
+backends.
+"""
+
+__version__ = "0.1.0"
+
+
+def __getattr__(name):
+    if name == "HTSCompiler":
+        from hts.compiler import HTSCompiler
+        return HTSCompiler
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,106 @@
+"""NumPy-backed HTS arrays and matrices.
+
+An HTS array is a contiguous ``numpy.ndarray``.  A declared type such as
+``[int; 3]`` or ``[[float; 3]; 2]`` fixes the dtype (``DTYPES``) and the
+shape of the literal it initializes; undeclared literals let NumPy infer
+both.  The VM needs no array-specific arithmetic: ``+``, ``*``,
+comparisons and so on dispatch to NumPy's vectorized kernels, so a whole
+array costs one instruction, and ``a[i:j]`` is a view sharing the
+original buffer.  Single elements come back as Python numbers, so scalar
+code behaves as before.
+
+``/`` divides integer arrays like integers (truncating, division by zero
+raises ``ZeroDivisionError``) and anything else like NumPy does; ``%`` of
+integer arrays is the matching remainder, with the sign of the dividend.  The
+functions below are the array builtins of HTS code (``hts.bytecode``
+imports this module, and numpy with it, on their first call).
+"""
+import numpy as np
+
+# Declared element type -> dtype
+DTYPES = {
+    "int": np.int64, "float": np.float64, "bool": np.bool_,
+    "i8": np.int8, "i16": np.int16, "i32": np.int32, "i64": np.int64,
+    "u8": np.uint8, "f32": np.float32, "f64": np.float64,
+}
+
+
+class ArrayError(ValueError):
+    pass
+
+
+def _scalar(value):
+    # NumPy scalars become Python numbers; arrays stay arrays
+    return value.item() if np.ndim(value) == 0 else value
+
+
+def make_array(values, spec):
+    """Array of an ``Array`` literal from its evaluated operands (see ``hts.bytecode.array_spec``)."""
+    _, repeat, element, shape = spec
+    dtype = None if element is None else DTYPES[element]
+    try:
+        if repeat:
+            value, size = values
+            if type(size) is not int or size < 0:
+                raise ArrayError(f"array size must be a non-negative int, got {size!r}")
+            array = np.empty((size,) + np.shape(value), dtype=dtype or np.result_type(value))
+            array[...] = value
+        else:
+            array = np.array(values, dtype=dtype)
+    except (TypeError, ValueError) as exc:
+        if type(exc) is ArrayError:
+            raise
+        raise ArrayError(f"cannot build array: {exc}") from None
+    if shape is not None and array.shape != shape:
+        raise ArrayError(f"expected an array of shape {shape}, got {array.shape}")
+    return array
+
+
+def divide(left, right):
+    if np.result_type(left, right).kind in "biu":
+        if np.any(np.asarray(right) == 0):
+            raise ZeroDivisionError("integer division by zero")
+        quotient = np.abs(left) // np.abs(right)
+        return np.where((np.asarray(left) < 0) != (np.asarray(right) < 0), -quotient, quotient)
+    return np.true_divide(left, right)
+
+
+def remainder(left, right):
+    if np.result_type(left, right).kind in "biu":
+        if np.any(np.asarray(right) == 0):
+            raise ZeroDivisionError("integer modulo by zero")
+        # Sign of the dividend, matching the truncating division above
+        return np.fmod(left, right)
+    return np.remainder(left, right)
+
+
+# Builtins
+
+def zeros(size):
+    return np.zeros(size)
+
+
+def ones(size):
+    return np.ones(size)
+
+
+def arange(*bounds):
+    return np.arange(*bounds)
+
+
+def sum(array, axis=None):
+    return _scalar(np.sum(array, axis=axis))
+
+
+def mean(array, axis=None):
+    return _scalar(np.mean(array, axis=axis))
+
+
+def dot(left, right):
+    """Dot product of vectors, matrix product of matrices."""
+    return _scalar(np.dot(left, right))
+
+
+def transpose(array):
+    return array.T
+
@@ -0,0 +1,254 @@
+"""Parallel multi-module build driver.
+
+``build`` follows ``import name;`` statements from the entry files to
+``name.hts`` files (next to the importing file, then in ``search_path``),
+checks the resulting dependency graph for cycles and compiles modules in a
+process pool.  A module is submitted as soon as every module it imports has
+been compiled, so independent modules compile concurrently while each
+module still sees the symbols of its dependencies.  Each worker parses its
+module and lowers it to bytecode; linking only merges the per-module symbol
+tables and joins the lowered modules, in dependency order, into one
+``Program``.
+"""
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from hts.bytecode import BUILTINS, CompileError, link_modules, lower_module
+from hts.lexer import IDENT, KEYWORD, tokenize
+from hts.nodes import FnDef, Import, Let, names
+from hts.parser import ParseError, parse
+
+MODULE_SUFFIX = ".hts"
+
+
+class BuildError(Exception):
+    pass
+
+
+class Module:
+    __slots__ = ("name", "path", "imports")
+
+    def __init__(self, name, path, imports):
+        self.name = name
+        self.path = path
+        self.imports = imports
+
+    def __repr__(self):
+        return f"Module({self.name!r}, {self.path!r}, imports={self.imports!r})"
+
+
+class ModuleResult:
+    __slots__ = ("name", "program", "symbols", "errors", "elapsed", "pid")
+
+    def __init__(self, name, program, symbols, errors, elapsed, pid):
+        self.name = name
+        # Lowered module for hts.bytecode.link_modules; None if it has errors
+        self.program = program
+        self.symbols = symbols
+        self.errors = errors
+        self.elapsed = elapsed
+        self.pid = pid
+
+
+class BuildResult:
+    __slots__ = ("modules", "order", "symbols", "program", "elapsed")
+
+    def __init__(self, modules, order, symbols, program, elapsed):
+        self.modules = modules
+        self.order = order
+        self.symbols = symbols
+        self.program = program
+        self.elapsed = elapsed
+
+
+def scan_imports(source):
+    """Names imported by ``source``, in order of appearance."""
+    # Tokens rather than lines: an import may follow other statements on its
+    # line, and one inside a comment does not count
+    imports = {}
+    previous = None
+    for token in tokenize(source):
+        if token.kind == IDENT and previous == "import":
+            imports[token.text] = None
+        previous = token.text if token.kind == KEYWORD else None
+    return list(imports)
+
+
+def resolve(entries, search_path=()):
+    """Load the import graph reachable from ``entries``; returns {name: Module}."""
+    modules = {}
+    pending = [(os.path.abspath(path), None) for path in entries]
+    while pending:
+        path, importer = pending.pop()
+        name = os.path.splitext(os.path.basename(path))[0]
+        if name in modules:
+            if modules[name].path != path:
+                raise BuildError(f"module {name} found at both {modules[name].path} and {path}")
+            continue
+        try:
+            with open(path) as handle:
+                imports = scan_imports(handle.read())
+        except OSError as error:
+            where = f" (imported by {importer})" if importer else ""
+            raise BuildError(f"cannot read module {name}{where}: {error}") from None
+        modules[name] = Module(name, path, imports)
+        directories = [os.path.dirname(path)] + list(search_path)
+        for imported in imports:
+            if imported in modules:
+                continue
+            for directory in directories:
+                candidate = os.path.abspath(os.path.join(directory, imported + MODULE_SUFFIX))
+                if os.path.exists(candidate):
+                    pending.append((candidate, name))
+                    break
+            else:
+                raise BuildError(f"module {name}: cannot find imported module {imported}")
+    return modules
+
+
+def topological_order(modules):
+    """Module names with every module after the modules it imports."""
+    order = []
+    state = {}
+
+    def visit(name, stack):
+        mark = state.get(name)
+        if mark == "done":
+            return
+        if mark == "active":
+            cycle = stack[stack.index(name):] + [name]
+            raise BuildError(f"import cycle: {' -> '.join(cycle)}")
+        state[name] = "active"
+        stack.append(name)
+        for imported in modules[name].imports:
+            visit(imported, stack)
+        stack.pop()
+        state[name] = "done"
+        order.append(name)
+
+    for name in sorted(modules):
+        visit(name, [])
+    return order
+
+
+def compile_module(name, path, imported_symbols):
+    """Worker: parse one module, collect its top-level symbols and lower it to bytecode."""
+    start = time.perf_counter()
+    symbols = {}
+    errors = []
+    try:
+        with open(path) as handle:
+            statements = list(parse(tokenize(handle.read())))
+    except (OSError, ParseError) as error:
+        errors.append(f"{name}: {error}")
+        statements = []
+    for node in statements:
+        if type(node) is Let:
+            symbols[node.name] = {"kind": "let", "type": node.type, "module": name}
+        elif type(node) is FnDef:
+            symbols[node.name] = {"kind": "fn", "params": node.params, "module": name}
+
+    # Top-level declarations may only read names defined here or imported
+    visible = set(symbols) | set(imported_symbols) | set(BUILTINS)
+    for node in statements:
+        if type(node) is Let:
+            for variable in names(node.value):
+                if variable not in visible:
+                    errors.append(f"{name}:{node.line}: undefined variable {variable}")
+
+    program = None
+    if not errors:
+        functions = {}
+        variables = []
+        for symbol, info in imported_symbols.items():
+            if info["kind"] == "fn":
+                functions[symbol] = len(info["params"])
+            else:
+                variables.append(symbol)
+        try:
+            program = lower_module(
+                (node for node in statements if type(node) is not Import), functions, variables
+            )
+        except CompileError as error:
+            errors.append(f"{name}: {error}")
+    elapsed = time.perf_counter() - start
+    return ModuleResult(name, program, symbols, errors, elapsed, os.getpid())
+
+
+def _link(modules, order, results):
+    symbols = {}
+    for name in order:
+        result = results[name]
+        if result.errors:
+            raise BuildError("\n".join(result.errors))
+        for symbol, info in result.symbols.items():
+            previous = symbols.get(symbol)
+            if previous is not None and previous["module"] != name:
+                raise BuildError(
+                    f"symbol {symbol} defined in both {previous['module']} and {name}"
+                )
+            symbols[symbol] = info
+    return symbols, link_modules([results[name].program for name in order])
+
+
+def _exports(modules, results, name):
+    # Symbols visible to ``name``: everything its imports define, transitively
+    visible = {}
+    stack = list(modules[name].imports)
+    seen = set()
+    while stack:
+        imported = stack.pop()
+        if imported in seen:
+            continue
+        seen.add(imported)
+        visible.update(results[imported].symbols)
+        stack.extend(modules[imported].imports)
+    return visible
+
+
+def build(entries, search_path=(), jobs=None, link=True):
+    """Compile ``entries`` and everything they import; returns a ``BuildResult``.
+
+    ``jobs`` is the number of worker processes (default: one per CPU);
+    ``jobs=1`` compiles in this process.
+    """
+    start = time.perf_counter()
+    modules = resolve(entries, search_path)
+    order = topological_order(modules)
+    results = {}
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+
+    if jobs == 1:
+        for name in order:
+            module = modules[name]
+            results[name] = compile_module(name, module.path, _exports(modules, results, name))
+    else:
+        remaining = {name: len(module.imports) for name, module in modules.items()}
+        dependents = {name: [] for name in modules}
+        for name, module in modules.items():
+            for imported in module.imports:
+                dependents[imported].append(name)
+        ready = [name for name in order if not remaining[name]]
+        running = {}
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            while ready or running:
+                for name in ready:
+                    module = modules[name]
+                    future = pool.submit(
+                        compile_module, name, module.path, _exports(modules, results, name)
+                    )
+                    running[future] = name
+                ready = []
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    results[name] = future.result()
+                    for dependent in dependents[name]:
+                        remaining[dependent] -= 1
+                        if not remaining[dependent]:
+                            ready.append(dependent)
+
+    symbols, program = _link(modules, order, results) if link else (None, None)
+    return BuildResult(results, order, symbols, program, time.perf_counter() - start)
@@ -0,0 +1,592 @@
+"""HTS bytecode IR.
+
+Instructions are fixed-width quads ``(opcode, a, b, c)`` stored flat in an
+``array('i')``, one ``CodeObject`` per function.  Operands are register
+numbers, constant-pool indexes, function-table indexes or jump targets
+(instruction indexes).  ``compile_program`` lowers parsed statements to a
+``Program`` that ``hts.vm.VM`` executes.  ``lower_module`` lowers one
+module of a multi-module build on its own, calling functions of the modules
+it imports through ``External`` entries, and ``link_modules`` joins such
+modules into one ``Program``, renumbering functions, globals, constants and
+jump targets.
+
+Register layout of a frame: parameters first, then the function's other
+variables, then temporaries.  Top-level variables live in the registers of
+the ``<main>`` frame unless a function reads them, in which case they are
+globals.
+"""
+from array import array
+
+from hts.nodes import (
+    Array, Assign, BinOp, Call, ExprStmt, FnDef, If, Index, Let, Name, Num, Return, SetItem, Slice,
+    UnaryOp, While, names, walk,
+)
+from hts.parser import parse_array_type
+
+# Opcodes
+LOAD_CONST = 0      # a = consts[b]
+MOVE = 1            # a = b
+LOAD_GLOBAL = 2     # a = globals[b]
+STORE_GLOBAL = 3    # globals[a] = b
+ADD = 4             # a = b + c
+SUB = 5
+MUL = 6
+DIV = 7
+MOD = 8
+LT = 9
+LE = 10
+GT = 11
+GE = 12
+EQ = 13
+NE = 14
+NEG = 15            # a = -b
+NOT = 16            # a = not b
+JUMP = 17           # goto a
+JUMP_IF_FALSE = 18  # if not a: goto b
+JUMP_IF_NOT_LT = 19  # if not (a < b): goto c
+JUMP_IF_NOT_LE = 20
+JUMP_IF_NOT_GT = 21
+JUMP_IF_NOT_GE = 22
+JUMP_IF_NOT_EQ = 23
+JUMP_IF_NOT_NE = 24
+CALL = 25           # a = functions[b](registers c .. c + arity - 1)
+RETURN = 26         # return a (-1 returns None)
+EFFECT = 27         # run the effect handler for statement consts[a]
+MAKE_ARRAY = 28     # a = array of registers c .. c + n - 1 built as array spec consts[b]
+INDEX = 29          # a = b[c]
+SLICE = 30          # a = b[registers c : c + 1]
+SETITEM = 31        # a[b] = c
+PARALLEL = 32       # a = results of the calls consts[b], arguments from register c on, run in parallel
+
+OPNAMES = {value: name for name, value in globals().items() if name.isupper() and type(value) is int}
+
+BINARY_OPCODES = {
+    "+": ADD, "-": SUB, "*": MUL, "/": DIV, "%": MOD,
+    "<": LT, "<=": LE, ">": GT, ">=": GE, "==": EQ, "!=": NE,
+}
+BRANCH_OPCODES = {
+    "<": JUMP_IF_NOT_LT, "<=": JUMP_IF_NOT_LE, ">": JUMP_IF_NOT_GT,
+    ">=": JUMP_IF_NOT_GE, "==": JUMP_IF_NOT_EQ, "!=": JUMP_IF_NOT_NE,
+}
+
+class _ArrayBuiltin:
+    # hts.array, and numpy with it, is imported on the first call; picklable,
+    # so programs can be sent to hts.parallel workers
+    __slots__ = ("name",)
+
+    def __init__(self, name):
+        self.name = name
+
+    def __call__(self, *args):
+        from hts import array
+        return getattr(array, self.name)(*args)
+
+
+# Host functions callable from HTS code
+BUILTINS = {
+    "print": print,
+    "abs": abs,
+    "min": min,
+    "max": max,
+    "len": len,
+}
+BUILTINS.update(
+    (name, _ArrayBuiltin(name)) for name in ("zeros", "ones", "arange", "sum", "mean", "dot", "transpose")
+)
+
+
+def array_spec(node):
+    """``(operands, repeat, element type, shape)`` of an ``Array`` literal, for hts.array.make_array."""
+    element, shape = parse_array_type(node.type) or (None, None)
+    if node.repeat is not None:
+        return 2, True, element, shape
+    return len(node.elements), False, element, shape
+
+
+class CompileError(Exception):
+    pass
+
+
+class CodeObject:
+    __slots__ = ("name", "arity", "nregs", "code", "consts", "varnames", "definition", "_quads")
+
+    def __init__(self, name, arity):
+        self.name = name
+        self.arity = arity
+        self.nregs = 0
+        self.code = array("i")
+        self.consts = []
+        # Register of every named variable, for inspection and debugging
+        self.varnames = {}
+        # FnDef the function was compiled from (None for <main>); hts.jit translates it
+        self.definition = None
+        self._quads = None
+
+    def __len__(self):
+        return len(self.code) // 4
+
+    def quads(self):
+        """Instructions as a list of tuples, built once for the interpreter loop."""
+        if self._quads is None:
+            code = self.code.tolist()
+            self._quads = [tuple(code[i:i + 4]) for i in range(0, len(code), 4)]
+        return self._quads
+
+    def disassemble(self):
+        lines = [f"{self.name} (arity {self.arity}, {self.nregs} registers)"]
+        for index, (op, a, b, c) in enumerate(self.quads()):
+            lines.append(f"{index:5d}  {OPNAMES[op]:<16} {a:4d} {b:4d} {c:4d}")
+        return "\n".join(lines)
+
+
+class Builtin:
+    __slots__ = ("name", "func", "arity")
+
+    def __init__(self, name, func, arity):
+        self.name = name
+        self.func = func
+        self.arity = arity
+
+
+class External:
+    """Function-table entry for a function another module defines; resolved by ``link_modules``."""
+    __slots__ = ("name", "arity")
+
+    def __init__(self, name, arity):
+        self.name = name
+        self.arity = arity
+
+
+class Program:
+    __slots__ = ("main", "functions", "global_names")
+
+    def __init__(self, main, functions, global_names):
+        self.main = main
+        self.functions = functions
+        self.global_names = global_names
+
+
+class _FunctionCompiler:
+    def __init__(self, unit, program_compiler, global_slots):
+        self.unit = unit
+        self.program = program_compiler
+        self.global_slots = global_slots
+        self.locals = unit.varnames
+        self.top = 0
+        self._const_index = {}
+
+    # Emission helpers
+    def emit(self, op, a=0, b=0, c=0):
+        self.unit.code.extend((op, a, b, c))
+        return len(self.unit.code) // 4 - 1
+
+    def patch(self, index, slot, target):
+        self.unit.code[index * 4 + slot] = target
+
+    def here(self):
+        return len(self.unit.code) // 4
+
+    def const(self, value):
+        # repr keeps 0.0 and -0.0 apart, which compare equal
+        key = (type(value), repr(value) if type(value) is float else value)
+        index = self._const_index.get(key)
+        if index is None:
+            index = self._const_index[key] = len(self.unit.consts)
+            self.unit.consts.append(value)
+        return index
+
+    def temp(self):
+        register = self.top
+        self.top += 1
+        if self.top > self.unit.nregs:
+            self.unit.nregs = self.top
+        return register
+
+    def declare(self, name):
+        register = self.locals.get(name)
+        if register is None:
+            register = self.locals[name] = self.temp()
+        return register
+
+    # Expressions
+    def expression(self, expr, target=None):
+        # Returns the register holding the value; writes ``target`` when given,
+        # except for local variables, which are returned in place.
+        expr_type = type(expr)
+        if expr_type is Name:
+            register = self.locals.get(expr.id)
+            if register is not None:
+                return register
+            slot = self.global_slots.get(expr.id)
+            if slot is None:
+                raise CompileError(f"line {expr.line}: undefined variable {expr.id}")
+            target = self.temp() if target is None else target
+            self.emit(LOAD_GLOBAL, target, slot)
+            return target
+        if expr_type is Num:
+            target = self.temp() if target is None else target
+            self.emit(LOAD_CONST, target, self.const(expr.value))
+            return target
+        mark = self.top
+        if expr_type is BinOp:
+            left = self.expression(expr.left)
+            right = self.expression(expr.right)
+            self.top = mark
+            target = self.temp() if target is None else target
+            self.emit(BINARY_OPCODES[expr.op], target, left, right)
+            return target
+        if expr_type is UnaryOp:
+            operand = self.expression(expr.operand)
+            self.top = mark
+            target = self.temp() if target is None else target
+            self.emit(NEG if expr.op == "-" else NOT, target, operand)
+            return target
+        if expr_type is Index:
+            value = self.expression(expr.value)
+            index = self.expression(expr.index)
+            self.top = mark
+            target = self.temp() if target is None else target
+            self.emit(INDEX, target, value, index)
+            return target
+        if expr_type is Slice:
+            value = self.expression(expr.value)
+            base = self.top
+            for bound in (expr.start, expr.stop):
+                self.expression_into(Num(None) if bound is None else bound, self.temp())
+            self.top = mark
+            target = self.temp() if target is None else target
+            self.emit(SLICE, target, value, base)
+            return target
+        if expr_type is Array:
+            base = self.top
+            operands = expr.elements if expr.repeat is None else (expr.elements[0], expr.repeat)
+            for operand in operands:
+                self.expression_into(operand, self.temp())
+            self.top = mark
+            target = self.temp() if target is None else target
+            self.emit(MAKE_ARRAY, target, self.const(array_spec(expr)), base)
+            return target
+        if expr_type is Call and expr.func == "parallel_exec" and not self.program.defines(expr.func):
+            return self.parallel(expr, target, mark)
+        if expr_type is Call:
+            index, arity = self.program.function_index(expr.func, len(expr.args), expr.line)
+            base = self.top
+            for arg in expr.args:
+                self.expression_into(arg, self.temp())
+            self.top = mark
+            target = self.temp() if target is None else target
+            self.emit(CALL, target, index, base)
+            return target
+        raise CompileError(f"line {expr.line}: cannot compile expression {expr!r}")
+
+    def parallel(self, expr, target, mark):
+        # parallel_exec(f(...), g(...)): the arguments of every call in consecutive registers
+        calls = []
+        base = self.top
+        for call in expr.args:
+            if type(call) is not Call or not self.program.defines(call.func):
+                raise CompileError(f"line {expr.line}: parallel_exec() takes calls of HTS functions")
+            index, arity = self.program.function_index(call.func, len(call.args), call.line)
+            for arg in call.args:
+                self.expression_into(arg, self.temp())
+            calls.append((index, arity))
+        self.top = mark
+        target = self.temp() if target is None else target
+        spec = (sum(arity for _, arity in calls), tuple(calls))
+        self.emit(PARALLEL, target, self.const(spec), base)
+        return target
+
+    def expression_into(self, expr, target):
+        register = self.expression(expr, target)
+        if register != target:
+            self.emit(MOVE, target, register)
+
+    def branch_if_false(self, condition):
+        # Emit a conditional jump taken when ``condition`` is false; returns its index
+        mark = self.top
+        if type(condition) is BinOp and condition.op in BRANCH_OPCODES:
+            left = self.expression(condition.left)
+            right = self.expression(condition.right)
+            self.top = mark
+            return self.emit(BRANCH_OPCODES[condition.op], left, right, -1), 3
+        register = self.expression(condition)
+        self.top = mark
+        return self.emit(JUMP_IF_FALSE, register, -1), 2
+
+    # Statements
+    def let(self, name, value):
+        register = self.locals.get(name)
+        if register is not None:
+            self.expression_into(value, register)
+            return
+        if self.unit.name == "<main>" and name in self.global_slots:
+            self.store_global(name, value)
+            return
+        # Evaluate before declaring, so the initializer cannot see the new variable
+        mark = self.top
+        register = self.expression(value)
+        self.top = mark
+        target = self.declare(name)
+        if register != target:
+            self.emit(MOVE, target, register)
+
+    def store_global(self, name, value):
+        mark = self.top
+        register = self.expression(value)
+        self.top = mark
+        self.emit(STORE_GLOBAL, self.global_slots[name], register)
+
+    def block(self, statements):
+        for statement in statements:
+            self.statement(statement)
+
+    def statement(self, node):
+        node_type = type(node)
+        if node_type is Let:
+            self.let(node.name, node.value)
+        elif node_type is Assign:
+            register = self.locals.get(node.name)
+            if register is not None:
+                self.expression_into(node.value, register)
+            elif node.name in self.global_slots:
+                self.store_global(node.name, node.value)
+            else:
+                raise CompileError(f"line {node.line}: assignment to undeclared variable {node.name}")
+        elif node_type is SetItem:
+            mark = self.top
+            container = self.expression(Name(node.name, line=node.line))
+            index = self.expression(node.index)
+            value = self.expression(node.value)
+            self.top = mark
+            self.emit(SETITEM, container, index, value)
+        elif node_type is If:
+            jump, slot = self.branch_if_false(node.condition)
+            self.block(node.body)
+            if node.orelse:
+                skip = self.emit(JUMP, -1)
+                self.patch(jump, slot, self.here())
+                self.block(node.orelse)
+                self.patch(skip, 1, self.here())
+            else:
+                self.patch(jump, slot, self.here())
+        elif node_type is While:
+            start = self.here()
+            jump, slot = self.branch_if_false(node.condition)
+            self.block(node.body)
+            self.emit(JUMP, start)
+            self.patch(jump, slot, self.here())
+        elif node_type is Return:
+            if node.value is None:
+                self.emit(RETURN, -1)
+            else:
+                mark = self.top
+                register = self.expression(node.value)
+                self.top = mark
+                self.emit(RETURN, register)
+        elif node_type is ExprStmt:
+            mark = self.top
+            self.expression(node.value)
+            self.top = mark
+        elif node_type is FnDef:
+            # Functions are hoisted by the program compiler
+            pass
+        else:
+            # Quantum, blockchain, memory, sync/async ... run through effect handlers
+            self.emit(EFFECT, self.const(node))
+
+
+class _ProgramCompiler:
+    def __init__(self, builtins, externals=None):
+        self.builtins = builtins
+        # Functions defined by imported modules: name -> arity
+        self.externals = externals or {}
+        self.functions = []
+        self.function_slots = {}
+        self.definitions = {}
+
+    def defines(self, name):
+        return name in self.definitions or name in self.externals
+
+    def function_index(self, name, nargs, line):
+        key = (name, nargs)
+        index = self.function_slots.get(key)
+        if index is not None:
+            return index, nargs
+        definition = self.definitions.get(name)
+        arity = len(definition.params) if definition is not None else self.externals.get(name)
+        if arity is not None:
+            if arity != nargs:
+                raise CompileError(f"line {line}: {name}() takes {arity} arguments, got {nargs}")
+            entry = CodeObject(name, nargs) if definition is not None else External(name, nargs)
+        elif name in self.builtins:
+            entry = Builtin(name, self.builtins[name], nargs)
+        else:
+            raise CompileError(f"line {line}: undefined function {name}")
+        index = self.function_slots[key] = len(self.functions)
+        self.functions.append(entry)
+        return index, nargs
+
+    def compile(self, statements, imported_globals=None):
+        # ``imported_globals`` is set when compiling one module of a build
+        statements = list(statements)
+        for node in walk(statements):
+            if type(node) is FnDef:
+                if node.name in self.definitions:
+                    raise CompileError(f"line {node.line}: function {node.name} redefined")
+                self.definitions[node.name] = node
+
+        # Top-level variables read or written by a function become globals
+        top_level = {node.name for node in statements if type(node) is Let}
+        global_names = []
+        if imported_globals is not None:
+            # Every top-level variable of a module is a global, so that the
+            # modules importing it can use it; so is every imported one it uses
+            global_names.extend(dict.fromkeys(node.name for node in statements if type(node) is Let))
+            global_names.extend(
+                name for name in dict.fromkeys(_used_names(statements))
+                if name in imported_globals and name not in top_level
+            )
+            # Importing modules may call any of its functions
+            for definition in self.definitions.values():
+                self.function_index(definition.name, len(definition.params), definition.line)
+        for definition in self.definitions.values():
+            local = set(definition.params)
+            local.update(node.name for node in walk(definition.body) if type(node) is Let)
+            for name in _used_names(definition.body):
+                if name in top_level and name not in local and name not in global_names:
+                    global_names.append(name)
+        global_slots = {name: slot for slot, name in enumerate(global_names)}
+
+        main = CodeObject("<main>", 0)
+        compiler = _FunctionCompiler(main, self, global_slots)
+        compiler.block(statements)
+        compiler.emit(RETURN, -1)
+
+        # Compile every function that is reachable by a call, including from
+        # functions compiled in this loop
+        index = 0
+        while index < len(self.functions):
+            unit = self.functions[index]
+            index += 1
+            if type(unit) is not CodeObject:
+                continue
+            definition = unit.definition = self.definitions[unit.name]
+            compiler = _FunctionCompiler(unit, self, global_slots)
+            for param in definition.params:
+                compiler.declare(param)
+            compiler.block(definition.body)
+            compiler.emit(RETURN, -1)
+        return Program(main, self.functions, global_names)
+
+
+def _used_names(statements):
+    for node in walk(statements):
+        node_type = type(node)
+        if node_type is Assign or node_type is SetItem:
+            yield node.name
+        if node_type is SetItem:
+            yield from names(node.index)
+        if node_type is If or node_type is While:
+            yield from names(node.condition)
+        elif node_type in (Let, Assign, SetItem, Return, ExprStmt) and node.value is not None:
+            yield from names(node.value)
+
+
+def compile_program(statements, builtins=None):
+    """Lower parsed statements to a ``Program``."""
+    return _ProgramCompiler(BUILTINS if builtins is None else builtins).compile(statements)
+
+
+def lower_module(statements, imported_functions, imported_globals, builtins=None):
+    """Lower the statements of one module to a ``Program`` for ``link_modules``.
+
+    ``imported_functions`` (name -> arity) and ``imported_globals`` are the
+    functions and top-level variables of the modules it imports.
+    """
+    compiler = _ProgramCompiler(BUILTINS if builtins is None else builtins, imported_functions)
+    return compiler.compile(statements, set(imported_globals))
+
+
+# Operand (1-3) of the instructions renumbered when modules are linked,
+# and what it indexes
+_RELOCATIONS = {
+    CALL: (2, "function"), PARALLEL: (2, "parallel"), LOAD_GLOBAL: (2, "global"), STORE_GLOBAL: (1, "global"),
+    JUMP: (1, "jump"), JUMP_IF_FALSE: (2, "jump"), LOAD_CONST: (2, "const"), MAKE_ARRAY: (2, "const"),
+    EFFECT: (1, "const"),
+}
+_RELOCATIONS.update((op, (3, "jump")) for op in BRANCH_OPCODES.values())
+_LINKED_OPCODES = frozenset((CALL, PARALLEL, LOAD_GLOBAL, STORE_GLOBAL))
+
+
+def _relocate(unit, target, functions, global_slots, end=None):
+    # Append the code (up to instruction ``end``) and constants of ``unit``
+    # to ``target``; ``functions`` and ``global_slots`` map the unit's
+    # indexes to the linked ones
+    code = unit.code[:None if end is None else end * 4]
+    consts = list(unit.consts)
+    jump_base = len(target)
+    const_base = len(target.consts)
+    relocations = _RELOCATIONS.get
+    for index, op in enumerate(code[::4].tolist()):
+        relocation = relocations(op)
+        if relocation is None:
+            continue
+        slot, kind = relocation
+        position = index * 4 + slot
+        if kind == "function":
+            code[position] = functions[code[position]]
+        elif kind == "global":
+            code[position] = global_slots[code[position]]
+        elif kind == "jump":
+            code[position] += jump_base
+        else:
+            if kind == "parallel":
+                total, calls = unit.consts[code[position]]
+                consts[code[position]] = (total, tuple((functions[callee], arity) for callee, arity in calls))
+            code[position] += const_base
+    target.code.extend(code)
+    target.consts.extend(consts)
+    target.varnames.update(unit.varnames)
+    target.nregs = max(target.nregs, unit.nregs)
+
+
+def link_modules(programs):
+    """One ``Program`` running the ``lower_module`` results ``programs`` in order.
+
+    Each module may call the functions and use the globals of the modules
+    before it.  The top-level code of all modules runs in one ``<main>``, as
+    if their statements had been compiled together.
+    """
+    functions = []
+    # (name, arity) -> index in ``functions`` of the latest definition
+    slots = {}
+    global_slots = {}
+    main = CodeObject("<main>", 0)
+    for program in programs:
+        indexes = []
+        defined = []
+        for entry in program.functions:
+            key = (entry.name, entry.arity)
+            index = slots.get(key)
+            if type(entry) is CodeObject:
+                index = slots[key] = len(functions)
+                functions.append(entry)
+                defined.append(index)
+            elif index is None:
+                if type(entry) is External:
+                    raise CompileError(f"undefined function {entry.name}")
+                index = slots[key] = len(functions)
+                functions.append(entry)
+            indexes.append(index)
+        module_globals = [global_slots.setdefault(name, len(global_slots)) for name in program.global_names]
+        for index in defined:
+            entry = functions[index]
+            # Functions that call nothing and use no globals are shared with the module
+            if not _LINKED_OPCODES.isdisjoint(entry.code[::4]):
+                unit = functions[index] = CodeObject(entry.name, entry.arity)
+                unit.definition = entry.definition
+                _relocate(entry, unit, indexes, module_globals)
+        # Drop the closing RETURN: the next module's code follows instead
+        _relocate(program.main, main, indexes, module_globals, len(program.main) - 1)
+    main.code.extend((RETURN, -1, 0, 0))
+    return Program(main, functions, list(global_slots))
@@ -0,0 +1,255 @@
+"""Content-addressed on-disk compilation cache.
+
+Entries are keyed by the SHA-256 of the compiler version, the compile
+options and the source text, and stored as pickles under the cache
+directory.  Two granularities are kept:
+
+* per file: the parsed units, the compiled bytecode ``Program`` and the
+  generated code;
+* per top-level unit (a ``fn`` or ``let`` declaration or any other
+  statement at nesting depth 0): its parsed statements and its generated
+  code.  A unit's key does not depend on its position, so editing one
+  declaration re-parses and re-optimizes only that declaration and moving
+  code around costs nothing.
+
+Generated code is keyed by the source and a ``context`` string holding
+whatever else it depends on (the compiler passes a summary of the
+program's functions).  Code of units that allocate memory embeds the
+allocated addresses and is never stored.
+
+The directory is bounded by ``max_bytes``; the least recently used entries
+are evicted first (recency survives restarts through file mtimes).
+"""
+import hashlib
+import json
+import os
+import pickle
+import re
+import tempfile
+from collections import OrderedDict
+
+from hts import __version__
+from hts.bytecode import compile_program
+from hts.lexer import tokenize
+from hts.nodes import MemoryOp, iter_nodes, walk
+from hts.parser import parse
+
+DEFAULT_MAX_BYTES = 256 << 20
+
+# Layout of the entries and of the unit split, part of every key
+CACHE_FORMAT = 3
+
+# Braces, brackets, statement terminators and newlines drive unit splitting;
+# comments are matched so that braces inside them are ignored
+_UNIT_RE = re.compile(r"//[^\n]*|[{}\[\];\n]")
+# ``else`` after a closing brace, across whitespace and comments
+_ELSE_RE = re.compile(r"(?:\s|//[^\n]*)*else\b")
+
+
+def split_units(source):
+    """Yield ``(text, first_line)`` for each top-level unit of ``source``."""
+    depth = 0
+    # ``;`` inside brackets belongs to an array type or a repeat literal
+    brackets = 0
+    start = 0
+    line = start_line = 1
+    for match in _UNIT_RE.finditer(source):
+        char = match.group()
+        if char == "\n":
+            line += 1
+            continue
+        if char == "{":
+            depth += 1
+            continue
+        if char == "[":
+            brackets += 1
+            continue
+        if char == "]":
+            brackets = max(brackets - 1, 0)
+            continue
+        if char == "}":
+            depth = max(depth - 1, 0)
+            # ``if ... { } else { }`` is a single unit
+            if depth or _ELSE_RE.match(source, match.end()):
+                continue
+        elif char != ";" or depth or brackets:
+            continue
+        end = match.end()
+        text = source[start:end]
+        if text.strip():
+            yield text, start_line
+        start = end
+        start_line = line
+    text = source[start:]
+    if text.strip():
+        yield text, start_line
+
+
+class CacheStats:
+    __slots__ = ("hits", "misses", "stores", "evictions")
+
+    def __init__(self):
+        self.hits = self.misses = self.stores = self.evictions = 0
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def as_dict(self):
+        return {
+            "hits": self.hits, "misses": self.misses, "stores": self.stores,
+            "evictions": self.evictions, "hit_rate": self.hit_rate,
+        }
+
+    def __repr__(self):
+        return f"CacheStats({self.as_dict()})"
+
+
+class CompileCache:
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES, options=None, version=__version__):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.stats = CacheStats()
+        self.size = 0
+        self._salt = json.dumps([CACHE_FORMAT, version, options or {}], sort_keys=True).encode()
+        self._index = OrderedDict()
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+
+    def _load_index(self):
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".pkl"):
+                    stat = os.stat(os.path.join(root, name))
+                    entries.append((stat.st_mtime, name[:-4], stat.st_size))
+        for _, key, size in sorted(entries):
+            self._index[key] = size
+            self.size += size
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key + ".pkl")
+
+    def key(self, kind, text):
+        digest = hashlib.sha256(self._salt)
+        digest.update(kind.encode())
+        digest.update(b"\0")
+        digest.update(text.encode())
+        return digest.hexdigest()
+
+    def get(self, key):
+        """Return the cached value for ``key`` or None."""
+        if key not in self._index:
+            self.stats.misses += 1
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "rb") as handle:
+                value = pickle.load(handle)
+            os.utime(path)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            self._forget(key)
+            self.stats.misses += 1
+            return None
+        self._index.move_to_end(key)
+        self.stats.hits += 1
+        return value
+
+    def put(self, key, value):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        # Write to a temporary file first so readers never see a partial entry
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(data)
+        os.replace(tmp, path)
+        self.size += len(data) - self._index.pop(key, 0)
+        self._index[key] = len(data)
+        self.stats.stores += 1
+        self._evict()
+
+    def _forget(self, key):
+        self.size -= self._index.pop(key, 0)
+        try:
+            os.unlink(self._path(key))
+        except OSError:
+            pass
+
+    def _evict(self):
+        while self.size > self.max_bytes and len(self._index) > 1:
+            key = next(iter(self._index))
+            self._forget(key)
+            self.stats.evictions += 1
+
+    def clear(self):
+        for key in list(self._index):
+            self._forget(key)
+
+    def __len__(self):
+        return len(self._index)
+
+    # Compiler front end and back end
+
+    def units(self, source):
+        """``(text, statements)`` of each top-level unit of ``source``, parsed or reused."""
+        file_key = self.key("file", source)
+        units = self.get(file_key)
+        if units is not None:
+            return units
+        units = []
+        for text, first_line in split_units(source):
+            unit_key = self.key("unit", text)
+            nodes = self.get(unit_key)
+            if nodes is None:
+                nodes = list(parse(tokenize(text)))
+                self.put(unit_key, nodes)
+            if first_line != 1:
+                for node in iter_nodes(nodes):
+                    node.line += first_line - 1
+            units.append((text, nodes))
+        self.put(file_key, units)
+        return units
+
+    def parse(self, source):
+        """Parsed statements of ``source``, reusing unchanged top-level units."""
+        return [node for _, nodes in self.units(source) for node in nodes]
+
+    def code(self, source, units, context, generate):
+        """Generated code of ``source``, reusing unchanged units.
+
+        ``units`` are its ``(text, statements, inputs)``, where ``inputs`` is
+        what else the unit's code depends on and keys it through its
+        ``repr``; ``generate(statements, inputs)`` returns the code lines of
+        the units that are not cached.
+        """
+        inputs_text = [context + "\0" + repr(inputs) + "\0" for _, _, inputs in units]
+        file_key = self.key("code", "".join(inputs_text) + source)
+        code = self.get(file_key)
+        if code is not None:
+            return code
+        code = []
+        complete = True
+        for (text, statements, inputs), prefix in zip(units, inputs_text):
+            unit_key = self.key("unit-code", prefix + text)
+            lines = self.get(unit_key)
+            if lines is None:
+                lines = generate(statements, inputs)
+                if any(type(node) is MemoryOp for node in walk(statements)):
+                    complete = False
+                else:
+                    self.put(unit_key, lines)
+            code.extend(lines)
+        if complete:
+            self.put(file_key, code)
+        return code
+
+    def program(self, source):
+        """Bytecode ``Program`` for ``source``."""
+        key = self.key("program", source)
+        program = self.get(key)
+        if program is None:
+            program = compile_program(self.parse(source))
+            self.put(key, program)
+        return program
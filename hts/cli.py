@@ -0,0 +1,110 @@
+"""``htsc``: compile HTS source files.
+
+Each ``FILE.hts`` is compiled to ``FILE.out`` (in ``--output-dir`` if
+given), one line of generated code per line.  ``--jobs`` compiles files in
+parallel worker processes, ``--stream`` uses the bounded-memory pipeline
+for very large inputs and ``--stats`` reports per-phase timings on stderr.
+The exit status is 1 if any file failed to compile.
+
+Only argparse is imported before the arguments are parsed; the compiler
+and its backends load when the first file is compiled.
+"""
+import argparse
+import os
+import sys
+
+OUTPUT_SUFFIX = ".out"
+
+
+def output_path(path, output_dir=None):
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(output_dir or os.path.dirname(path), stem + OUTPUT_SUFFIX)
+
+
+def _profile_report(stats, phase):
+    # Text of a phase's cProfile capture; the pstats object itself does not pickle
+    if stats is None or phase not in stats.phases or stats[phase].profile is None:
+        return None
+    import io
+    report = io.StringIO()
+    profile = stats[phase].profile
+    profile.stream = report
+    profile.sort_stats("cumulative").print_stats(20)
+    stats[phase].profile = None
+    return report.getvalue()
+
+
+def compile_one(path, output, stream=False, cache_dir=None, profile=None):
+    """Compile ``path`` to ``output``.
+
+    Returns ``(path, error or None, CompileStats or None, profile report or None)``.
+    """
+    from hts.compiler import HTSCompiler
+    from hts.instrument import Instrumentation
+
+    cache = None
+    if cache_dir is not None:
+        from hts.cache import CompileCache
+        cache = CompileCache(cache_dir)
+    with HTSCompiler(cache, quiet=True, instrumentation=Instrumentation(profile=profile)) as compiler:
+        try:
+            if stream:
+                with open(output, "w") as sink:
+                    code = compiler.compile_file(path, sink)
+            else:
+                with open(path) as handle:
+                    code = compiler.compile(handle.read())
+        except (OSError, SyntaxError, ValueError, MemoryError) as exc:
+            return path, f"{type(exc).__name__}: {exc}", None, None
+        stats = compiler.compile_stats
+        report = _profile_report(stats, profile)
+        if code is None:
+            return path, "; ".join(compiler.semantic_errors), stats, report
+        if stream:
+            return path, None, stats, report
+        with open(output, "w") as sink:
+            sink.write("".join(line + "\n" for line in code))
+        return path, None, stats, report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="htsc", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("files", nargs="+", metavar="FILE")
+    parser.add_argument("-o", "--output-dir", help="directory for the compiled files")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="files compiled in parallel")
+    parser.add_argument("--stream", action="store_true", help="bounded-memory pipelined compilation")
+    parser.add_argument("--cache", metavar="DIR", help="reuse parsed units and generated code from this compilation cache")
+    parser.add_argument("--stats", action="store_true", help="print per-phase timings to stderr")
+    parser.add_argument("--profile", metavar="PHASE", help="print a cProfile report of one phase to stderr")
+    parser.add_argument("-q", "--quiet", action="store_true", help="report errors only")
+    args = parser.parse_args(argv)
+
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+    jobs = [(path, output_path(path, args.output_dir), args.stream, args.cache, args.profile)
+            for path in args.files]
+    if args.jobs > 1 and len(jobs) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(min(args.jobs, len(jobs))) as pool:
+            results = list(pool.map(compile_one, *zip(*jobs)))
+    else:
+        results = [compile_one(*job) for job in jobs]
+
+    failed = 0
+    for (path, error, stats, report), job in zip(results, jobs):
+        if error is not None:
+            failed += 1
+            print(f"htsc: {path}: {error}", file=sys.stderr)
+            continue
+        if not args.quiet:
+            print(f"{path} -> {job[1]}")
+        if args.stats and stats is not None:
+            print(stats.table(), file=sys.stderr)
+        if report is not None:
+            sys.stderr.write(report)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
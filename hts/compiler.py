@@ -0,0 +1,542 @@
+"""The HTS compiler.
+
+``HTSCompiler`` is the single compiler of the toolchain: lexing, parsing,
+declaration of variables, qubits, ledger transactions, memory and tasks,
+semantic analysis, optimization, code generation, and execution on the
+bytecode VM.  It replaces the five variants that used to live in
+Compiler.py.
+
+Backends are created, and their modules imported, on first use: the
+quantum simulator (numpy), the blockchain ledger, the optimizer passes,
+the task scheduler, the memory arena, the worker cluster and the VM.
+Compiling a program without ``quantum`` statements never imports numpy,
+and ``import hts.compiler`` costs little more than the lexer and parser.
+"""
+import threading
+import time
+from functools import cached_property, partial
+
+from hts import pipeline
+from hts.evaluate import EvaluationError, evaluate
+from hts.instrument import Instrumentation, count_nodes
+from hts.lexer import tokenize
+from hts.nodes import (
+    Assign, Async, Blockchain, Call, FnDef, Let, MemoryOp, Name, Optimize, Quantum, Sync, iter_nodes, names, walk,
+)
+from hts.optimizer import FunctionEffects
+from hts.parser import parse as parse_statements
+
+
+# Backends; each imports its implementation when it is first created
+
+class QuantumProcessor:
+    def __init__(self, echo=print):
+        from hts.quantum import QuantumSimulator
+        self.echo = echo
+        # Statevector simulator; qubits are allocated on first use
+        self.simulator = QuantumSimulator()
+
+    def execute(self, qubit, operation):
+        self.echo(f"Performing quantum operation: {operation} on qubit {qubit}")
+        outcome = self.simulator.execute(qubit, operation)
+        result = f"Quantum operation on qubit {qubit} with {operation}"
+        return result if outcome is None else f"{result}: measured {outcome}"
+
+
+class BlockchainProcessor:
+    def __init__(self, ledger=None, echo=print):
+        self.echo = echo
+        # hts.ledger.Ledger; a temporary one is opened on first use
+        self.ledger = ledger
+        self._opened = False
+        self._lock = threading.Lock()
+
+    def execute(self, transaction):
+        # Sync tasks on the thread pool and async ones on the event loop get here concurrently
+        with self._lock:
+            if self.ledger is None:
+                from hts.ledger import Ledger
+                self.ledger = Ledger()
+                self._opened = True
+        txid = self.ledger.append(transaction).hex()[:16]
+        self.echo(f"Blockchain transaction executed: {transaction}")
+        return f"Blockchain operation executed: {transaction} (tx {txid})"
+
+    # Close the ledger if it was opened here
+    def close(self):
+        with self._lock:
+            if self._opened:
+                self.ledger.close()
+                self.ledger = None
+                self._opened = False
+
+
+class AIModelOptimizer:
+    def __init__(self, echo=print):
+        from hts.optimizer import PassManager
+        self.echo = echo
+        self.pass_manager = PassManager()
+
+    def optimize(self, program, effects=None, constants=None):
+        # Constant folding, copy propagation, CSE, dead code/store elimination;
+        # ``effects`` (hts.optimizer.FunctionEffects) carries over between batches
+        self.echo("Running AI/ML optimization on program...")
+        optimized_program = self.pass_manager.run(program, effects, constants)
+        for report in self.pass_manager.reports:
+            self.echo(f"  {report}")
+        return optimized_program
+
+
+class MemoryManager:
+    def __init__(self, capacity=64 << 20, echo=print):
+        from hts.memory import Arena
+        self.echo = echo
+        # Slab/extent allocator; addresses are arena handles, unique until freed
+        self.arena = Arena(capacity)
+
+    def allocate(self, size):
+        self.echo(f"Allocating {size} bytes of memory...")
+        return f"0x{self.arena.allocate(size):x}"
+
+    def free(self, address):
+        self.echo(f"Freeing memory at address {address}...")
+        self.arena.free(int(address, 0) if isinstance(address, str) else address)
+
+    def stats(self):
+        return self.arena.stats()
+
+
+class DistributedScheduler:
+    def __init__(self, cluster=None, echo=print):
+        self.echo = echo
+        # hts.distributed.Cluster of local worker processes; one worker per node on first use
+        self.cluster = cluster
+
+    def schedule_task(self, task, nodes):
+        self.echo(f"Scheduling task: {task} across nodes: {nodes}")
+        if self.cluster is None:
+            from hts.distributed import Cluster
+            self.cluster = Cluster(len(nodes))
+        # Every node runs the task in its own worker process, all at once
+        futures = [self.cluster.submit(node.execute_task, task, node=index)
+                   for index, node in enumerate(nodes)]
+        for future in futures:
+            future.result()
+
+    def close(self):
+        if self.cluster is not None:
+            self.cluster.close()
+            self.cluster = None
+
+
+class Node:
+    def __init__(self, quiet=False, delay=0.0):
+        # Runs in a worker process, so it prints itself instead of taking an echo callable
+        self.quiet = quiet
+        # Simulated execution time, in seconds
+        self.delay = delay
+
+    def execute_task(self, task):
+        if not self.quiet:
+            print(f"Node executing: {task}")
+        if self.delay:
+            time.sleep(self.delay)
+        if not self.quiet:
+            print(f"Task {task} completed on node")
+
+
+class HTSCompiler:
+    def __init__(self, cache=None, quiet=False, instrumentation=None, task_delay=0.0):
+        # Optional hts.cache.CompileCache reused across compilations
+        self.cache = cache
+        # A quiet compiler writes nothing to stdout
+        self.quiet = quiet
+        # hts.instrument.Instrumentation measuring every compile(); stats of the last one
+        self.instrumentation = instrumentation or Instrumentation()
+        self.compile_stats = None
+        # Errors found by the last compile(), which then returned None
+        self.semantic_errors = []
+        # Simulated execution time of one sync/async task, in seconds
+        self.task_delay = task_delay
+        self.symbol_table = {}
+        # Compile-time values of top-level variables (hts.evaluate), and the
+        # globals the functions declared so far may assign
+        self.values = {}
+        self.function_effects = FunctionEffects(complete=False)
+        self.optimizations = []
+        self.qubit_states = {}
+        self.blockchain_states = {}
+        # Tasks declared since the last compile: sync tasks run on a bounded
+        # worker pool, async tasks as coroutines on the scheduler's event loop
+        self.pending_tasks = []
+
+    # Backends, created on first use
+
+    @cached_property
+    def quantum_processor(self):
+        return QuantumProcessor(echo=self.echo)
+
+    @cached_property
+    def blockchain_processor(self):
+        return BlockchainProcessor(echo=self.echo)
+
+    @cached_property
+    def ai_optimizer(self):
+        return AIModelOptimizer(echo=self.echo)
+
+    @cached_property
+    def memory_manager(self):
+        return MemoryManager(echo=self.echo)
+
+    @cached_property
+    def scheduler(self):
+        from hts.scheduler import TaskScheduler
+        return TaskScheduler()
+
+    @cached_property
+    def distributed_scheduler(self):
+        return DistributedScheduler(echo=self.echo)
+
+    # Progress output, suppressed in quiet mode
+    def echo(self, *values):
+        if not self.quiet:
+            print(*values)
+
+    # Lexical analysis
+    def lex(self, code):
+        return tokenize(code)
+
+    # Syntax analysis: recursive descent parser producing typed nodes (hts/parser.py)
+    def parse(self, tokens):
+        return self.declare(parse_statements(tokens))
+
+    # Record the effects of parsed statements
+    def declare(self, statements):
+        program = []
+        for statement in statements:
+            self.forget_clobbered(statement)
+            for node in walk((statement,)):
+                node_type = type(node)
+
+                # Variable Declaration; 'result' is the compile-time value, if known
+                if node_type is Let:
+                    self.symbol_table[node.name] = {
+                        'type': node.type, 'value': node.value, 'result': self.track_value(node, node is statement),
+                    }
+
+                # Assignment
+                elif node_type is Assign:
+                    self.track_value(node, node is statement)
+
+                # Quantum Operation
+                elif node_type is Quantum:
+                    self.qubit_states[node.qubit] = node.operation
+
+                # Blockchain Transaction
+                elif node_type is Blockchain:
+                    self.blockchain_states[node.transaction] = 'executed'
+
+                # Asynchronous execution
+                elif node_type is Async:
+                    self.pending_tasks.append(("submit_async", self.execute_async_task, node.task))
+
+                # Sync Execution
+                elif node_type is Sync:
+                    self.pending_tasks.append(("submit", self.execute_sync_task, node.task))
+
+                # Memory Allocation/Deallocation
+                elif node_type is MemoryOp:
+                    if node.action == 'allocate':
+                        node.address = self.memory_manager.allocate(int(node.operand))
+                    else:
+                        self.memory_manager.free(node.operand)
+
+            # ``optimize;`` is honoured by the optimization phase of compile()
+            if type(statement) is not Optimize:
+                program.append(statement)
+
+        return program
+
+    # A top-level statement that calls a function forgets the values of the
+    # globals it may assign; all of them if the function is not declared yet
+    def forget_clobbered(self, statement):
+        effects = self.function_effects
+        if type(statement) is FnDef:
+            effects.add((statement,))
+            return
+        if not any(type(node) is Call for node in iter_nodes((statement,))):
+            return
+        if effects.unknown_call((statement,)):
+            self.values.clear()
+            return
+        for name in effects.clobbered:
+            self.values.pop(name, None)
+
+    # Compile-time values of the variables ``statements`` read that the
+    # optimizer can fold (numbers and booleans)
+    def known_constants(self, statements):
+        values = self.values
+        constants = {}
+        for node in walk(statements):
+            for field in ("value", "condition", "index"):
+                for name in names(getattr(node, field, None)):
+                    if name in values and type(values[name]) in (int, float, bool):
+                        constants[name] = values[name]
+        return dict(sorted(constants.items()))
+
+    # Evaluate a top-level store at compile time; a store inside a block or a
+    # value that is only known at run time leaves the variable without a value
+    def track_value(self, node, top_level):
+        if top_level:
+            try:
+                value = self.values[node.name] = evaluate(node.value, self.values)
+                return value
+            except EvaluationError:
+                pass
+        self.values.pop(node.name, None)
+        return None
+
+    # Run a declared task; ``quantum_operation`` and ``blockchain_transaction`` use the backends
+    def run_task(self, task):
+        if task == 'quantum_operation':
+            self.echo(self.quantum_processor.execute("qubit1", "h"))
+        elif task == 'blockchain_transaction':
+            self.echo(self.blockchain_processor.execute("transaction1"))
+
+    # Handle synchronous execution tasks (run on the scheduler's worker pool)
+    def execute_sync_task(self, task):
+        self.echo(f"Executing synchronization task: {task}")
+        if self.task_delay:
+            time.sleep(self.task_delay)
+        self.run_task(task)
+
+    # Handle asynchronous execution tasks (run on the scheduler's event loop)
+    async def execute_async_task(self, task):
+        self.echo(f"Executing asynchronous task: {task}")
+        if self.task_delay:
+            import asyncio
+            await asyncio.sleep(self.task_delay)  # Simulate time delay without holding a thread
+        self.run_task(task)
+
+    # Submit the tasks declared so far and wait for them; each task runs once
+    def run_pending_tasks(self):
+        tasks, self.pending_tasks = self.pending_tasks, []
+        if not tasks:
+            return
+        scheduler = self.scheduler
+        futures = [getattr(scheduler, submit)(func, task) for submit, func, task in tasks]
+        for future in futures:
+            future.result()
+
+    # Run ``task`` on ``nodes`` worker processes of the distributed scheduler
+    def deploy(self, task="Deploy Application", nodes=3):
+        self.distributed_scheduler.schedule_task(task, [Node(self.quiet) for _ in range(nodes)])
+
+    # Semantic Analysis: variables used by top-level declarations must be declared
+    def semantic_analysis(self, program):
+        errors = []
+        for node in program:
+            if type(node) is Let:
+                for name in names(node.value):
+                    if name not in self.symbol_table:
+                        errors.append(f"Semantic Error: line {node.line}: undefined variable {name}")
+        return errors
+
+    # Optimization phase: constant folding, copy propagation, CSE, dead code/store elimination
+    def optimize(self, program, effects=None, constants=None):
+        optimized_program = self.ai_optimizer.optimize(program, effects, constants)
+        self.optimizations.extend(str(report) for report in self.ai_optimizer.pass_manager.reports)
+        return optimized_program
+
+    # Code generation phase (converting program to intermediate machine-like code)
+    code_labels = {
+        Quantum: "Quantum Operation",
+        Blockchain: "Blockchain Transaction",
+        Let: "Declare Variable",
+        FnDef: "Define Function",
+        Sync: "Sync Task Scheduled",
+        Async: "Async Task Scheduled",
+    }
+
+    def generate_code(self, program):
+        executable_code = []
+        labels = self.code_labels
+        for node in walk(program):
+            node_type = type(node)
+            if node_type is MemoryOp:
+                if node.action == 'allocate':
+                    executable_code.append(f"Memory Allocation: {node}")
+                else:
+                    executable_code.append(f"Memory Deallocation: {node}")
+                continue
+            label = labels.get(node_type)
+            if label is not None:
+                executable_code.append(f"{label}: {node}")
+        return executable_code
+
+    # Compile HTS code to executable format; per-phase measurements go to ``compile_stats``.
+    # Returns None if semantic analysis finds errors.
+    def compile(self, code):
+        instrument = self.instrumentation
+        stats = instrument.start()
+        self.echo("Starting HTS Compilation...")
+
+        if self.cache is None:
+            # Step 1: Lexical Analysis
+            with instrument.phase(stats, "lex") as phase:
+                tokens = list(self.lex(code))
+            phase.items = stats.tokens = len(tokens)
+            self.echo("Lexical analysis completed.")
+
+            # Step 2: Syntax Analysis
+            with instrument.phase(stats, "parse") as phase:
+                program = self.parse(tokens)
+        else:
+            # Steps 1-2: reuse parsed top-level units from the compilation cache
+            with instrument.phase(stats, "parse") as phase:
+                units = []
+                for text, nodes in self.cache.units(code):
+                    # Known values of the variables the unit reads, before it runs
+                    constants = self.known_constants(nodes)
+                    units.append((text, self.declare(nodes), constants))
+                program = [node for _, nodes, _ in units for node in nodes]
+        phase.items = len(program)
+        stats.nodes = count_nodes(program)
+        self.echo("Syntax analysis completed.")
+
+        # Step 3: Semantic Analysis
+        with instrument.phase(stats, "semantic_analysis") as phase:
+            semantic_errors = self.semantic_errors = self.semantic_analysis(program)
+        phase.items = len(semantic_errors)
+        if semantic_errors:
+            self.echo("Semantic errors found:", semantic_errors)
+            self.pending_tasks = []
+            self.compile_stats = instrument.finish(stats)
+            return None
+
+        if self.cache is None:
+            # Step 4: Optimization
+            with instrument.phase(stats, "optimize") as phase:
+                optimized_program = self.optimize(program)
+            phase.items = len(optimized_program)
+            self.echo("Optimization completed.")
+
+            # Step 5: Code Generation
+            with instrument.phase(stats, "generate_code") as phase:
+                executable_code = self.generate_code(optimized_program)
+            phase.items = stats.lines = len(executable_code)
+        else:
+            # Steps 4-5: each top-level unit is optimized on its own, knowing
+            # the program's functions and the values of the variables it
+            # reads, so the code of unchanged units is reused
+            with instrument.phase(stats, "optimize") as phase:
+                effects = FunctionEffects(program)
+                executable_code = self.cache.code(
+                    code, units, effects.summary(),
+                    lambda statements, constants: self.generate_code(self.optimize(statements, effects, constants)),
+                )
+            phase.items = stats.lines = len(executable_code)
+            self.echo("Optimization completed.")
+        self.echo("Code generation completed.")
+
+        # Step 6: Execute the declared sync and async tasks
+        if self.pending_tasks:
+            with instrument.phase(stats, "tasks") as phase:
+                phase.items = len(self.pending_tasks)
+                self.run_pending_tasks()
+            self.echo("Execution completed.")
+
+        self.compile_stats = instrument.finish(stats)
+        return executable_code
+
+    # Execute HTS code on the register-based HTS virtual machine; with an
+    # hts.jit.JIT, hot functions are compiled to Python code (tiered execution)
+    def execute(self, code, jit=None):
+        from hts.bytecode import compile_program
+        from hts.vm import VM
+        vm = VM(effects={
+            Quantum: lambda node: self.quantum_processor.execute(node.qubit, node.operation),
+            Blockchain: lambda node: self.blockchain_processor.execute(node.transaction),
+        }, jit=jit)
+        if self.cache is None:
+            program = compile_program(self.parse(self.lex(code)))
+        else:
+            self.declare(self.cache.parse(code))
+            program = self.cache.program(code)
+        vm.run(program)
+        return vm
+
+    # Bounded-memory compile of a source file; code is written to ``sink`` as it is generated.
+    # Per-phase measurements, summed over the batches, go to ``compile_stats``.
+    # Returns None if semantic analysis finds errors, as compile() does.
+    def compile_file(self, path, sink):
+        instrument = self.instrumentation
+        stats = instrument.start()
+        measure = partial(instrument.phase, stats)
+        # Batches are optimized one at a time; functions of later batches are not known yet
+        effects = FunctionEffects(complete=False)
+        reports = len(self.optimizations)
+        # Declarations reading variables no batch has declared yet; compile()
+        # checks against the whole program, so a later batch may still declare them
+        unresolved = []
+
+        def declare(batch):
+            with measure("parse") as phase:
+                program = self.declare(batch)
+            phase.items = (phase.items or 0) + len(program)
+            stats.nodes = (stats.nodes or 0) + count_nodes(program)
+            with measure("semantic_analysis"):
+                if self.semantic_analysis(program):
+                    unresolved.extend(node for node in program if self.semantic_analysis((node,)))
+            return program
+
+        def optimize(program):
+            with measure("optimize") as phase:
+                optimized_program = self.optimize(program, effects)
+            phase.items = (phase.items or 0) + len(optimized_program)
+            return optimized_program
+
+        def generate(program):
+            with measure("generate_code") as phase:
+                executable_code = self.generate_code(program)
+            phase.items = (phase.items or 0) + len(executable_code)
+            # As compile() does, run the tasks the batch declared; only the
+            # latest batch's optimization reports are kept
+            if self.pending_tasks:
+                with measure("tasks") as phase:
+                    phase.items = (phase.items or 0) + len(self.pending_tasks)
+                    self.run_pending_tasks()
+            del self.optimizations[reports:-len(self.ai_optimizer.pass_manager.passes) or None]
+            return executable_code
+
+        self.echo("Starting HTS Compilation...")
+        try:
+            stats.lines = pipeline.compile_file(path, sink, declare, optimize, generate, measure=measure)
+        finally:
+            self.pending_tasks = []
+
+        with measure("semantic_analysis") as phase:
+            semantic_errors = self.semantic_errors = self.semantic_analysis(unresolved)
+        phase.items = len(semantic_errors)
+        self.compile_stats = instrument.finish(stats)
+        if semantic_errors:
+            self.echo("Semantic errors found:", semantic_errors)
+            return None
+        self.echo("Code generation completed.")
+        return stats.lines
+
+    # Stop the worker threads and processes of the backends that were started
+    def close(self):
+        if "scheduler" in self.__dict__:
+            self.scheduler.shutdown()
+            del self.scheduler
+        if "distributed_scheduler" in self.__dict__:
+            self.distributed_scheduler.close()
+        if "blockchain_processor" in self.__dict__:
+            self.blockchain_processor.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
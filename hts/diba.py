@@ -0,0 +1,362 @@
+"""D.I.B.A. runtime: the HTS program runner of "HTS Framework with DIBA.py".
+
+``HTSCompiler`` here runs programs, not source files: flat line lists,
+block scripts in the ``Syntax.hts`` language (``hts.dsl``) or compiled
+plans, on an asyncio event loop or a virtual clock.  Task inference goes
+through the ``DIBA_rules`` rule engine.
+"""
+import asyncio
+import random
+from collections import deque
+from functools import partial
+from queue import Queue
+
+from hts.dsl import Plan, PlanCache, run_steps
+from hts.inference import RuleEngine
+from hts.logs import DEBUG, DEFAULT_CAPACITY, INFO, WARNING, Logger, open_writer
+from hts.simulation import simulate as simulate_program
+
+# Utility functions
+# D.I.B.A. rules, dispatched by task name; ``reads`` lists the context fields a
+# rule depends on, so its result is memoized until one of them changes
+DIBA_rules = RuleEngine()
+
+@DIBA_rules.rule("MonitorSystemState", reads=("system_state",))
+def infer_monitor_system_state(task, context):
+    return f"System state: {context['system_state']}"
+
+@DIBA_rules.rule("LoadBalancerDecision", reads=())
+def infer_load_balancer_decision(task, context):
+    return "Balancing load based on system state analysis."
+
+@DIBA_rules.rule("PredictiveModelTraining", reads=())
+def infer_predictive_model_training(task, context):
+    return "Training predictive model with current data."
+
+@DIBA_rules.rule("QuantumValidation", reads=("transaction_id",))
+def infer_quantum_validation(task, context):
+    return f"Validating transaction {context['transaction_id']} using Quantum Blockchain."
+
+@DIBA_rules.rule("GeneticOptimization", reads=())
+def infer_genetic_optimization(task, context):
+    return "Optimizing system parameters using genetic algorithms."
+
+@DIBA_rules.rule("FPGAAcceleration", reads=())
+def infer_fpga_acceleration(task, context):
+    return "Accelerating computation using FPGA hardware."
+
+def DIBA_infer_task(task, context):
+    """Direct Inference-Based Abstraction to infer task execution based on context"""
+    return DIBA_rules.infer(task, context)
+
+# System state fields read by MONITOR in scripts
+SENSORS = {"SystemLoad": "load", "Temperature": "temperature"}
+
+# HTS Compiler Class
+class HTSCompiler:
+    def __init__(self, task_delay=1.0, echo=True, seed=None, log_level=INFO, log_file=None,
+                 log_capacity=DEFAULT_CAPACITY):
+        self.task_delay = task_delay  # Simulated execution time of one task, in seconds
+        self.echo = echo
+        self.random = random.Random(seed)  # Drives state changes and predictions
+        # Console and file output are written in batches by background threads
+        writers = [open_writer()] if echo else []
+        if log_file is not None:
+            writers.append(open_writer(log_file))
+        self.logger = Logger("diba", log_level, log_capacity, writers)
+        self.trace = deque(maxlen=log_capacity)  # (seconds since the run started, message)
+        self._started = None
+        self.tasks_completed = 0
+        self.autonomous_agents = []
+        self.diagnostics = {}
+        self.system_state = {"temperature": 20, "load": 50}  # Example system state
+        self.transaction_id = "TxID"  # Simulated transaction ID
+        self.controls = {}  # Settings changed by UPDATE SYSTEM in scripts
+        self.tasks_queue = Queue()
+        # Most recent log records and completed tasks only
+        self.data = {"system_logs": self.logger.records, "tasks_completed": deque(maxlen=log_capacity)}
+
+    def log(self, message, level=INFO, **fields):
+        if level < self.logger.level:
+            return
+        if self._started is not None:
+            self.trace.append((asyncio.get_running_loop().time() - self._started, message))
+        self.logger.log(level, message, **fields)
+
+    def context(self):
+        return {"system_state": self.system_state, "transaction_id": self.transaction_id}
+
+    def infer(self, task, context):
+        # D.I.B.A. inference, counted per compiler
+        self.diagnostics["inferences"] = self.diagnostics.get("inferences", 0) + 1
+        return DIBA_infer_task(task, context)
+
+    async def execute_task(self, task, context):
+        # Inference-based execution of the task
+        inferred_task = self.infer(task, context)
+        self.log(f"Executing task: {inferred_task}")
+        self.data["tasks_completed"].append(inferred_task)
+        self.tasks_completed += 1
+        await asyncio.sleep(self.task_delay)  # Simulate execution delay
+
+    def monitor_state(self):
+        # Simulate system state changes for testing
+        self.system_state["temperature"] += self.random.randint(-1, 2)
+        self.system_state["load"] += self.random.randint(-2, 2)
+
+    def check_conditions(self, condition, context):
+        # Direct Inference Logic for checking conditions dynamically
+        if condition == "SystemIdle":
+            return context["system_state"]["load"] < 20
+        elif condition == "HighTemperature":
+            return context["system_state"]["temperature"] > 100
+        return False
+
+    async def apply_autonomous_logic(self, agent, context):
+        # Example of applying logic to autonomous agents
+        if agent["task"] == "LoadBalancer":
+            if context["system_state"]["load"] > 80:
+                await self.allocate_task("HeavyTask", "NodeB", context)
+            else:
+                await self.allocate_task("LightTask", "NodeA", context)
+            self.log(f"Autonomous agent {agent['name']} completed task allocation.")
+
+    async def allocate_task(self, task, node, context):
+        # Inference for task allocation
+        inferred_task = self.infer(task, context)
+        self.tasks_queue.put(f"Allocate {task} to {node}")
+        await self.execute_task(f"Allocate {task} to {node}", context)
+
+    def train_neural_network(self, data_set, context):
+        # Inference-based neural network training
+        task_inference = self.infer("PredictiveModelTraining", context)
+        self.log(task_inference)
+        return "TrainedModel"
+
+    def quantum_validation(self, context):
+        # Quantum Blockchain validation using inferred task logic
+        task_inference = self.infer("QuantumValidation", context)
+        self.log(task_inference)
+        return True  # Simulated validation
+
+    def genetic_algorithm(self, population, generations, context, fitness="FitnessFunction"):
+        # Genetic algorithm optimization based on D.I.B.A.: evolves a weighting
+        # of the candidates, scored by the EVOLVE fitness function against a
+        # simulated measurement of each, and returns the heaviest candidate
+        from hts.genetic import FITNESS_FUNCTIONS, GeneticAlgorithm, variant_fitness
+        import numpy as np
+        task_inference = self.infer("GeneticOptimization", context)
+        self.log(task_inference)
+        scores = np.array([self.random.random() for _ in population])  # Simulated measurements
+        engine = GeneticAlgorithm(partial(FITNESS_FUNCTIONS.get(fitness, variant_fitness), scores=scores),
+                                  len(population), size=max(32, 4 * len(population)), patience=10,
+                                  seed=self.random.getrandbits(32))
+        weights, _ = engine.run(generations)
+        stats = engine.stats
+        self.diagnostics["evaluations"] = self.diagnostics.get("evaluations", 0) + stats.evaluations
+        self.log(f"Evolved {stats.generations} generations ({stats.stopped}): {stats.evaluations} evaluations")
+        # Wall-clock rate: logged, but kept out of the trace so that seeded runs trace alike
+        self.logger.log(DEBUG, f"{stats.evaluations_per_second:,.0f} evaluations/s",
+                        evaluations_per_second=stats.evaluations_per_second)
+        best_solution = population[int(np.argmax(weights))]
+        return best_solution
+
+    def fpga_acceleration(self, task, context):
+        # FPGA optimization inferred from context
+        task_inference = self.infer("FPGAAcceleration", context)
+        self.log(task_inference)
+        return f"{task} executed on FPGA"
+
+    def run(self, program, simulate=False):
+        # Drive one program on its own event loop; with ``simulate`` the loop
+        # runs on a virtual clock, so waits and task delays take no real time
+        if simulate:
+            return simulate_program(self.run_async(program))
+        return asyncio.run(self.run_async(program))
+
+    def run_file(self, path, simulate=False):
+        # Run an .hts script such as Syntax.hts
+        with open(path) as handle:
+            return self.run(handle.read(), simulate)
+
+    def load(self, source):
+        # Compiled plan of script ``source``; compiled once per distinct source
+        # and shared by every compiler instance
+        return self.plans.plan(source)
+
+    async def run_async(self, program):
+        # ``program`` is script source, a compiled ``Plan`` or a list of lines.
+        # Returns the number of tasks the program completed.
+        if isinstance(program, str):
+            program = self.load(program)
+        completed = self.tasks_completed
+        self._started = asyncio.get_running_loop().time()
+        self.trace.clear()
+        if type(program) is Plan:
+            await self.run_plan(program)
+        else:
+            await self.run_lines(program)
+        self.finalize()
+        self._started = None
+        return self.tasks_completed - completed
+
+    async def run_plan(self, plan):
+        # Sequential steps (WAIT) hold back the ones after them; every other
+        # top-level statement runs as its own asyncio task
+        env = {}
+        running = []
+        for handler, args, sequential in plan.steps:
+            if sequential:
+                await handler(self, env, *args)
+            else:
+                running.append(asyncio.create_task(handler(self, env, *args)))
+        await asyncio.gather(*running)
+
+    async def run_lines(self, program):
+        # WAIT holds back the lines after it; every other line runs as its own
+        # asyncio task, so agents and tasks of one program proceed concurrently
+        running = []
+        for line in program:
+            context = self.context()
+
+            # Temporal logic example: wait
+            if line.startswith("WAIT"):
+                wait_time = float(line.split()[1].replace("s", ""))
+                self.log(f"Waiting for {wait_time:g} seconds...")
+                await asyncio.sleep(wait_time)
+                self.monitor_state()
+            else:
+                running.append(asyncio.create_task(self.run_line(line, context)))
+
+        await asyncio.gather(*running)
+
+    async def run_line(self, line, context):
+        # Execute autonomous systems or task allocation logic
+        if line.startswith("AUTONOMOUS_AGENT"):
+            # AUTONOMOUS_AGENT <name> [... <task>]; the task defaults to the name
+            words = line.split()
+            agent_name = words[1]
+            agent_task = words[3] if len(words) > 3 else agent_name
+            self.autonomous_agents.append({"name": agent_name, "task": agent_task})
+            await self.apply_autonomous_logic(self.autonomous_agents[-1], context)
+
+        # Neural network predictions and actions
+        elif line.startswith("NEURAL_NET"):
+            data_set = "DataSetA"  # Placeholder for actual data set
+            model = self.train_neural_network(data_set, context)
+            prediction = self.random.choice(["Failure", "Success"])  # Simulated prediction
+            if prediction == "Failure":
+                await self.execute_task("PreemptiveShutdown", context)
+
+        # Quantum blockchain validation
+        elif line.startswith("BLOCKCHAIN"):
+            valid = self.quantum_validation(context)
+            if valid:
+                await self.execute_task("StoreData in Blockchain", context)
+
+        # Genetic algorithm
+        elif line.startswith("GENETIC_ALGORITHM"):
+            population = ["CodeVariant1", "CodeVariant2", "CodeVariant3"]
+            best_solution = self.genetic_algorithm(population, generations=100, context=context)
+            await self.execute_task(f"Execute {best_solution}", context)
+
+        # FPGA task acceleration
+        elif line.startswith("FPGA_OPTIMIZE"):
+            task = "ComputationTask"
+            result = self.fpga_acceleration(task, context)
+            self.log(result)
+
+        # Default case: executing generic tasks
+        else:
+            await self.execute_task(line, context)
+
+    # Script handlers: ``await handler(self, env, *args)`` with the arguments
+    # compiled into the plan; ``env`` holds the names a block has bound
+
+    async def script_wait(self, env, seconds, clauses):
+        self.log(f"Waiting for {seconds:g} seconds...")
+        await asyncio.sleep(seconds)
+        self.monitor_state()
+
+    async def script_execute(self, env, task, clauses):
+        context = self.context()
+        if "USING" in clauses:
+            # EXECUTE "Prediction" USING "Model" binds the model's prediction
+            env[task] = self.random.choice(["SystemFailure", "Success"])  # Simulated prediction
+            self.log(f"{task} using {clauses['USING']}: {env[task]}")
+        elif clauses.get("ON") == "FPGA":
+            env[task] = self.fpga_acceleration(env.get("FPGA", task), context)
+            self.log(env[task])
+        else:
+            # A bound name (e.g. BestSolution) executes its value
+            value = env.get(task)
+            await self.execute_task(task if value is None else f"Execute {value}", context)
+
+    async def script_monitor(self, env, name, clauses):
+        env[name] = self.system_state.get(SENSORS.get(name, name))
+        source = f" from {clauses['FROM']}" if "FROM" in clauses else ""
+        self.log(f"Monitoring {name}{source}: {env[name]}")
+
+    async def script_allocate(self, env, task, clauses):
+        await self.allocate_task(task, clauses.get("TO", "AnyNode"), self.context())
+
+    async def script_alert(self, env, message, clauses):
+        self.log(f"ALERT: {message}", WARNING)
+
+    async def script_update(self, env, target, clauses):
+        target = clauses.get("SYSTEM", target)
+        self.controls[target] = clauses.get("TO")
+        self.log(f"Updating {target} to {self.controls[target]}")
+
+    async def script_train(self, env, data_set, clauses):
+        model = self.train_neural_network(data_set, self.context())
+        env[model] = data_set
+
+    async def script_verify(self, env, transaction, clauses):
+        self.transaction_id = transaction
+        env["VERIFY"] = self.quantum_validation(self.context())
+
+    async def script_population(self, env, name, clauses):
+        size = clauses.get("SIZE", 3)
+        env["POPULATION"] = env[name] = [f"{name.rstrip('s')}{index}" for index in range(1, size + 1)]
+
+    async def script_evolve(self, env, fitness, clauses):
+        population = env.get("POPULATION") or ["CodeVariant1", "CodeVariant2", "CodeVariant3"]
+        env["BestSolution"] = self.genetic_algorithm(population, clauses.get("OVER", 100), self.context(), fitness)
+
+    async def script_load(self, env, task, clauses):
+        target = clauses.get("INTO", "FPGA")
+        env[target] = task
+        self.log(f"Loading {task} into {target}")
+
+    async def script_return(self, env, name, clauses):
+        env["RETURN"] = env.get(name, name)
+        self.log(f"Returning {name}")
+
+    async def script_agent(self, env, name, body):
+        self.autonomous_agents.append({"name": name, "task": name})
+        await run_steps(body, self, dict(env))
+        self.log(f"Autonomous agent {name} completed task allocation.")
+
+    async def script_block(self, env, name, body, kind):
+        self.log(f"Running {kind} {name}")
+        await run_steps(body, self, dict(env))
+
+    script_handlers = {
+        "WAIT": script_wait, "EXECUTE": script_execute, "MONITOR": script_monitor,
+        "ALLOCATE_TASK": script_allocate, "ALERT": script_alert, "UPDATE": script_update,
+        "TRAIN": script_train, "VERIFY_TRANSACTION": script_verify,
+        "INITIALIZE_POPULATION": script_population, "EVOLVE": script_evolve,
+        "LOAD": script_load, "RETURN": script_return, "AUTONOMOUS_AGENT": script_agent,
+    }
+    for kind in ("DIGITAL_TWIN", "NEURAL_NET", "BLOCKCHAIN", "GENETIC_ALGORITHM", "FPGA_OPTIMIZE"):
+        script_handlers[kind] = partial(script_block, kind=kind)
+    del kind
+    plans = PlanCache(script_handlers)
+
+    def finalize(self):
+        self.log("HTS Program Execution Completed.")
+        self.log(f"System Logs: {self.logger.emitted} messages, last {len(self.data['system_logs'])} kept")
+        self.log(f"Tasks Completed: {self.tasks_completed}")
+        self.log(f"Diagnostics: {self.diagnostics}")
+        self.logger.flush()
@@ -0,0 +1,385 @@
+"""Local worker nodes for ``DistributedScheduler``.
+
+A ``Cluster`` starts one process per node and talks to each over a duplex
+``multiprocessing`` pipe.  Every node has its own task deque; a node asks
+for work from the front of its deque and, once that is empty, steals from
+the back of the longest other deque, so a skewed partition evens out while
+it runs.  At most ``prefetch`` tasks per node are in the pipe at a time; the
+rest stay stealable.  Tasks submitted with an explicit ``node`` are pinned
+to it and never stolen.
+
+Workers send a heartbeat every ``heartbeat`` seconds from a side thread,
+also while a task is running.  A node whose process exits, whose pipe
+breaks or which stays silent for ``timeout`` seconds is declared lost: its
+process is killed, a replacement is started and its tasks are requeued.  A
+task that raises, or whose node is lost, is retried on another node up to
+``retries`` times before its future fails.
+
+Functions and arguments are pickled, so they must be defined at module
+level.
+"""
+import multiprocessing
+import os
+import threading
+import time
+import traceback
+from collections import deque
+from concurrent.futures import Future
+from multiprocessing.connection import wait
+
+HEARTBEAT_INTERVAL = 0.5
+HEARTBEAT_TIMEOUT = 5.0
+DEFAULT_RETRIES = 2
+DEFAULT_PREFETCH = 2
+
+
+class RemoteError(Exception):
+    """Traceback of an exception raised in a worker, chained as ``__cause__``."""
+
+
+class NodeLost(RuntimeError):
+    pass
+
+
+def _worker_main(conn, interval, inherited=()):
+    # A forked worker inherits the coordinator's end of its own pipe and of
+    # every earlier one; holding them open would hide the coordinator's exit
+    for other in inherited:
+        other.close()
+    lock = threading.Lock()
+
+    def send(message):
+        with lock:
+            conn.send(message)
+
+    def beat():
+        ticker = threading.Event()
+        while not ticker.wait(interval):
+            try:
+                send(("heartbeat",))
+            except (OSError, EOFError):
+                return
+
+    threading.Thread(target=beat, daemon=True).start()
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            return
+        if message is None:
+            return
+        task_id, func, args = message
+        try:
+            reply = ("done", task_id, True, func(*args))
+        except BaseException as exc:
+            reply = ("done", task_id, False, (exc, traceback.format_exc()))
+        try:
+            send(reply)
+        except (OSError, EOFError):
+            return
+        except Exception as exc:
+            # Result or exception could not be pickled
+            send(("done", task_id, False, (None, f"{type(exc).__name__}: {exc}")))
+
+
+def _run_chunk(func, chunk):
+    return [func(item) for item in chunk]
+
+
+def partition(items, parts):
+    """Split ``items`` into at most ``parts`` contiguous chunks of near-equal length."""
+    items = list(items)
+    parts = max(1, min(parts, len(items)))
+    size, extra = divmod(len(items), parts)
+    chunks, start = [], 0
+    for index in range(parts):
+        end = start + size + (index < extra)
+        chunks.append(items[start:end])
+        start = end
+    return chunks
+
+
+class _Task:
+    __slots__ = ("id", "func", "args", "future", "pinned", "attempts", "last_node")
+
+    def __init__(self, task_id, func, args, pinned):
+        self.id = task_id
+        self.func = func
+        self.args = args
+        self.future = Future()
+        self.pinned = pinned
+        self.attempts = 0
+        self.last_node = None
+
+
+class WorkerNode:
+    __slots__ = ("index", "process", "conn", "pinned", "queue", "running", "last_seen",
+                 "alive", "completed", "failed", "stolen")
+
+    def __init__(self, index, context, interval, inherited=()):
+        parent, child = context.Pipe()
+        self.index = index
+        self.process = context.Process(target=_worker_main,
+                                       args=(child, interval, (parent, *inherited)),
+                                       name=f"hts-node-{index}", daemon=True)
+        self.process.start()
+        child.close()
+        self.conn = parent
+        self.pinned = deque()
+        self.queue = deque()
+        # task id -> _Task sent to the worker and not yet answered
+        self.running = {}
+        self.last_seen = time.monotonic()
+        self.alive = True
+        self.completed = self.failed = self.stolen = 0
+
+    @property
+    def load(self):
+        return len(self.pinned) + len(self.queue) + len(self.running)
+
+    def as_dict(self):
+        return {
+            "index": self.index, "pid": self.process.pid, "alive": self.alive,
+            "queued": len(self.pinned) + len(self.queue), "running": len(self.running),
+            "completed": self.completed, "failed": self.failed, "stolen": self.stolen,
+        }
+
+    def __repr__(self):
+        return f"<WorkerNode {self.index} pid={self.process.pid}>"
+
+
+class Cluster:
+    def __init__(self, nodes=None, retries=DEFAULT_RETRIES, prefetch=DEFAULT_PREFETCH,
+                 heartbeat=HEARTBEAT_INTERVAL, timeout=HEARTBEAT_TIMEOUT, steal=True,
+                 context=None):
+        self.retries = retries
+        self.prefetch = prefetch
+        self.heartbeat = heartbeat
+        self.timeout = timeout
+        self.steal = steal
+        self.context = context or multiprocessing.get_context()
+        self._wake_reader, self._wake_writer = self.context.Pipe(duplex=False)
+        self.nodes = []
+        for index in range(nodes or os.cpu_count() or 1):
+            self.nodes.append(WorkerNode(index, self.context, heartbeat, self._inherited()))
+        self.retried = 0
+        self.lost = 0
+        self._next_id = 0
+        self._outstanding = 0
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._closing = False
+        self._dispatcher = threading.Thread(target=self._loop, name="hts-cluster", daemon=True)
+        self._dispatcher.start()
+
+    # Submission
+
+    def submit(self, func, *args, node=None):
+        """Queue ``func(*args)``; ``node`` pins the task to that node index."""
+        with self._lock:
+            if self._closing:
+                raise RuntimeError("cannot submit to a closed cluster")
+            task = _Task(self._next_id, func, args, node is not None)
+            self._next_id += 1
+            self._outstanding += 1
+            if node is None:
+                self._place(task)
+            else:
+                self.nodes[node % len(self.nodes)].pinned.append(task)
+        self._wake()
+        return task.future
+
+    def map(self, func, items, chunksize=None):
+        """``func`` over ``items`` partitioned into chunks across the nodes; results in order."""
+        items = list(items)
+        if not items:
+            return []
+        if chunksize is None:
+            parts = 4 * len(self.nodes)
+        else:
+            parts = -(-len(items) // chunksize)
+        futures = [self.submit(_run_chunk, func, chunk) for chunk in partition(items, parts)]
+        return [result for future in futures for result in future.result()]
+
+    def wait(self):
+        """Block until every submitted task has finished."""
+        with self._idle:
+            while self._outstanding:
+                self._idle.wait()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "nodes": [node.as_dict() for node in self.nodes],
+                "retried": self.retried, "lost": self.lost,
+            }
+
+    def close(self, wait=True):
+        if wait:
+            self.wait()
+        with self._lock:
+            self._closing = True
+        self._wake()
+        self._dispatcher.join()
+        with self._lock:
+            error = RuntimeError("cluster closed before the task ran")
+            for node in self.nodes:
+                for task in (*node.pinned, *node.queue, *node.running.values()):
+                    self._finish(task, error)
+                node.pinned.clear()
+                node.queue.clear()
+                node.running.clear()
+        for node in self.nodes:
+            if node.alive:
+                try:
+                    node.conn.send(None)
+                except OSError:
+                    pass
+        for node in self.nodes:
+            node.process.join(1)
+            if node.process.is_alive():
+                node.process.kill()
+                node.process.join()
+            node.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # Dispatcher; everything below runs under ``self._lock``
+
+    def _inherited(self):
+        return [self._wake_reader, self._wake_writer,
+                *(node.conn for node in self.nodes if node.alive)]
+
+    def _wake(self):
+        try:
+            self._wake_writer.send_bytes(b"")
+        except OSError:
+            pass
+
+    def _place(self, task, avoid=None):
+        candidates = [node for node in self.nodes if node.alive and node.index != avoid]
+        if not candidates:
+            candidates = [node for node in self.nodes if node.alive]
+        min(candidates, key=lambda node: node.load).queue.append(task)
+
+    def _next_task(self, node):
+        if node.pinned:
+            return node.pinned.popleft()
+        if node.queue:
+            return node.queue.popleft()
+        if not self.steal:
+            return None
+        victim = max(self.nodes, key=lambda other: len(other.queue))
+        if not victim.queue:
+            return None
+        node.stolen += 1
+        return victim.queue.pop()
+
+    def _dispatch(self):
+        for node in self.nodes:
+            while node.alive and len(node.running) < self.prefetch:
+                task = self._next_task(node)
+                if task is None:
+                    break
+                task.attempts += 1
+                task.last_node = node.index
+                node.running[task.id] = task
+                try:
+                    node.conn.send((task.id, task.func, task.args))
+                except OSError:
+                    self._lose(node)
+                except Exception as exc:
+                    # Function or arguments could not be pickled; retrying cannot help
+                    del node.running[task.id]
+                    self._finish(task, exc)
+
+    def _finish(self, task, error=None, result=None):
+        if error is None:
+            task.future.set_result(result)
+        else:
+            task.future.set_exception(error)
+        self._outstanding -= 1
+        if not self._outstanding:
+            self._idle.notify_all()
+
+    def _retry(self, task, error):
+        if task.attempts > self.retries:
+            self._finish(task, error)
+            return
+        self.retried += 1
+        if task.pinned:
+            self.nodes[task.last_node].pinned.append(task)
+        else:
+            self._place(task, avoid=task.last_node)
+
+    def _lose(self, node):
+        node.alive = False
+        self.lost += 1
+        node.process.kill()
+        node.conn.close()
+        replacement = WorkerNode(node.index, self.context, self.heartbeat, self._inherited())
+        replacement.completed, replacement.failed, replacement.stolen = (
+            node.completed, node.failed, node.stolen)
+        self.nodes[node.index] = replacement
+        replacement.pinned.extend(node.pinned)
+        for task in node.queue:
+            self._place(task)
+        error = NodeLost(f"node {node.index} (pid {node.process.pid}) was lost")
+        for task in node.running.values():
+            self._retry(task, error)
+
+    def _receive(self, node):
+        while node.alive:
+            try:
+                if not node.conn.poll():
+                    return
+                message = node.conn.recv()
+            except (EOFError, OSError):
+                self._lose(node)
+                return
+            node.last_seen = time.monotonic()
+            if message[0] != "done":
+                continue
+            _, task_id, ok, value = message
+            task = node.running.pop(task_id)
+            if ok:
+                node.completed += 1
+                self._finish(task, result=value)
+                continue
+            node.failed += 1
+            error, text = value
+            if error is None:
+                error = RemoteError(text)
+            else:
+                error.__cause__ = RemoteError(text)
+            self._retry(task, error)
+
+    def _loop(self):
+        while True:
+            with self._lock:
+                if self._closing:
+                    return
+                self._dispatch()
+                waitables = {self._wake_reader: None}
+                for node in self.nodes:
+                    if node.alive:
+                        waitables[node.conn] = node
+                        waitables[node.process.sentinel] = node
+            ready = wait(list(waitables), timeout=self.heartbeat)
+            with self._lock:
+                if self._wake_reader in ready:
+                    while self._wake_reader.poll():
+                        self._wake_reader.recv_bytes()
+                now = time.monotonic()
+                for node in list(self.nodes):
+                    if not node.alive:
+                        continue
+                    if node.conn in ready:
+                        self._receive(node)
+                    if node.alive and (node.process.sentinel in ready
+                                       or now - node.last_seen > self.timeout):
+                        self._lose(node)
@@ -0,0 +1,422 @@
+"""The indentation-structured HTS script language of ``Syntax.hts``.
+
+A script is a sequence of commands (``EXECUTE "InitializeSystem"``) and of
+blocks such as ``AUTONOMOUS_AGENT "LoadBalancer":`` whose indented body
+holds more commands and ``IF <condition> THEN`` / ``ELSE`` branches.  A
+command is an upper-case word, an optional operand and any number of
+``KEYWORD [value]`` clauses, so ``ALLOCATE_TASK "HeavyTask" TO "NodeB"`` is
+``Command("ALLOCATE_TASK", "HeavyTask", (("TO", "NodeB"),))``.  Bare
+lower- or mixed-case words are names and mean the same as quoted ones,
+except in conditions, where they refer to values bound while the script
+runs (``IF SystemLoad > 80% THEN``).  Numbers may carry a unit: time units
+are converted to seconds, ``%`` and ``C`` are dropped.
+
+``parse`` turns source into a picklable syntax tree; ``compile_plan``
+resolves every command against a runtime's handler table once and returns
+a ``Plan`` of ``(handler, args)`` steps with pre-parsed arguments and
+conditions compiled to closures, so running it never looks at text again.
+``PlanCache`` keeps compiled plans by source digest.
+"""
+import hashlib
+import operator
+import re
+from collections import OrderedDict
+
+from hts.cache import CacheStats
+from hts.nodes import Node
+
+DEFAULT_PLAN_CACHE = 128
+
+TIME_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+COMPARISONS = {
+    "==": operator.eq, "!=": operator.ne, "<": operator.lt,
+    "<=": operator.le, ">": operator.gt, ">=": operator.ge,
+}
+LITERALS = {"TRUE": True, "FALSE": False}
+
+_TOKEN_RE = re.compile(r"""
+    \s*(?:
+        (?P<comment>\#.*)
+      | "(?P<string>(?:[^"\\]|\\.)*)"
+      | (?P<number>\d+(?:\.\d+)?)(?P<unit>[A-Za-z%]*)
+      | (?P<op>==|!=|<=|>=|<|>)
+      | (?P<word>[A-Za-z_][A-Za-z0-9_]*)
+      | (?P<colon>:)
+    )""", re.VERBOSE)
+
+
+class DSLError(SyntaxError):
+    pass
+
+
+# Syntax tree
+
+class Ref(Node):
+    __slots__ = _fields = ("name",)
+
+    def __str__(self):
+        return self.name
+
+
+class Compare(Node):
+    # ``op`` is a comparison operator, AND, OR or NOT (with ``right`` None)
+    __slots__ = _fields = ("op", "left", "right")
+
+    def __str__(self):
+        if self.op == "NOT":
+            return f"NOT {self.left}"
+        return f"{self.left} {self.op} {self.right}"
+
+
+class Command(Node):
+    # ``clauses`` is a tuple of (KEYWORD, value) pairs; a keyword without a value maps to True
+    __slots__ = _fields = ("op", "operand", "clauses")
+
+    def __str__(self):
+        words = [self.op] if self.operand is None else [self.op, repr(self.operand)]
+        for keyword, value in self.clauses:
+            words.append(keyword if value is True else f"{keyword} {value!r}")
+        return " ".join(words)
+
+
+class Block(Node):
+    __slots__ = _fields = ("kind", "name", "body")
+    _blocks = ("body",)
+
+    def __str__(self):
+        return f"{self.kind} {self.name!r}"
+
+
+class Branch(Node):
+    __slots__ = _fields = ("condition", "body", "orelse")
+    _blocks = ("body", "orelse")
+
+    def __str__(self):
+        return f"IF {self.condition}"
+
+
+# Parsing
+
+def _tokenize(text, number):
+    tokens = []
+    position = 0
+    end = len(text.rstrip())
+    while position < end:
+        match = _TOKEN_RE.match(text, position)
+        if match is None or match.end() == position:
+            raise DSLError(f"line {number}: unexpected {text[position:].strip()[:20]!r}")
+        position = match.end()
+        kind = match.lastgroup
+        if kind == "comment":
+            break
+        if kind == "string":
+            tokens.append(("value", match.group("string").replace('\\"', '"')))
+        elif kind == "unit":
+            value = float(match.group("number"))
+            unit = match.group("unit")
+            if unit in TIME_UNITS:
+                value *= TIME_UNITS[unit]
+            elif unit not in ("", "%", "C"):
+                raise DSLError(f"line {number}: unknown unit {unit!r}")
+            tokens.append(("value", int(value) if value.is_integer() else value))
+        elif kind == "word":
+            word = match.group("word")
+            if word in LITERALS:
+                tokens.append(("value", LITERALS[word]))
+            elif word.isupper():
+                tokens.append(("keyword", word))
+            else:
+                tokens.append(("name", word))
+        else:
+            tokens.append((kind, match.group(kind)))
+    return tokens
+
+
+class _Parser:
+    def __init__(self, source):
+        # (indent, line number, tokens) of every line with code on it
+        self.lines = []
+        for number, text in enumerate(source.splitlines(), 1):
+            text = text.expandtabs(4)
+            tokens = _tokenize(text, number)
+            if tokens:
+                self.lines.append((len(text) - len(text.lstrip()), number, tokens))
+        self.index = 0
+
+    def body(self, indent):
+        statements = []
+        while self.index < len(self.lines):
+            line_indent, number, tokens = self.lines[self.index]
+            if line_indent < indent:
+                break
+            if line_indent > indent:
+                raise DSLError(f"line {number}: unexpected indent")
+            self.index += 1
+            statements.append(self.statement(tokens, number, indent))
+        return tuple(statements)
+
+    def nested(self, indent, number):
+        if self.index == len(self.lines) or self.lines[self.index][0] <= indent:
+            raise DSLError(f"line {number}: expected an indented block")
+        return self.body(self.lines[self.index][0])
+
+    def statement(self, tokens, number, indent):
+        kind, word = tokens[0]
+        if kind != "keyword":
+            raise DSLError(f"line {number}: expected a command, got {word!r}")
+        if word == "IF":
+            return self.branch(tokens, number, indent)
+        if word == "ELSE":
+            raise DSLError(f"line {number}: ELSE without IF")
+        if tokens[-1][0] == "colon":
+            if len(tokens) != 3 or tokens[1][0] not in ("value", "name"):
+                raise DSLError(f'line {number}: expected {word} "<name>":')
+            return Block(word, tokens[1][1], self.nested(indent, number), line=number)
+        return self.command(tokens, number)
+
+    def command(self, tokens, number):
+        operand = None
+        position = 1
+        if position < len(tokens) and tokens[position][0] in ("value", "name"):
+            operand = tokens[position][1]
+            position += 1
+        clauses = []
+        while position < len(tokens):
+            kind, keyword = tokens[position]
+            if kind != "keyword":
+                raise DSLError(f"line {number}: unexpected {keyword!r} in {tokens[0][1]}")
+            position += 1
+            value = True
+            if position < len(tokens) and tokens[position][0] in ("value", "name"):
+                value = tokens[position][1]
+                position += 1
+            clauses.append((keyword, value))
+        return Command(tokens[0][1], operand, tuple(clauses), line=number)
+
+    def branch(self, tokens, number, indent):
+        try:
+            then = tokens.index(("keyword", "THEN"))
+        except ValueError:
+            raise DSLError(f"line {number}: IF without THEN") from None
+        condition = _Condition(tokens[1:then], number).parse()
+        if then + 1 < len(tokens):
+            # One-line form: IF <condition> THEN <command>
+            body = (self.statement(tokens[then + 1:], number, indent),)
+        else:
+            body = self.nested(indent, number)
+        orelse = ()
+        if self.index < len(self.lines):
+            line_indent, else_number, else_tokens = self.lines[self.index]
+            if line_indent == indent and else_tokens[0] == ("keyword", "ELSE"):
+                self.index += 1
+                if len(else_tokens) > 1:
+                    orelse = (self.statement(else_tokens[1:], else_number, indent),)
+                else:
+                    orelse = self.nested(indent, else_number)
+        return Branch(condition, body, orelse, line=number)
+
+
+class _Condition:
+    # Precedence climbing over OR < AND < NOT < comparison
+
+    def __init__(self, tokens, number):
+        self.tokens = tokens
+        self.number = number
+        self.position = 0
+
+    def parse(self):
+        if not self.tokens:
+            raise DSLError(f"line {self.number}: IF without a condition")
+        condition = self.either()
+        if self.position != len(self.tokens):
+            raise DSLError(f"line {self.number}: unexpected {self.tokens[self.position][1]!r} in condition")
+        return condition
+
+    def peek(self):
+        return self.tokens[self.position] if self.position < len(self.tokens) else (None, None)
+
+    def either(self):
+        left = self.both()
+        while self.peek() == ("keyword", "OR"):
+            self.position += 1
+            left = Compare("OR", left, self.both(), line=self.number)
+        return left
+
+    def both(self):
+        left = self.negation()
+        while self.peek() == ("keyword", "AND"):
+            self.position += 1
+            left = Compare("AND", left, self.negation(), line=self.number)
+        return left
+
+    def negation(self):
+        if self.peek() == ("keyword", "NOT"):
+            self.position += 1
+            return Compare("NOT", self.negation(), None, line=self.number)
+        left = self.operand()
+        kind, op = self.peek()
+        if kind == "op":
+            self.position += 1
+            return Compare(op, left, self.operand(), line=self.number)
+        return left
+
+    def operand(self):
+        kind, value = self.peek()
+        if kind is None:
+            raise DSLError(f"line {self.number}: condition ends early")
+        self.position += 1
+        if kind == "value":
+            return value
+        if kind in ("name", "keyword"):
+            return Ref(value, line=self.number)
+        raise DSLError(f"line {self.number}: unexpected {value!r} in condition")
+
+
+def parse(source):
+    """Syntax tree (a tuple of statements) of script ``source``."""
+    parser = _Parser(source)
+    statements = parser.body(0)
+    if parser.index != len(parser.lines):
+        raise DSLError(f"line {parser.lines[parser.index][1]}: unexpected indent")
+    return statements
+
+
+# Compilation
+
+def _compile_condition(condition):
+    # A function of the variable bindings
+    condition_type = type(condition)
+    if condition_type is Ref:
+        name = condition.name
+        line = condition.line
+
+        def lookup(env):
+            try:
+                return env[name]
+            except KeyError:
+                raise DSLError(f"line {line}: {name} is not bound in condition") from None
+        return lookup
+    if condition_type is not Compare:
+        return lambda env: condition
+    left = _compile_condition(condition.left)
+    if condition.op == "NOT":
+        return lambda env: not left(env)
+    right = _compile_condition(condition.right)
+    if condition.op == "AND":
+        return lambda env: left(env) and right(env)
+    if condition.op == "OR":
+        return lambda env: left(env) or right(env)
+    compare = COMPARISONS[condition.op]
+    if type(condition.right) is not Ref and type(condition.right) is not Compare:
+        constant = condition.right
+        return lambda env: compare(left(env), constant)
+    return lambda env: compare(left(env), right(env))
+
+
+async def run_steps(steps, runtime, env):
+    for handler, args in steps:
+        await handler(runtime, env, *args)
+
+
+async def _branch(runtime, env, test, body, orelse):
+    await run_steps(body if test(env) else orelse, runtime, env)
+
+
+class Plan:
+    """Compiled script: ``steps`` are ``(handler, args, sequential)`` triples.
+
+    A handler is called as ``await handler(runtime, env, *args)`` where
+    ``env`` holds the names bound so far.  A command's args are its operand
+    and a dict of its clauses, a block's are its name and compiled body.
+    """
+    __slots__ = ("steps", "statements", "digest")
+
+    def __init__(self, steps, statements, digest=None):
+        self.steps = steps
+        self.statements = statements
+        self.digest = digest
+
+    def __len__(self):
+        return len(self.steps)
+
+    def __repr__(self):
+        return f"<Plan {len(self.steps)} steps>"
+
+
+def _compile_steps(statements, handlers):
+    steps = []
+    for statement in statements:
+        statement_type = type(statement)
+        if statement_type is Branch:
+            steps.append((_branch, (_compile_condition(statement.condition),
+                                    _compile_steps(statement.body, handlers),
+                                    _compile_steps(statement.orelse, handlers))))
+            continue
+        op = statement.op if statement_type is Command else statement.kind
+        handler = handlers.get(op)
+        if handler is None:
+            raise DSLError(f"line {statement.line}: unknown {'command' if statement_type is Command else 'block'} {op!r}")
+        if statement_type is Command:
+            steps.append((handler, (statement.operand, dict(statement.clauses))))
+        else:
+            steps.append((handler, (statement.name, _compile_steps(statement.body, handlers))))
+    return tuple(steps)
+
+
+def compile_plan(statements, handlers, sequential=("WAIT",), digest=None):
+    """``Plan`` of parsed ``statements`` against ``handlers`` (op or block kind -> async function).
+
+    Top-level statements whose op is in ``sequential`` are awaited in turn;
+    the runtime may start every other top-level step concurrently.
+    """
+    steps = _compile_steps(statements, handlers)
+    flags = [type(statement) is Command and statement.op in sequential for statement in statements]
+    return Plan(tuple((handler, args, flag) for (handler, args), flag in zip(steps, flags)),
+                statements, digest)
+
+
+class PlanCache:
+    """Compiled plans for one handler table, least recently used evicted first.
+
+    ``store``, a ``CompileCache``, additionally keeps parsed scripts on disk.
+    """
+
+    def __init__(self, handlers, size=DEFAULT_PLAN_CACHE, sequential=("WAIT",), store=None):
+        self.handlers = handlers
+        self.size = size
+        self.sequential = sequential
+        self.store = store
+        self.stats = CacheStats()
+        self._plans = OrderedDict()
+
+    def plan(self, source):
+        digest = hashlib.sha256(source.encode()).hexdigest()
+        plan = self._plans.get(digest)
+        if plan is not None:
+            self._plans.move_to_end(digest)
+            self.stats.hits += 1
+            return plan
+        self.stats.misses += 1
+        statements = self._parse(source)
+        plan = self._plans[digest] = compile_plan(statements, self.handlers, self.sequential, digest)
+        self.stats.stores += 1
+        if len(self._plans) > self.size:
+            self._plans.popitem(last=False)
+            self.stats.evictions += 1
+        return plan
+
+    def _parse(self, source):
+        if self.store is None:
+            return parse(source)
+        key = self.store.key("script", source)
+        statements = self.store.get(key)
+        if statements is None:
+            statements = parse(source)
+            self.store.put(key, statements)
+        return statements
+
+    def clear(self):
+        self._plans.clear()
+
+    def __len__(self):
+        return len(self._plans)
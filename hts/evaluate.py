@@ -0,0 +1,117 @@
+"""Compile-time evaluation of HTS expressions.
+
+``compile_expression`` folds the constant parts of an expression
+(``hts.optimizer.fold``) and turns the rest into a tree of closures over
+the variable bindings, one closure per operator with its operator function
+and any literal operand bound in advance.  Evaluating the result is plain
+function calls: no node types are inspected and no text is looked at
+again, so an expression compiled once can be evaluated cheaply many times.
+``evaluate`` keeps the closures of the ``CACHE_SIZE`` most recently
+evaluated expression nodes.
+
+Only side-effect free builtins (``PURE_BUILTINS``) can be called; calls of
+HTS functions and reads of names without a value raise ``EvaluationError``,
+as do arithmetic and type errors.  Operators behave as in the VM, including
+C-style integer division and remainder.
+"""
+import operator
+from collections import OrderedDict
+
+from hts.nodes import BinOp, Call, Name, Num, UnaryOp
+from hts.optimizer import fold
+from hts.vm import _divide, _remainder
+
+OPERATORS = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "/": _divide,
+    "%": _remainder,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+
+
+# Builtins that can run at compile time; print cannot
+PURE_BUILTINS = {"abs": abs, "min": min, "max": max}
+
+
+# Compiled expressions kept by ``evaluate``
+CACHE_SIZE = 4096
+
+# id(expr) -> (expr, builtins, function), least recently used first; the
+# entry holds on to ``expr``, so its id is not reused while cached
+_compiled = OrderedDict()
+
+
+class EvaluationError(RuntimeError):
+    pass
+
+
+def _compile(expr, builtins):
+    # A function of the variable bindings
+    expr_type = type(expr)
+    if expr_type is Num:
+        value = expr.value
+        return lambda env: value
+    if expr_type is Name:
+        name = expr.id
+        line = expr.line
+
+        def load(env):
+            try:
+                return env[name]
+            except KeyError:
+                raise EvaluationError(f"line {line}: {name} has no compile-time value") from None
+        return load
+    if expr_type is BinOp:
+        op = OPERATORS[expr.op]
+        left = _compile(expr.left, builtins)
+        if type(expr.right) is Num:
+            constant = expr.right.value
+            return lambda env: op(left(env), constant)
+        right = _compile(expr.right, builtins)
+        return lambda env: op(left(env), right(env))
+    if expr_type is UnaryOp:
+        operand = _compile(expr.operand, builtins)
+        if expr.op == "-":
+            return lambda env: -operand(env)
+        return lambda env: not operand(env)
+    if expr_type is Call:
+        func = builtins.get(expr.func)
+        if func is None:
+            raise EvaluationError(f"line {expr.line}: {expr.func}() cannot be evaluated at compile time")
+        args = [_compile(arg, builtins) for arg in expr.args]
+        return lambda env: func(*[arg(env) for arg in args])
+    raise EvaluationError(f"line {expr.line}: cannot evaluate {expr!r}")
+
+
+def compile_expression(expr, builtins=None):
+    """Function of a name -> value mapping computing ``expr``."""
+    return _compile(fold(expr), PURE_BUILTINS if builtins is None else builtins)
+
+
+def evaluate(expr, env, builtins=None):
+    """Value of ``expr`` with the variables of ``env``; raises ``EvaluationError``."""
+    if type(expr) is Num:
+        return expr.value
+    key = id(expr)
+    entry = _compiled.get(key)
+    if entry is not None and entry[0] is expr and entry[1] is builtins:
+        _compiled.move_to_end(key)
+        function = entry[2]
+    else:
+        function = compile_expression(expr, builtins)
+        _compiled[key] = (expr, builtins, function)
+        if len(_compiled) > CACHE_SIZE:
+            _compiled.popitem(last=False)
+    try:
+        return function(env)
+    except ZeroDivisionError:
+        raise EvaluationError(f"line {expr.line}: division by zero") from None
+    except (ArithmeticError, TypeError) as exc:
+        raise EvaluationError(f"line {expr.line}: {exc}") from None
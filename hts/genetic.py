@@ -0,0 +1,165 @@
+"""Vectorized genetic algorithm behind ``GENETIC_ALGORITHM`` blocks.
+
+The population is a ``(size, genes)`` float matrix and every operator works
+on the whole of it at once: tournament selection is one fancy-indexing
+gather, uniform crossover one masked ``where`` over the paired halves and
+Gaussian mutation one masked add followed by a clip to ``bounds``.  The
+``elite`` best individuals survive unchanged and keep their scores, so
+only offspring are evaluated.
+
+A fitness function takes a matrix of individuals and returns one score per
+row; higher is better.  With a ``pool`` (a ``hts.distributed.Cluster``,
+e.g. ``hts.parallel.get_pool()``) the offspring are split into ``batches``
+row blocks evaluated on the workers, so the function must be picklable:
+defined at module level, or a ``functools.partial`` of one.  The run stops
+after ``generations``, once the best score reaches ``target``, or after
+``patience`` generations without an improvement of more than
+``tolerance``; ``stats`` reports why, and the evaluations per second.
+
+``FITNESS_FUNCTIONS`` maps the names scripts give to ``EVOLVE`` to fitness
+functions over variant weights (see ``hts.diba``).
+"""
+import time
+
+import numpy as np
+
+# EVOLVE name -> fitness function of (rows of variant weights, variant scores)
+FITNESS_FUNCTIONS = {}
+
+
+def variant_fitness(weights, scores):
+    """Score of each row of ``weights`` as a mixture of variants with measured ``scores``."""
+    total = weights.sum(axis=1)
+    return weights @ scores / np.where(total > 0, total, 1.0)
+
+
+FITNESS_FUNCTIONS["FitnessFunction"] = variant_fitness
+
+
+def _evaluate(fitness, batch):
+    return np.asarray(fitness(batch), dtype=np.float64)
+
+
+class GAStats:
+    __slots__ = ("generations", "evaluations", "seconds", "best", "stopped")
+
+    def __init__(self):
+        self.generations = self.evaluations = 0
+        self.seconds = 0.0
+        self.best = None
+        # "generations", "target" or "patience"
+        self.stopped = None
+
+    @property
+    def evaluations_per_second(self):
+        return self.evaluations / self.seconds if self.seconds else 0.0
+
+    def as_dict(self):
+        return {
+            "generations": self.generations, "evaluations": self.evaluations,
+            "seconds": self.seconds, "evaluations_per_second": self.evaluations_per_second,
+            "best": self.best, "stopped": self.stopped,
+        }
+
+    def __repr__(self):
+        return f"GAStats({self.as_dict()})"
+
+
+class GeneticAlgorithm:
+    def __init__(self, fitness, genes, size=100, bounds=(0.0, 1.0), tournament=3, crossover=0.9,
+                 mutation=None, sigma=0.1, elite=1, target=None, patience=None, tolerance=1e-12,
+                 pool=None, batches=None, seed=None):
+        if size < 2 or elite >= size:
+            raise ValueError(f"a population of {size} cannot keep {elite} elite individuals")
+        self.fitness = fitness
+        self.genes = genes
+        self.size = size
+        self.low, self.high = bounds
+        self.tournament = tournament
+        self.crossover = crossover
+        # Per-gene mutation probability; one gene per individual on average by default
+        self.mutation = 1.0 / genes if mutation is None else mutation
+        # Mutation step, as a fraction of the range of a gene
+        self.sigma = sigma * (self.high - self.low)
+        self.elite = elite
+        self.target = target
+        self.patience = patience
+        self.tolerance = tolerance
+        self.pool = pool
+        self.batches = batches
+        self.rng = np.random.default_rng(seed)
+        self.stats = GAStats()
+
+    def initialize(self):
+        """A population drawn uniformly from ``bounds``."""
+        return self.rng.uniform(self.low, self.high, (self.size, self.genes))
+
+    def evaluate(self, population):
+        """Fitness of every row of ``population``, in the caller or in batches on the pool."""
+        if self.pool is None:
+            scores = _evaluate(self.fitness, population)
+        else:
+            parts = self.batches or 4 * len(self.pool.nodes)
+            futures = [self.pool.submit(_evaluate, self.fitness, batch)
+                       for batch in np.array_split(population, min(parts, len(population)))]
+            scores = np.concatenate([future.result() for future in futures])
+        if scores.shape != (len(population),):
+            raise ValueError(f"fitness returned shape {scores.shape} for {len(population)} individuals")
+        self.stats.evaluations += len(population)
+        return scores
+
+    def select(self, population, scores, count):
+        """``count`` parents, each the fittest of ``tournament`` random individuals."""
+        contenders = self.rng.integers(0, len(population), (count, self.tournament))
+        winners = contenders[np.arange(count), np.argmax(scores[contenders], axis=1)]
+        return population[winners]
+
+    def recombine(self, parents):
+        """Uniform crossover of the first half of ``parents`` with the second."""
+        half = len(parents) // 2
+        first, second = parents[:half], parents[half:2 * half]
+        swap = self.rng.random(first.shape) < 0.5
+        swap &= (self.rng.random(half) < self.crossover)[:, None]
+        children = np.concatenate([np.where(swap, second, first), np.where(swap, first, second)])
+        if len(parents) % 2:
+            children = np.concatenate([children, parents[-1:]])
+        return children
+
+    def mutate(self, population):
+        """``population`` with Gaussian noise added to randomly chosen genes, clipped to ``bounds``."""
+        mask = self.rng.random(population.shape) < self.mutation
+        population = population + mask * self.rng.normal(0.0, self.sigma, population.shape)
+        return np.clip(population, self.low, self.high, out=population)
+
+    def run(self, generations=100, population=None):
+        """Evolve for up to ``generations``; returns the best individual and its score."""
+        self.stats = stats = GAStats()
+        start = time.perf_counter()
+        population = self.initialize() if population is None else np.array(population, dtype=np.float64)
+        scores = self.evaluate(population)
+        best_score = scores.max()
+        stale = 0
+        while True:
+            if self.target is not None and best_score >= self.target:
+                stats.stopped = "target"
+                break
+            if self.patience is not None and stale >= self.patience:
+                stats.stopped = "patience"
+                break
+            if stats.generations >= generations:
+                stats.stopped = "generations"
+                break
+            elite = np.argpartition(scores, -self.elite)[-self.elite:] if self.elite else []
+            offspring = self.mutate(self.recombine(self.select(population, scores, self.size - self.elite)))
+            population = np.concatenate([population[elite], offspring])
+            scores = np.concatenate([scores[elite], self.evaluate(offspring)])
+            stats.generations += 1
+            if scores.max() > best_score + self.tolerance:
+                stale = 0
+            else:
+                stale += 1
+            best_score = max(best_score, scores.max())
+        stats.seconds = time.perf_counter() - start
+        best = int(np.argmax(scores))
+        stats.best = float(scores[best])
+        return population[best], stats.best
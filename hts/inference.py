@@ -0,0 +1,161 @@
+"""Rule engine behind D.I.B.A. task inference.
+
+Rules are registered per task name and found with one dict lookup.  Each
+rule declares the context fields it reads, as top-level keys or dotted
+paths (``"system_state.load"``).  The engine memoizes results in an LRU
+keyed by the task and the current values of exactly those fields, so a
+rule runs again only when something it depends on has changed.  A rule
+registered without ``reads`` is never memoized.
+
+Tasks without a rule go to the fallback rule, which may only depend on the
+task name.
+"""
+import time
+from collections import OrderedDict
+
+DEFAULT_CACHE_SIZE = 4096
+
+_ATOMS = frozenset((str, int, float, bool, bytes, type(None)))
+
+
+def _freeze(value):
+    # Hashable snapshot of a context value; dicts and lists are copied by content
+    value_type = type(value)
+    if value_type in _ATOMS:
+        return value
+    if value_type is dict:
+        return tuple((key, _freeze(item)) for key, item in value.items())
+    if value_type is list or value_type is tuple:
+        return tuple(_freeze(item) for item in value)
+    if value_type is set:
+        return frozenset(value)
+    return value
+
+
+def _lookup(context, path):
+    for key in path:
+        context = context[key]
+    return context
+
+
+def _fingerprinter(reads):
+    # Specialized for the common shapes: nothing read, or one top-level field
+    paths = tuple(tuple(path.split(".")) for path in reads)
+    if not paths:
+        return lambda context: ()
+    if len(paths) == 1 and len(paths[0]) == 1:
+        key = paths[0][0]
+        return lambda context: _freeze(context[key])
+    return lambda context: tuple(_freeze(_lookup(context, path)) for path in paths)
+
+
+class RuleStats:
+    __slots__ = ("calls", "hits", "evaluations", "seconds", "max_seconds")
+
+    def __init__(self):
+        self.calls = self.hits = self.evaluations = 0
+        self.seconds = self.max_seconds = 0.0
+
+    @property
+    def hit_rate(self):
+        return self.hits / self.calls if self.calls else 0.0
+
+    @property
+    def mean_seconds(self):
+        return self.seconds / self.evaluations if self.evaluations else 0.0
+
+    def as_dict(self):
+        return {
+            "calls": self.calls, "hits": self.hits, "hit_rate": self.hit_rate,
+            "evaluations": self.evaluations, "mean_seconds": self.mean_seconds,
+            "max_seconds": self.max_seconds,
+        }
+
+    def __repr__(self):
+        return f"RuleStats({self.as_dict()})"
+
+
+class Rule:
+    __slots__ = ("task", "func", "reads", "fingerprint", "stats")
+
+    def __init__(self, task, func, reads=None):
+        self.task = task
+        self.func = func
+        self.reads = None if reads is None else tuple(reads)
+        # None marks a rule whose results are never memoized
+        self.fingerprint = None if reads is None else _fingerprinter(self.reads)
+        self.stats = RuleStats()
+
+    def __repr__(self):
+        return f"Rule({self.task!r}, reads={self.reads!r})"
+
+
+class RuleEngine:
+    def __init__(self, fallback=None, cache_size=DEFAULT_CACHE_SIZE):
+        self.rules = {}
+        self.fallback = Rule(None, fallback or (lambda task, context: f"Unknown task: {task}"), ())
+        self.cache_size = cache_size
+        self._memo = OrderedDict()
+
+    def add(self, task, func, reads=None):
+        """Register ``func(task, context)`` for ``task``; replaces any earlier rule."""
+        rule = self.rules[task] = Rule(task, func, reads)
+        self.invalidate(task)
+        return rule
+
+    def rule(self, task, reads=None):
+        """Decorator form of ``add``."""
+        def register(func):
+            self.add(task, func, reads)
+            return func
+        return register
+
+    def remove(self, task):
+        del self.rules[task]
+        self.invalidate(task)
+
+    def invalidate(self, task=None):
+        """Drop memoized results for ``task``, or all of them."""
+        if task is None:
+            self._memo.clear()
+            return
+        for key in [key for key in self._memo if key[0] == task]:
+            del self._memo[key]
+
+    def infer(self, task, context):
+        rule = self.rules.get(task, self.fallback)
+        stats = rule.stats
+        stats.calls += 1
+        memo = self._memo
+        fingerprint = rule.fingerprint
+        if fingerprint is not None:
+            key = (task, fingerprint(context))
+            result = memo.get(key, memo)
+            if result is not memo:
+                memo.move_to_end(key)
+                stats.hits += 1
+                return result
+        start = time.perf_counter()
+        result = rule.func(task, context)
+        elapsed = time.perf_counter() - start
+        stats.evaluations += 1
+        stats.seconds += elapsed
+        if elapsed > stats.max_seconds:
+            stats.max_seconds = elapsed
+        if fingerprint is not None:
+            memo[key] = result
+            if len(memo) > self.cache_size:
+                memo.popitem(last=False)
+        return result
+
+    def stats(self):
+        """Per-rule ``RuleStats`` by task name (None for the fallback), plus overall totals."""
+        rules = {task: rule.stats for task, rule in self.rules.items()}
+        rules[None] = self.fallback.stats
+        calls = sum(stats.calls for stats in rules.values())
+        hits = sum(stats.hits for stats in rules.values())
+        return {
+            "rules": rules,
+            "calls": calls, "hits": hits, "hit_rate": hits / calls if calls else 0.0,
+            "memoized": len(self._memo),
+        }
@@ -0,0 +1,156 @@
+"""Per-phase measurements of a compilation.
+
+``HTSCompiler.compile`` runs each phase inside ``Instrumentation.phase``,
+which records wall and CPU time and, when enabled, the bytes allocated
+during the phase (``tracemalloc``) and a ``cProfile`` capture of one chosen
+phase.  The results of one compilation form a ``CompileStats``, handed to
+the ``on_compile`` callbacks at the end; each finished ``PhaseStats`` goes
+to the ``on_phase`` callbacks as soon as the phase ends.
+
+Instrumentation never writes anything: reporting is up to the callbacks
+and to whoever reads the stats.  ``tracemalloc`` and ``cProfile`` are only
+imported once they are asked for.
+"""
+import time
+from contextlib import contextmanager
+
+from hts.nodes import iter_nodes
+
+
+def count_nodes(statements):
+    """Statements and expressions in ``statements``, nested ones included."""
+    return sum(1 for _ in iter_nodes(statements))
+
+
+class PhaseStats:
+    __slots__ = ("name", "wall", "cpu", "items", "allocated", "peak", "profile")
+
+    def __init__(self, name):
+        self.name = name
+        self.wall = self.cpu = 0.0
+        # Size of the phase's output: tokens, statements or code lines
+        self.items = None
+        # Bytes still allocated at the end and peak bytes during the phase (tracemalloc only)
+        self.allocated = self.peak = None
+        # pstats.Stats of the profiled phase
+        self.profile = None
+
+    def as_dict(self):
+        return {
+            "name": self.name, "wall": self.wall, "cpu": self.cpu, "items": self.items,
+            "allocated": self.allocated, "peak": self.peak,
+        }
+
+    def __repr__(self):
+        return f"PhaseStats({self.as_dict()})"
+
+
+class CompileStats:
+    __slots__ = ("phases", "wall", "cpu", "tokens", "nodes", "lines")
+
+    def __init__(self):
+        self.phases = {}
+        self.wall = self.cpu = 0.0
+        self.tokens = self.nodes = self.lines = None
+
+    def __getitem__(self, name):
+        return self.phases[name]
+
+    def as_dict(self):
+        return {
+            "wall": self.wall, "cpu": self.cpu, "tokens": self.tokens, "nodes": self.nodes,
+            "lines": self.lines, "phases": [phase.as_dict() for phase in self.phases.values()],
+        }
+
+    def table(self):
+        """Human readable summary, one line per phase."""
+        rows = [f"{'phase':<18} {'wall ms':>10} {'cpu ms':>10} {'items':>10} {'alloc KiB':>10}"]
+        for phase in self.phases.values():
+            items = "" if phase.items is None else f"{phase.items:,}"
+            allocated = "" if phase.allocated is None else f"{phase.allocated / 1024:,.1f}"
+            rows.append(f"{phase.name:<18} {phase.wall * 1e3:>10.2f} {phase.cpu * 1e3:>10.2f}"
+                        f" {items:>10} {allocated:>10}")
+        rows.append(f"{'total':<18} {self.wall * 1e3:>10.2f} {self.cpu * 1e3:>10.2f}")
+        return "\n".join(rows)
+
+    def __repr__(self):
+        return f"CompileStats({self.as_dict()})"
+
+
+class Instrumentation:
+    def __init__(self, memory=False, profile=None, on_phase=(), on_compile=()):
+        # Trace allocations with tracemalloc; slows every phase down noticeably
+        self.memory = memory
+        # Name of the one phase to run under cProfile
+        self.profile = profile
+        self.on_phase = list(on_phase)
+        self.on_compile = list(on_compile)
+        # Stats of the most recent compilation
+        self.last = None
+        self._tracing = False
+        self._wall = self._cpu = 0.0
+
+    def start(self):
+        """Begin a compilation; returns its (empty) ``CompileStats``."""
+        stats = CompileStats()
+        if self.memory:
+            import tracemalloc
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._tracing = True
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+        return stats
+
+    @contextmanager
+    def phase(self, stats, name):
+        """Measure the body as phase ``name``; yields its ``PhaseStats``.
+
+        A phase entered again in the same compilation (once per batch in
+        ``HTSCompiler.compile_file``) adds to its earlier measurements.
+        """
+        phase = stats.phases.get(name)
+        if phase is None:
+            phase = stats.phases[name] = PhaseStats(name)
+        memory = self.memory
+        if memory:
+            import tracemalloc
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        profiler = None
+        if name == self.profile:
+            import cProfile
+            import pstats
+            profiler = cProfile.Profile()
+            profiler.enable()
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield phase
+        finally:
+            phase.wall += time.perf_counter() - wall
+            phase.cpu += time.process_time() - cpu
+            if profiler is not None:
+                profiler.disable()
+                if phase.profile is None:
+                    phase.profile = pstats.Stats(profiler)
+                else:
+                    phase.profile.add(profiler)
+            if memory:
+                current, peak = tracemalloc.get_traced_memory()
+                phase.allocated = (phase.allocated or 0) + current - base
+                phase.peak = max(phase.peak or 0, peak - base)
+        for callback in self.on_phase:
+            callback(phase)
+
+    def finish(self, stats):
+        stats.wall = time.perf_counter() - self._wall
+        stats.cpu = time.process_time() - self._cpu
+        if self._tracing:
+            import tracemalloc
+            tracemalloc.stop()
+            self._tracing = False
+        self.last = stats
+        for callback in self.on_compile:
+            callback(stats)
+        return stats
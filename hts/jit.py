@@ -0,0 +1,331 @@
+"""Tiered execution: hot HTS functions compiled to Python code objects.
+
+Every function starts in the bytecode interpreter (``hts.vm``).  A ``JIT``
+attached to the VM counts calls, and once a function has been called
+``threshold`` times its ``FnDef`` is translated to Python source and
+compiled with ``compile()``.  HTS variables become Python locals, operators
+are written inline, and callees, builtins, effect nodes and the globals
+list are bound once instead of looked up per instruction.
+
+The translation is specialized on the argument types of the call that
+triggered it: ``int`` and ``float`` parameters, and everything computed
+from them, are assumed to keep their type, which lets ``/`` compile to
+plain Python division.  Guards at the entry of the compiled function check
+the assumptions before the body runs; when one fails the function returns
+``DEOPT``, the call is interpreted, and the function goes back to being
+counted.  After ``max_deopts`` failures it is recompiled without type
+assumptions.
+
+Compiled functions recurse on the Python stack, so deep recursion in hot
+code is bounded by ``sys.getrecursionlimit()``; the interpreter's is not.
+"""
+import math
+import re
+
+from hts.bytecode import Builtin, CodeObject, array_spec
+from hts.nodes import (
+    Array, Assign, BinOp, Call, ExprStmt, FnDef, If, Index, Let, Name, Num, Return, SetItem, Slice,
+    UnaryOp, While,
+)
+from hts.vm import DEOPT, _divide, _index, _remainder
+
+# Type of a variable no value has been assigned to yet; None is "any type"
+_UNSET = object()
+
+_COMPARISONS = frozenset({"<", "<=", ">", ">=", "==", "!="})
+
+# Operands cheap enough to repeat inline: locals and non-negative literals
+_SIMPLE = re.compile(r"v_\w+|\d+")
+
+
+def _join(a, b):
+    if a is _UNSET:
+        return b
+    if b is _UNSET:
+        return a
+    return a if a is b else None
+
+
+class JITStats:
+    __slots__ = ("compiled", "generic", "deopts")
+
+    def __init__(self):
+        # Functions compiled, those compiled without type assumptions, failed guards
+        self.compiled = self.generic = self.deopts = 0
+
+    def as_dict(self):
+        return {"compiled": self.compiled, "generic": self.generic, "deopts": self.deopts}
+
+    def __repr__(self):
+        return f"JITStats({self.as_dict()})"
+
+
+class _Translator:
+    def __init__(self, unit, program, types, guards):
+        self.unit = unit
+        self.definition = unit.definition
+        self.global_slots = {name: slot for slot, name in enumerate(program.global_names)}
+        self.functions = {(entry.name, entry.arity): entry for entry in program.functions}
+        self.function_indexes = {(entry.name, entry.arity): index for index, entry in enumerate(program.functions)}
+        # Type of every local variable, from the previous round of inference
+        self.types = types
+        # Parameter -> type checked on entry
+        self.guards = guards
+        # Types of the values assigned to each local in this round
+        self.assigned = {}
+        # Locals declared so far, in the order the bytecode compiler declares them
+        self.declared = set(self.definition.params)
+        self.uses_globals = False
+        self.lines = []
+        # Name in the generated code -> object bound to it
+        self.bindings = {}
+        self._bound = {}
+
+    def bind(self, prefix, value):
+        key = id(value)
+        name = self._bound.get(key)
+        if name is None:
+            name = self._bound[key] = f"{prefix}{len(self.bindings)}"
+            self.bindings[name] = value
+        return name
+
+    # Expressions: (Python source, inferred type)
+    def expression(self, expr):
+        expr_type = type(expr)
+        if expr_type is Num:
+            value = expr.value
+            if type(value) is float and not math.isfinite(value):
+                return self.bind("k", value), float
+            return (f"({value!r})" if value < 0 else repr(value)), type(value)
+        if expr_type is Name:
+            if expr.id in self.declared:
+                return f"v_{expr.id}", self.types.get(expr.id, _UNSET)
+            self.uses_globals = True
+            return f"G[{self.global_slots[expr.id]}]", None
+        if expr_type is BinOp:
+            left, left_type = self.expression(expr.left)
+            right, right_type = self.expression(expr.right)
+            op = expr.op
+            if op in _COMPARISONS:
+                return f"({left} {op} {right})", bool
+            if left_type is _UNSET or right_type is _UNSET:
+                result = _UNSET
+            elif left_type is int and right_type is int:
+                result = int
+            elif left_type in (int, float) and right_type in (int, float):
+                result = float
+            else:
+                result = None
+            if op == "%":
+                if result is float:
+                    return f"({left} % {right})", float
+                if result is int and _SIMPLE.fullmatch(left) and _SIMPLE.fullmatch(right):
+                    # Remainder with the sign of the dividend, as _remainder does it
+                    return (f"({left} % {right} if ({left} >= 0) == ({right} > 0) or not {left} % {right} "
+                            f"else {left} % {right} - {right})"), int
+                return f"_remainder({left}, {right})", result
+            if op != "/":
+                return f"({left} {op} {right})", result
+            if result is float:
+                return f"({left} / {right})", float
+            if result is int and _SIMPLE.fullmatch(left) and _SIMPLE.fullmatch(right):
+                # Truncating integer division, as _divide does it
+                return f"({left} // {right} if ({left} >= 0) == ({right} > 0) else -(-{left} // {right}))", int
+            return f"_divide({left}, {right})", result
+        if expr_type is UnaryOp:
+            operand, operand_type = self.expression(expr.operand)
+            if expr.op == "-":
+                return f"(-{operand})", operand_type if operand_type in (int, float, _UNSET) else None
+            return f"(not {operand})", bool
+        if expr_type is Call and (expr.func, len(expr.args)) not in self.functions:
+            # parallel_exec(f(...), g(...)); the bytecode compiler has checked its arguments
+            from hts.parallel import parallel_exec
+            calls = tuple((self.function_indexes[(call.func, len(call.args))], len(call.args)) for call in expr.args)
+            values = "".join(self.expression(arg)[0] + ", " for call in expr.args for arg in call.args)
+            spec = self.bind("k", (sum(arity for _, arity in calls), calls))
+            return f"{self.bind('b', parallel_exec)}(vm, program, {spec}, [{values}])", None
+        if expr_type is Call:
+            args = [self.expression(arg) for arg in expr.args]
+            source = ", ".join(arg for arg, _ in args)
+            callee = self.functions[(expr.func, len(expr.args))]
+            if type(callee) is Builtin:
+                return f"{self.bind('b', callee.func)}({source})", None
+            if callee is self.unit and all(
+                    arg_type is self.guards[param]
+                    for param, (_, arg_type) in zip(self.definition.params, args) if param in self.guards):
+                # Recursion that provably passes the guards skips the dispatcher
+                return f"f_{self.unit.name}({source})", None
+            return f"{self.bind('c', callee)}({source})", None
+        if expr_type is Index:
+            return f"_index({self.expression(expr.value)[0]}, {self.expression(expr.index)[0]})", None
+        if expr_type is Slice:
+            start, stop = ("" if bound is None else self.expression(bound)[0] for bound in (expr.start, expr.stop))
+            return f"{self.expression(expr.value)[0]}[{start}:{stop}]", None
+        if expr_type is Array:
+            from hts.array import make_array
+            operands = expr.elements if expr.repeat is None else (expr.elements[0], expr.repeat)
+            values = "".join(self.expression(operand)[0] + ", " for operand in operands)
+            return f"{self.bind('b', make_array)}([{values}], {self.bind('k', array_spec(expr))})", None
+        raise ValueError(f"line {expr.line}: cannot compile expression {expr!r}")
+
+    # Statements
+    def emit(self, depth, line):
+        self.lines.append("    " * depth + line)
+
+    def store(self, depth, name, value, value_type, declare=False):
+        if declare:
+            self.declared.add(name)
+        if name in self.declared:
+            self.assigned[name] = _join(self.assigned.get(name, _UNSET), value_type)
+            self.emit(depth, f"v_{name} = {value}")
+        else:
+            self.uses_globals = True
+            self.emit(depth, f"G[{self.global_slots[name]}] = {value}")
+
+    def block(self, statements, depth):
+        start = len(self.lines)
+        for statement in statements:
+            self.statement(statement, depth)
+        if len(self.lines) == start:
+            self.emit(depth, "pass")
+
+    def statement(self, node, depth):
+        node_type = type(node)
+        if node_type is Let:
+            # The initializer cannot see the variable it declares
+            value, value_type = self.expression(node.value)
+            self.store(depth, node.name, value, value_type, declare=True)
+        elif node_type is Assign:
+            value, value_type = self.expression(node.value)
+            self.store(depth, node.name, value, value_type)
+        elif node_type is SetItem:
+            container = self.expression(Name(node.name, line=node.line))[0]
+            index = self.expression(node.index)[0]
+            self.emit(depth, f"{container}[{index}] = {self.expression(node.value)[0]}")
+        elif node_type is If:
+            self.emit(depth, f"if {self.expression(node.condition)[0]}:")
+            self.block(node.body, depth + 1)
+            if node.orelse:
+                self.emit(depth, "else:")
+                self.block(node.orelse, depth + 1)
+        elif node_type is While:
+            self.emit(depth, f"while {self.expression(node.condition)[0]}:")
+            self.block(node.body, depth + 1)
+        elif node_type is Return:
+            self.emit(depth, "return None" if node.value is None else f"return {self.expression(node.value)[0]}")
+        elif node_type is ExprStmt:
+            self.emit(depth, self.expression(node.value)[0])
+        elif node_type is FnDef:
+            # Functions are hoisted by the bytecode compiler
+            pass
+        else:
+            self.emit(depth, f"effect({self.bind('e', node)})")
+
+    def translate(self):
+        """Python source of a factory returning the compiled function."""
+        guards = self.guards
+        params = self.definition.params
+        self.block(self.definition.body, 2)
+        body = self.lines
+        self.lines = []
+        self.emit(0, f"def make(vm, program, DEOPT, _divide, _remainder, _index, effect{''.join(', ' + name for name in self.bindings)}):")
+        self.emit(1, f"def f_{self.unit.name}({', '.join('v_' + param for param in params)}):")
+        checks = [f"type(v_{param}) is not {guards[param].__name__}" for param in params if param in guards]
+        if checks:
+            self.emit(2, f"if {' or '.join(checks)}:")
+            self.emit(3, "return DEOPT")
+        if self.uses_globals:
+            self.emit(2, "G = vm.globals")
+        others = [f"v_{name}" for name in self.unit.varnames if name not in params]
+        if others:
+            self.emit(2, " = ".join(others) + " = None")
+        self.lines.extend(body)
+        self.emit(2, "return None")
+        self.emit(1, f"return f_{self.unit.name}")
+        return "\n".join(self.lines) + "\n"
+
+
+def translate(unit, program, arg_types=None):
+    """``(source, bindings)`` of ``unit`` specialized for ``arg_types`` (None: no assumptions)."""
+    params = unit.definition.params
+    guards = {}
+    if arg_types is not None:
+        guards = {param: kind for param, kind in zip(params, arg_types) if kind is int or kind is float}
+    types = {param: guards.get(param) for param in params}
+    # Infer the type of every local until nothing changes; types only ever widen
+    while True:
+        translator = _Translator(unit, program, types, guards)
+        source = translator.translate()
+        assigned = translator.assigned
+        inferred = {
+            name: _join(guards[name], assigned.get(name, _UNSET)) if name in guards
+            else None if name in params else assigned.get(name, _UNSET)
+            for name in unit.varnames
+        }
+        if inferred == types:
+            return source, translator.bindings
+        types = inferred
+
+
+class JIT:
+    def __init__(self, threshold=20, max_deopts=3):
+        # Calls a function makes in the interpreter before it is compiled
+        self.threshold = threshold
+        # Failed guards after which a function is compiled without type assumptions
+        self.max_deopts = max_deopts
+        self.stats = JITStats()
+        # CodeObject -> compiled function; a JIT serves a single VM
+        self.natives = {}
+        # Generated source of every function compiled, by name, for inspection
+        self.sources = {}
+        self._calls = {}
+        self._deopts = {}
+
+    def lookup(self, vm, program, unit, args):
+        """Compiled function for a call of ``unit`` with ``args``, or None to interpret it."""
+        native = self.natives.get(unit)
+        if native is not None:
+            return native
+        calls = self._calls.get(unit, 0) + 1
+        self._calls[unit] = calls
+        if calls < self.threshold:
+            return None
+        native = self.natives[unit] = self.compile(vm, program, unit, args)
+        return native
+
+    def deoptimize(self, unit):
+        # A guard failed: back to the interpreter until the function is hot again
+        self.stats.deopts += 1
+        self._deopts[unit] = self._deopts.get(unit, 0) + 1
+        self._calls[unit] = 0
+        del self.natives[unit]
+
+    def compile(self, vm, program, unit, args):
+        generic = self._deopts.get(unit, 0) >= self.max_deopts
+        source, bindings = translate(unit, program, None if generic else [type(arg) for arg in args])
+        for name, value in bindings.items():
+            if type(value) is CodeObject:
+                bindings[name] = self.entry(vm, program, value)
+        namespace = {}
+        exec(compile(source, f"<hts-jit {unit.name}>", "exec"), namespace)
+        self.sources[unit.name] = source
+        self.stats.compiled += 1
+        self.stats.generic += generic
+        return namespace["make"](vm, program, DEOPT, _divide, _remainder, _index, vm._effect, **bindings)
+
+    def entry(self, vm, program, unit):
+        """Function calling ``unit``: its compiled code once it is hot, else the interpreter."""
+        lookup = self.lookup
+        deoptimize = self.deoptimize
+        execute = vm._execute
+        padding = [None] * (unit.nregs - unit.arity)
+
+        def call(*args):
+            native = lookup(vm, program, unit, args)
+            if native is not None:
+                value = native(*args)
+                if value is not DEOPT:
+                    return value
+                deoptimize(unit)
+            return execute(program, unit, list(args) + padding)
+        return call
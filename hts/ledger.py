@@ -0,0 +1,416 @@
+"""Append-only, hash-chained transaction ledger.
+
+Transactions are buffered and sealed into blocks of ``block_size``.  Each
+block header carries the hash of the previous header and the Merkle root of
+its transactions, so rewriting any stored byte breaks the chain.  Blocks are
+appended to numbered segment files; a segment is closed once it exceeds
+``segment_bytes`` and is read through ``mmap`` from then on.
+
+A transaction's id is the SHA-256 leaf hash of its bytes (appending the
+same bytes twice gives the same id; lookups return the latest copy).
+Lookups are logarithmic: block heights are found by bisecting the sorted
+first-sequence numbers of all blocks, and each closed segment has a sorted
+``.idx`` file of ``(id, sequence)`` records that is binary searched in
+place.  Ids of the open segment are kept in memory.
+
+Appends, seals, flushes and ``close`` hold a lock, so threads may share a
+ledger.
+
+Record layout: header (``_HEADER``), ``count`` uint32 transaction lengths,
+then the transaction bytes.
+"""
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from array import array
+from bisect import bisect_right
+
+MAGIC = b"HTSB"
+GENESIS = bytes(32)
+DEFAULT_BLOCK_SIZE = 1024
+DEFAULT_SEGMENT_BYTES = 64 << 20
+
+# magic, height, first sequence number, tx count, previous block hash,
+# Merkle root, timestamp, payload bytes
+_HEADER = struct.Struct("<4sQQI32s32sdQ")
+_INDEX_RECORD = 40
+
+
+class LedgerError(Exception):
+    pass
+
+
+def leaf_hash(tx):
+    # Domain-separated from inner nodes so a leaf cannot pose as a subtree
+    return hashlib.sha256(b"\0" + tx).digest()
+
+
+def _parent(left, right):
+    return hashlib.sha256(b"\1" + left + right).digest()
+
+
+def merkle_levels(leaves):
+    """Every level of the Merkle tree over ``leaves``, leaves first."""
+    levels = [list(leaves)]
+    level = levels[0]
+    while len(level) > 1:
+        if len(level) % 2:
+            level = level + [level[-1]]
+        level = [_parent(level[i], level[i + 1]) for i in range(0, len(level), 2)]
+        levels.append(level)
+    return levels
+
+
+def merkle_root(leaves):
+    return merkle_levels(leaves)[-1][0] if leaves else GENESIS
+
+
+class Proof:
+    __slots__ = ("txid", "sequence", "height", "index", "path", "root", "block_hash")
+
+    def __init__(self, txid, sequence, height, index, path, root, block_hash):
+        self.txid = txid
+        self.sequence = sequence
+        self.height = height
+        self.index = index
+        # (sibling hash, sibling is on the right) from leaf to root
+        self.path = path
+        self.root = root
+        self.block_hash = block_hash
+
+    def __repr__(self):
+        return f"Proof(txid={self.txid.hex()[:16]}, height={self.height}, index={self.index}, depth={len(self.path)})"
+
+
+def verify_proof(tx, proof):
+    """True if ``tx`` is included in the block whose Merkle root is ``proof.root``."""
+    digest = leaf_hash(tx)
+    if digest != proof.txid:
+        return False
+    for sibling, right in proof.path:
+        digest = _parent(digest, sibling) if right else _parent(sibling, digest)
+    return digest == proof.root
+
+
+class _SegmentIndex:
+    # Sorted (id, sequence) records of a closed segment, searched in place
+    def __init__(self, path):
+        self._handle = open(path, "rb")
+        size = os.fstat(self._handle.fileno()).st_size
+        self._map = mmap.mmap(self._handle.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        self._count = size // _INDEX_RECORD
+
+    def get(self, txid):
+        low, high = 0, self._count
+        data = self._map
+        while low < high:
+            middle = (low + high) // 2
+            start = middle * _INDEX_RECORD
+            key = data[start:start + 32]
+            if key < txid:
+                low = middle + 1
+            elif key > txid:
+                high = middle
+            else:
+                return int.from_bytes(data[start + 32:start + 40], "little")
+        return None
+
+    def close(self):
+        if self._map:
+            self._map.close()
+        self._handle.close()
+
+    @staticmethod
+    def write(path, ids):
+        records = bytearray()
+        for txid, sequence in sorted(ids.items()):
+            records += txid
+            records += sequence.to_bytes(8, "little")
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as handle:
+            handle.write(records)
+        os.replace(tmp, path)
+
+
+class Ledger:
+    def __init__(self, directory=None, block_size=DEFAULT_BLOCK_SIZE,
+                 segment_bytes=DEFAULT_SEGMENT_BYTES, sync=False):
+        self._tempdir = None
+        if directory is None:
+            self._tempdir = tempfile.TemporaryDirectory(prefix="hts-ledger-")
+            directory = self._tempdir.name
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.block_size = block_size
+        self.segment_bytes = segment_bytes
+        self.sync = sync
+        self.height = 0
+        self.sealed = 0
+        self.tip = GENESIS
+        # Block index, by height
+        self._first = array("Q")
+        self._segments = array("I")
+        self._offsets = array("Q")
+        self._pending = []
+        self._pending_ids = {}
+        self._active_ids = {}
+        self._closed = []
+        self._maps = {}
+        self._segment = 0
+        self._writer = None
+        # Held while the pending block or the open segment changes
+        self._lock = threading.Lock()
+        self._load()
+
+    # Storage
+
+    def _path(self, segment, suffix=".seg"):
+        return os.path.join(self.directory, f"{segment:06d}{suffix}")
+
+    def _load(self):
+        segments = sorted(int(name[:-4]) for name in os.listdir(self.directory) if name.endswith(".seg"))
+        for position, segment in enumerate(segments):
+            last = position == len(segments) - 1
+            index_path = self._path(segment, ".idx")
+            ids = self._scan(segment, rebuild_ids=last or not os.path.exists(index_path))
+            if not last:
+                if ids is not None:
+                    _SegmentIndex.write(index_path, ids)
+                self._closed.append(_SegmentIndex(index_path))
+            else:
+                self._active_ids = ids
+        self._segment = segments[-1] if segments else 0
+        self._writer = open(self._path(self._segment), "a+b")
+
+    def _scan(self, segment, rebuild_ids):
+        # Rebuild the block index from one segment; a torn record at the end is cut off
+        ids = {} if rebuild_ids else None
+        path = self._path(segment)
+        with open(path, "rb") as handle:
+            size = os.fstat(handle.fileno()).st_size
+            # Mapped, so skipping over payloads never reads them
+            data = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        offset = 0
+        try:
+            while offset + _HEADER.size <= size:
+                header = data[offset:offset + _HEADER.size]
+                magic, height, first, count, previous, root, _, payload = _HEADER.unpack(header)
+                end = offset + _HEADER.size + payload
+                if magic != MAGIC or end > size or height != self.height:
+                    break
+                if previous != self.tip:
+                    raise LedgerError(f"block {height} does not link to block {height - 1}")
+                if ids is not None:
+                    for sequence, tx in enumerate(self._transactions(data, offset, count), first):
+                        ids[leaf_hash(tx)] = sequence
+                self._first.append(first)
+                self._segments.append(segment)
+                self._offsets.append(offset)
+                self.tip = hashlib.sha256(header).digest()
+                self.height += 1
+                self.sealed = first + count
+                offset = end
+        finally:
+            if size:
+                data.close()
+        if offset != size:
+            with open(path, "r+b") as handle:
+                handle.truncate(offset)
+        return ids
+
+    @staticmethod
+    def _transactions(data, offset, count):
+        start = offset + _HEADER.size
+        lengths = array("I")
+        lengths.frombytes(data[start:start + 4 * count])
+        position = start + 4 * count
+        for length in lengths:
+            yield data[position:position + length]
+            position += length
+
+    def _roll(self):
+        _SegmentIndex.write(self._path(self._segment, ".idx"), self._active_ids)
+        self._writer.close()
+        self._closed.append(_SegmentIndex(self._path(self._segment, ".idx")))
+        self._active_ids = {}
+        self._segment += 1
+        self._writer = open(self._path(self._segment), "a+b")
+
+    def _read(self, segment, offset, size):
+        if segment == self._segment:
+            self._writer.flush()
+            return os.pread(self._writer.fileno(), size, offset)
+        mapped = self._maps.get(segment)
+        if mapped is None:
+            with open(self._path(segment), "rb") as handle:
+                mapped = self._maps[segment] = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        return mapped[offset:offset + size]
+
+    # Writing
+
+    def append(self, tx):
+        """Queue ``tx`` (bytes or str) for the next block; returns its id."""
+        if type(tx) is str:
+            tx = tx.encode()
+        txid = leaf_hash(tx)
+        with self._lock:
+            self._pending_ids[txid] = self.sealed + len(self._pending)
+            self._pending.append(tx)
+            if len(self._pending) >= self.block_size:
+                self._seal()
+        return txid
+
+    def extend(self, txs):
+        return [self.append(tx) for tx in txs]
+
+    def seal(self):
+        """Write the pending transactions as one block; returns its height or None."""
+        with self._lock:
+            return self._seal()
+
+    def _seal(self):
+        txs = self._pending
+        if not txs:
+            return None
+        leaves = list(self._pending_ids)
+        if len(leaves) != len(txs):
+            leaves = [leaf_hash(tx) for tx in txs]
+        root = merkle_root(leaves)
+        lengths = array("I", map(len, txs))
+        payload = lengths.tobytes() + b"".join(txs)
+        header = _HEADER.pack(MAGIC, self.height, self.sealed, len(txs), self.tip, root, time.time(), len(payload))
+        offset = self._writer.tell()
+        if offset and offset + len(header) + len(payload) > self.segment_bytes:
+            self._roll()
+            offset = 0
+        self._writer.write(header)
+        self._writer.write(payload)
+        if self.sync:
+            self._writer.flush()
+            os.fsync(self._writer.fileno())
+        self._first.append(self.sealed)
+        self._segments.append(self._segment)
+        self._offsets.append(offset)
+        self._active_ids.update(self._pending_ids)
+        self.tip = hashlib.sha256(header).digest()
+        self.height += 1
+        self.sealed += len(txs)
+        self._pending = []
+        self._pending_ids = {}
+        return self.height - 1
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        self._seal()
+        self._writer.flush()
+        if self.sync:
+            os.fsync(self._writer.fileno())
+
+    def close(self):
+        with self._lock:
+            if self._writer is None:
+                return
+            self._flush()
+            self._writer.close()
+            self._writer = None
+        for mapped in self._maps.values():
+            mapped.close()
+        for index in self._closed:
+            index.close()
+        if self._tempdir is not None:
+            self._tempdir.cleanup()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self.sealed + len(self._pending)
+
+    # Reading
+
+    def locate(self, txid):
+        """Sequence number of transaction ``txid`` or None."""
+        for ids in (self._pending_ids, self._active_ids):
+            sequence = ids.get(txid)
+            if sequence is not None:
+                return sequence
+        for index in reversed(self._closed):
+            sequence = index.get(txid)
+            if sequence is not None:
+                return sequence
+        return None
+
+    def block_height(self, sequence):
+        if not 0 <= sequence < self.sealed:
+            raise LedgerError(f"transaction {sequence} is not in a sealed block")
+        return bisect_right(self._first, sequence) - 1
+
+    def block(self, height):
+        """``(header fields, transactions)`` of the block at ``height``."""
+        if not 0 <= height < self.height:
+            raise LedgerError(f"no block at height {height}")
+        segment, offset = self._segments[height], self._offsets[height]
+        header = self._read(segment, offset, _HEADER.size)
+        fields = _HEADER.unpack(header)
+        data = header + self._read(segment, offset + _HEADER.size, fields[-1])
+        return fields, list(self._transactions(data, 0, fields[3]))
+
+    def block_hash(self, height):
+        segment, offset = self._segments[height], self._offsets[height]
+        return hashlib.sha256(self._read(segment, offset, _HEADER.size)).digest()
+
+    def get(self, txid):
+        """Bytes of transaction ``txid`` or None."""
+        sequence = self.locate(txid)
+        if sequence is None:
+            return None
+        if sequence >= self.sealed:
+            return self._pending[sequence - self.sealed]
+        # Read only the length table and the one transaction, not the whole block
+        height = self.block_height(sequence)
+        segment, offset = self._segments[height], self._offsets[height]
+        count = _HEADER.unpack(self._read(segment, offset, _HEADER.size))[3]
+        index = sequence - self._first[height]
+        lengths = array("I")
+        lengths.frombytes(self._read(segment, offset + _HEADER.size, 4 * count))
+        start = offset + _HEADER.size + 4 * count + sum(lengths[:index])
+        return self._read(segment, start, lengths[index])
+
+    def proof(self, txid):
+        """Merkle inclusion ``Proof`` for a sealed transaction."""
+        sequence = self.locate(txid)
+        if sequence is None:
+            raise LedgerError(f"unknown transaction {txid.hex()}")
+        height = self.block_height(sequence)
+        fields, txs = self.block(height)
+        index = sequence - fields[2]
+        path = []
+        position = index
+        for level in merkle_levels([leaf_hash(tx) for tx in txs])[:-1]:
+            sibling = position ^ 1
+            path.append((level[sibling] if sibling < len(level) else level[position], sibling > position))
+            position //= 2
+        return Proof(txid, sequence, height, index, path, fields[5], self.block_hash(height))
+
+    def verify(self):
+        """Recheck every Merkle root and chain link; raises ``LedgerError`` on damage."""
+        self._writer.flush()
+        previous = GENESIS
+        for height in range(self.height):
+            fields, txs = self.block(height)
+            if fields[4] != previous:
+                raise LedgerError(f"block {height} does not link to block {height - 1}")
+            if merkle_root([leaf_hash(tx) for tx in txs]) != fields[5]:
+                raise LedgerError(f"block {height} Merkle root mismatch")
+            previous = self.block_hash(height)
+        return True
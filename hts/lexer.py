@@ -0,0 +1,132 @@
+"""Streaming HTS tokenizer.
+
+The token pattern is compiled once per process.  ``tokenize`` yields typed
+``Token`` records lazily, either from a string or from any file-like object
+with a ``read(n)`` method (text or UTF-8 bytes, e.g. an ``mmap``), so very
+large sources are scanned in constant memory.  Offsets count characters.
+"""
+import codecs
+import re
+from typing import NamedTuple
+
+# Token kinds
+KEYWORD = "keyword"
+IDENT = "ident"
+NUMBER = "number"
+OP = "op"
+PUNCT = "punct"
+
+KEYWORDS = frozenset({
+    "if", "else", "while", "loop", "foreach", "quantum", "blockchain", "exec",
+    "let", "var", "fn", "return", "import", "sync", "async", "memory",
+    "allocate", "deallocate", "trace", "debug", "optimize", "task", "node",
+})
+
+# Default read size when streaming from a file object
+CHUNK_SIZE = 1 << 16
+
+# Group names double as token kinds; newlines are matched only to count lines
+# and comments only to skip them.  No token spans a newline.
+_TOKEN_RE = re.compile(
+    r"(?P<number>\d+\.\d+|\d\w*)|(?P<ident>\w+)|(?P<comment>//[^\n]*)"
+    r"|(?P<op>==|!=|<=|>=|->|[-+*/%=<>!])|(?P<punct>[(){}\[\];:,])|(?P<nl>\n)"
+)
+_KEYWORD_KINDS = {word: KEYWORD for word in KEYWORDS}
+
+# A chunk boundary falls between tokens whenever one side is whitespace or
+# punctuation, or an operator meets a word character; other pairs (``1|.5``,
+# ``<|=``, ``/|/``, ``ab|c``) may belong to one token
+_BREAKS = frozenset(" \t\r\n\f\v(){}[];:,")
+_OPERATOR_CHARS = frozenset("-+*/%=<>!")
+_is_word = re.compile(r"\w").match
+# How far back from the end of a chunk to look for such a boundary
+_LOOKBACK = 4096
+
+
+class Token(NamedTuple):
+    kind: str
+    text: str
+    offset: int
+    line: int
+
+
+def _scan(text, stop, base, line):
+    # Yield the tokens of text[:stop]; returns the line number at ``stop``
+    new = tuple.__new__
+    keyword_kind = _KEYWORD_KINDS.get
+    for match in _TOKEN_RE.finditer(text, 0, stop):
+        kind = match.lastgroup
+        if kind == "nl":
+            line += 1
+            continue
+        if kind == "comment":
+            continue
+        value = match.group()
+        if kind == IDENT:
+            kind = keyword_kind(value, IDENT)
+        yield new(Token, (kind, value, base + match.start(), line))
+    return line
+
+
+def _cut(buffer, start):
+    # Offset up to which ``buffer`` lexes the same whatever follows it, at
+    # least ``start`` (the start of the last line)
+    end = len(buffer)
+    for index in range(end - 1, max(start, end - _LOOKBACK) - 1, -1):
+        left = buffer[index]
+        if left in _BREAKS:
+            return index + 1
+        if index + 1 < end:
+            right = buffer[index + 1]
+            if (right in _BREAKS or (_is_word(left) and right in _OPERATOR_CHARS)
+                    or (left in _OPERATOR_CHARS and _is_word(right))):
+                return index + 1
+    return start
+
+
+def _scan_stream(stream, chunk_size):
+    read = stream.read
+    decode = None
+    pending = ""
+    base = 0
+    line = 1
+    while True:
+        chunk = read(chunk_size)
+        if not chunk:
+            break
+        if not isinstance(chunk, str):
+            if decode is None:
+                decode = codecs.getincrementaldecoder("utf-8")().decode
+            chunk = decode(chunk)
+        buffer = pending + chunk
+        # Scan up to the last token boundary; the rest may continue in the next chunk
+        start = buffer.rfind("\n") + 1
+        comment = buffer.find("//", start)
+        if comment >= 0:
+            # The last line ends in a comment: only its opening is kept, so
+            # that the rest of it is still skipped
+            line = yield from _scan(buffer, comment, base, line)
+            pending = "//"
+            base += len(buffer) - 2
+            continue
+        cut = _cut(buffer, start)
+        line = yield from _scan(buffer, cut, base, line)
+        pending = buffer[cut:]
+        base += cut
+    if decode is not None:
+        # Raises UnicodeDecodeError if the stream ends inside a character
+        decode(b"", True)
+    if pending:
+        yield from _scan(pending, len(pending), base, line)
+
+
+def tokenize(source, chunk_size=CHUNK_SIZE):
+    """Yield ``Token`` records for ``source`` (a string or a readable stream)."""
+    if isinstance(source, str):
+        return _scan(source, len(source), 0, 1)
+    return _scan_stream(source, chunk_size)
+
+
+def is_identifier(text):
+    """True if ``text`` lexes as a single non-keyword identifier."""
+    return text.isidentifier() and text not in KEYWORDS
@@ -0,0 +1,257 @@
+"""Leveled, structured, bounded logging for the DIBA runtime.
+
+A ``Logger`` keeps its most recent records in a ring buffer (``capacity``
+entries) and hands each record to zero or more ``BackgroundWriter``s.  A
+writer collects records in memory and a daemon thread writes them to its
+sink in batches, so logging never waits on a terminal or disk.  If a sink
+falls behind by more than ``max_pending`` records, the oldest pending ones
+are dropped and counted rather than buffered without limit.
+
+The level methods (``debug``, ``info``, ...) are rebound whenever the level
+changes: a disabled level is a no-op function, so a filtered call costs one
+function call and builds no record.  Message formatting is deferred to the
+sinks.
+
+``open_writer(None)`` is the shared console writer; ``open_writer(path)`` is
+the shared writer of a rotating JSON-lines file.  Both are flushed at exit.
+"""
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from functools import partial
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+LEVEL_NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARNING: "WARNING", ERROR: "ERROR"}
+
+DEFAULT_CAPACITY = 10000
+DEFAULT_BATCH = 1024
+FLUSH_INTERVAL = 0.2
+MAX_PENDING = 100000
+MAX_BYTES = 16 << 20
+BACKUPS = 5
+
+
+def _disabled(message, **fields):
+    pass
+
+
+class Record:
+    __slots__ = ("created", "level", "logger", "message", "fields")
+
+    def __init__(self, created, level, logger, message, fields):
+        self.created = created
+        self.level = level
+        self.logger = logger
+        self.message = message
+        self.fields = fields
+
+    def text(self):
+        if not self.fields:
+            return self.message
+        return self.message + " " + " ".join(f"{key}={value}" for key, value in self.fields.items())
+
+    def as_dict(self):
+        entry = {"time": self.created, "level": LEVEL_NAMES.get(self.level, self.level),
+                 "logger": self.logger, "message": self.message}
+        if self.fields:
+            entry["fields"] = self.fields
+        return entry
+
+    def __repr__(self):
+        return f"<Record {LEVEL_NAMES.get(self.level, self.level)} {self.text()!r}>"
+
+
+class StreamSink:
+    """Plain-text lines, message and fields only, to a text stream."""
+
+    def __init__(self, stream=None):
+        self.stream = stream
+
+    def write(self, records):
+        stream = self.stream or sys.stdout
+        stream.write("".join(record.text() + "\n" for record in records))
+        stream.flush()
+
+    def close(self):
+        pass
+
+
+class RotatingFileSink:
+    """JSON lines; ``path`` rolls over to ``path.1`` ... ``path.<backups>`` at ``max_bytes``."""
+
+    def __init__(self, path, max_bytes=MAX_BYTES, backups=BACKUPS):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._file = open(path, "ab")
+        self._size = self._file.tell()
+
+    def _rotate(self):
+        self._file.close()
+        for index in range(self.backups - 1, 0, -1):
+            source = f"{self.path}.{index}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{index + 1}")
+        if self.backups:
+            os.replace(self.path, f"{self.path}.1")
+        self._file = open(self.path, "wb")
+        self._size = 0
+
+    def write(self, records):
+        lines = [(json.dumps(record.as_dict(), default=str) + "\n").encode() for record in records]
+        start = 0
+        while start < len(lines):
+            # Fill the current file up to max_bytes, then roll over
+            end, size = start, self._size
+            while end < len(lines) and (size + len(lines[end]) <= self.max_bytes or size == 0):
+                size += len(lines[end])
+                end += 1
+            self._file.write(b"".join(lines[start:end]))
+            self._size = size
+            start = end
+            if start < len(lines):
+                self._rotate()
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class BackgroundWriter:
+    def __init__(self, sink, batch_size=DEFAULT_BATCH, interval=FLUSH_INTERVAL,
+                 max_pending=MAX_PENDING):
+        self.sink = sink
+        self.batch_size = batch_size
+        self.interval = interval
+        self.dropped = 0
+        self.written = 0
+        self._pending = deque(maxlen=max_pending)
+        self._wakeup = threading.Condition()
+        self._requested = 0
+        self._completed = 0
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="hts-log-writer", daemon=True)
+        self._thread.start()
+
+    def put(self, record):
+        pending = self._pending
+        if len(pending) == pending.maxlen:
+            self.dropped += 1
+        pending.append(record)
+        if len(pending) >= self.batch_size:
+            with self._wakeup:
+                self._wakeup.notify()
+
+    def flush(self, timeout=None):
+        """Block until everything put so far has been written."""
+        with self._wakeup:
+            self._requested += 1
+            ticket = self._requested
+            self._wakeup.notify()
+            self._wakeup.wait_for(lambda: self._completed >= ticket or self._closed, timeout)
+
+    def close(self):
+        if self._closed:
+            return
+        self.flush()
+        with self._wakeup:
+            self._closed = True
+            self._wakeup.notify()
+        self._thread.join()
+        self.sink.close()
+
+    def _drain(self):
+        pending = self._pending
+        while pending:
+            batch = []
+            while pending and len(batch) < self.batch_size:
+                batch.append(pending.popleft())
+            try:
+                self.sink.write(batch)
+            except Exception as exc:
+                sys.stderr.write(f"hts.logs: dropping {len(batch)} records: {exc}\n")
+                self.dropped += len(batch)
+            else:
+                self.written += len(batch)
+
+    def _run(self):
+        while True:
+            with self._wakeup:
+                self._wakeup.wait_for(
+                    lambda: self._closed or self._requested > self._completed
+                    or len(self._pending) >= self.batch_size, self.interval)
+                requested = self._requested
+                closed = self._closed
+            self._drain()
+            with self._wakeup:
+                self._completed = requested
+                self._wakeup.notify_all()
+            if closed:
+                return
+
+
+_writers = {}
+_writers_lock = threading.Lock()
+
+
+def open_writer(path=None, **options):
+    """Shared writer for the console (``path=None``) or a rotating log file."""
+    key = None if path is None else os.path.abspath(path)
+    with _writers_lock:
+        writer = _writers.get(key)
+        if writer is None:
+            sink = StreamSink() if key is None else RotatingFileSink(key, **options)
+            writer = _writers[key] = BackgroundWriter(sink)
+        return writer
+
+
+@atexit.register
+def _close_writers():
+    with _writers_lock:
+        writers = list(_writers.values())
+        _writers.clear()
+    for writer in writers:
+        writer.close()
+
+
+class Logger:
+    def __init__(self, name, level=INFO, capacity=DEFAULT_CAPACITY, writers=()):
+        self.name = name
+        self.records = deque(maxlen=capacity)
+        self.writers = tuple(writers)
+        # Records accepted since creation, including those since evicted from ``records``
+        self.emitted = 0
+        self.set_level(level)
+
+    def set_level(self, level):
+        self.level = level
+        for value, name in LEVEL_NAMES.items():
+            setattr(self, name.lower(), partial(self.log, value) if value >= level else _disabled)
+
+    def enabled(self, level):
+        return level >= self.level
+
+    def log(self, level, message, **fields):
+        if level < self.level:
+            return
+        record = Record(time.time(), level, self.name, message, fields)
+        self.records.append(record)
+        self.emitted += 1
+        for writer in self.writers:
+            writer.put(record)
+
+    def flush(self):
+        for writer in self.writers:
+            writer.flush()
+
+    def tail(self, count=10):
+        """The last ``count`` records still in the ring buffer."""
+        records = self.records
+        return list(records)[-count:] if count < len(records) else list(records)
@@ -0,0 +1,241 @@
+"""Arena allocator for ``memory allocate`` / ``memory deallocate``.
+
+All memory comes from one fixed-size arena: an anonymous ``mmap``, whose
+pages are only committed once touched, or a ``bytearray`` with
+``use_mmap=False``.  Requests of at most
+``SIZE_CLASSES[-1]`` bytes are served from slabs: ``SLAB_SIZE`` chunks cut
+into equal slots, one slab list per size class, each slab with its own free
+stack.  Larger requests are carved from free extents kept in power-of-two
+bins; a bitmap of non-empty bins finds a fitting extent without scanning,
+and freed extents are merged with free neighbours on both sides.  Every
+operation is O(1) apart from the rare fallback scan of one bin.
+
+Callers get integer handles rather than offsets.  A handle stays valid and
+unique until it is freed, so handles never shift or collide.
+"""
+import mmap
+
+ALIGN = 16
+SIZE_CLASSES = (16, 32, 64, 128, 256, 512, 1024, 2048)
+SLAB_SIZE = 64 << 10
+DEFAULT_CAPACITY = 64 << 20
+
+# Smallest size class that fits each request size, for requests up to the largest class
+_CLASS_OF = [0] * (SIZE_CLASSES[-1] + 1)
+for _size in range(SIZE_CLASSES[-1], -1, -1):
+    for _slot in SIZE_CLASSES:
+        if _slot >= _size:
+            _CLASS_OF[_size] = _slot
+            break
+
+
+class _Slab:
+    __slots__ = ("offset", "slot_size", "capacity", "bump", "free", "used")
+
+    def __init__(self, offset, slot_size):
+        self.offset = offset
+        self.slot_size = slot_size
+        self.capacity = SLAB_SIZE // slot_size
+        # Slots below ``bump`` have been handed out at least once
+        self.bump = 0
+        self.free = []
+        self.used = 0
+
+    def take(self):
+        self.used += 1
+        if self.free:
+            return self.free.pop()
+        slot = self.offset + self.bump * self.slot_size
+        self.bump += 1
+        return slot
+
+    def full(self):
+        return self.used == self.capacity
+
+
+class MemoryStats:
+    __slots__ = ("capacity", "requested", "allocated", "high_water", "free", "largest_free",
+                 "live", "allocations", "frees", "slabs")
+
+    def __init__(self, **values):
+        for name in self.__slots__:
+            setattr(self, name, values[name])
+
+    @property
+    def external_fragmentation(self):
+        # Share of free memory that is not usable for one request of the largest free size
+        return 1 - self.largest_free / self.free if self.free else 0.0
+
+    @property
+    def internal_fragmentation(self):
+        # Rounding and slot waste inside allocated blocks
+        return 1 - self.requested / self.allocated if self.allocated else 0.0
+
+    def as_dict(self):
+        values = {name: getattr(self, name) for name in self.__slots__}
+        values["external_fragmentation"] = self.external_fragmentation
+        values["internal_fragmentation"] = self.internal_fragmentation
+        return values
+
+    def __repr__(self):
+        return f"MemoryStats({self.as_dict()})"
+
+
+class Arena:
+    def __init__(self, capacity=DEFAULT_CAPACITY, use_mmap=True):
+        capacity -= capacity % ALIGN
+        self.capacity = capacity
+        self.buffer = mmap.mmap(-1, capacity) if use_mmap else bytearray(capacity)
+        # Free extents: start -> size and end -> start, plus size bins
+        self._free_start = {}
+        self._free_end = {}
+        self._bins = [set() for _ in range(capacity.bit_length() + 1)]
+        self._bitmap = 0
+        self._put(0, capacity)
+        # Size class -> slabs with at least one free slot
+        self._partial = {size: {} for size in SIZE_CLASSES}
+        self._slabs = 0
+        # handle -> (offset, requested size, slab or None for large blocks)
+        self._handles = {}
+        self._next_handle = 1
+        self.requested = 0
+        self.allocated = 0
+        self.high_water = 0
+        self.allocations = 0
+        self.frees = 0
+
+    # Extents
+
+    def _bin_insert(self, offset, size):
+        index = size.bit_length() - 1
+        self._bins[index].add(offset)
+        self._bitmap |= 1 << index
+
+    def _bin_remove(self, offset, size):
+        index = size.bit_length() - 1
+        members = self._bins[index]
+        members.discard(offset)
+        if not members:
+            self._bitmap &= ~(1 << index)
+
+    def _put(self, offset, size):
+        # Return an extent, merging it with free neighbours
+        left = self._free_end.pop(offset, None)
+        if left is not None:
+            left_size = self._free_start.pop(left)
+            self._bin_remove(left, left_size)
+            offset, size = left, size + left_size
+        right_size = self._free_start.pop(offset + size, None)
+        if right_size is not None:
+            del self._free_end[offset + size + right_size]
+            self._bin_remove(offset + size, right_size)
+            size += right_size
+        self._free_start[offset] = size
+        self._free_end[offset + size] = offset
+        self._bin_insert(offset, size)
+
+    def _carve(self, size):
+        # Any extent in bin ``index`` or above is at least ``size`` bytes
+        index = (size - 1).bit_length()
+        candidates = self._bitmap >> index
+        if candidates:
+            index += (candidates & -candidates).bit_length() - 1
+            offset = next(iter(self._bins[index]))
+        else:
+            # Only the bin below can still hold a large enough extent
+            index -= 1
+            offset = next((o for o in self._bins[index] if self._free_start[o] >= size), None) if index >= 0 else None
+            if offset is None:
+                raise MemoryError(f"arena exhausted: no free extent of {size} bytes "
+                                  f"({self.capacity - self.allocated} bytes free)")
+        extent = self._free_start.pop(offset)
+        del self._free_end[offset + extent]
+        self._bin_remove(offset, extent)
+        if extent > size:
+            self._put(offset + size, extent - size)
+        return offset
+
+    # Public API
+
+    def allocate(self, size):
+        """Allocate ``size`` bytes; returns a handle."""
+        if size <= 0:
+            raise ValueError(f"allocation size must be positive, not {size}")
+        if size <= SIZE_CLASSES[-1]:
+            slot_size = _CLASS_OF[size]
+            partial = self._partial[slot_size]
+            if partial:
+                slab = next(iter(partial.values()))
+            else:
+                slab = _Slab(self._carve(SLAB_SIZE), slot_size)
+                partial[slab.offset] = slab
+                self._slabs += 1
+            offset = slab.take()
+            if slab.full():
+                del partial[slab.offset]
+            footprint = slot_size
+        else:
+            slab = None
+            footprint = -(-size // ALIGN) * ALIGN
+            offset = self._carve(footprint)
+        handle = self._next_handle
+        self._next_handle += 1
+        self._handles[handle] = (offset, size, slab)
+        self.requested += size
+        self.allocated += footprint
+        if self.allocated > self.high_water:
+            self.high_water = self.allocated
+        self.allocations += 1
+        return handle
+
+    def free(self, handle):
+        try:
+            offset, size, slab = self._handles.pop(handle)
+        except KeyError:
+            raise ValueError(f"invalid or already freed handle {handle!r}") from None
+        self.requested -= size
+        self.frees += 1
+        if slab is None:
+            footprint = -(-size // ALIGN) * ALIGN
+            self._put(offset, footprint)
+            self.allocated -= footprint
+            return
+        self.allocated -= slab.slot_size
+        partial = self._partial[slab.slot_size]
+        if slab.full():
+            partial[slab.offset] = slab
+        slab.used -= 1
+        slab.free.append(offset)
+        # Give an empty slab back to the arena unless it is the class's last one
+        if not slab.used and len(partial) > 1:
+            del partial[slab.offset]
+            self._put(slab.offset, SLAB_SIZE)
+            self._slabs -= 1
+
+    def address(self, handle):
+        """Current arena offset of ``handle``."""
+        return self._handles[handle][0]
+
+    def size(self, handle):
+        return self._handles[handle][1]
+
+    def view(self, handle):
+        """Writable memoryview of the block behind ``handle``."""
+        offset, size, _ = self._handles[handle]
+        return memoryview(self.buffer)[offset:offset + size]
+
+    def __contains__(self, handle):
+        return handle in self._handles
+
+    def __len__(self):
+        return len(self._handles)
+
+    def stats(self):
+        free = sum(self._free_start.values())
+        return MemoryStats(
+            capacity=self.capacity, requested=self.requested, allocated=self.allocated,
+            high_water=self.high_water, free=free,
+            largest_free=max(self._free_start.values(), default=0),
+            live=len(self._handles), allocations=self.allocations, frees=self.frees,
+            slabs=self._slabs,
+        )
@@ -0,0 +1,263 @@
+"""Typed HTS syntax tree.
+
+Every node is a small ``__slots__`` class, so large generated programs stay
+compact in memory and compiler phases dispatch on ``type(node)`` instead of
+re-scanning description strings.  ``str(node)`` renders the human readable
+description the compiler has always printed.
+"""
+
+
+class Node:
+    __slots__ = ("line",)
+    _fields = ()
+    # Names of fields holding nested statement tuples
+    _blocks = ()
+
+    def __init__(self, *values, line=0):
+        # Trailing fields that are not given default to None
+        values += (None,) * (len(self._fields) - len(values))
+        for field, value in zip(self._fields, values):
+            setattr(self, field, value)
+        self.line = line
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, field) == getattr(other, field) for field in self._fields)
+
+    def __hash__(self):
+        return hash((type(self),) + tuple(getattr(self, field) for field in self._fields))
+
+    def __repr__(self):
+        args = ", ".join(f"{field}={getattr(self, field)!r}" for field in self._fields)
+        return f"{type(self).__name__}({args})"
+
+
+# Expressions
+
+class Num(Node):
+    __slots__ = _fields = ("value",)
+
+    def __str__(self):
+        return str(self.value)
+
+
+class Name(Node):
+    __slots__ = _fields = ("id",)
+
+    def __str__(self):
+        return self.id
+
+
+class BinOp(Node):
+    __slots__ = _fields = ("op", "left", "right")
+
+    def __str__(self):
+        return f"{_operand(self.left)} {self.op} {_operand(self.right)}"
+
+
+class UnaryOp(Node):
+    __slots__ = _fields = ("op", "operand")
+
+    def __str__(self):
+        return f"{self.op}{_operand(self.operand)}"
+
+
+class Call(Node):
+    __slots__ = _fields = ("func", "args")
+
+    def __str__(self):
+        return f"{self.func}({', '.join(map(str, self.args))})"
+
+
+class Array(Node):
+    # ``[a, b, c]``, or ``[value; repeat]``; ``type`` is the declared array type, e.g. "[int; 3]"
+    __slots__ = _fields = ("elements", "repeat", "type")
+
+    def __str__(self):
+        if self.repeat is not None:
+            return f"[{self.elements[0]}; {self.repeat}]"
+        return f"[{', '.join(map(str, self.elements))}]"
+
+
+class Index(Node):
+    __slots__ = _fields = ("value", "index")
+
+    def __str__(self):
+        return f"{_operand(self.value)}[{self.index}]"
+
+
+class Slice(Node):
+    # Missing bounds are None
+    __slots__ = _fields = ("value", "start", "stop")
+
+    def __str__(self):
+        start = "" if self.start is None else self.start
+        stop = "" if self.stop is None else self.stop
+        return f"{_operand(self.value)}[{start}:{stop}]"
+
+
+def _operand(expr):
+    return f"({expr})" if type(expr) is BinOp else str(expr)
+
+
+# Statements
+
+class Let(Node):
+    __slots__ = _fields = ("name", "type", "value")
+
+    def __str__(self):
+        return f"Declared {self.name} of type {self.type} with value {self.value}"
+
+
+class Assign(Node):
+    __slots__ = _fields = ("name", "value")
+
+    def __str__(self):
+        return f"Assigned {self.name} = {self.value}"
+
+
+class SetItem(Node):
+    __slots__ = _fields = ("name", "index", "value")
+
+    def __str__(self):
+        return f"Assigned {self.name}[{self.index}] = {self.value}"
+
+
+class ExprStmt(Node):
+    __slots__ = _fields = ("value",)
+
+    def __str__(self):
+        return f"Evaluated {self.value}"
+
+
+class Return(Node):
+    __slots__ = _fields = ("value",)
+
+    def __str__(self):
+        return f"Returned {self.value}"
+
+
+class FnDef(Node):
+    __slots__ = _fields = ("name", "params", "body", "returns")
+    _blocks = ("body",)
+
+    def __str__(self):
+        return f"Defined function {self.name} with parameters ({', '.join(self.params)})"
+
+
+class If(Node):
+    __slots__ = _fields = ("condition", "body", "orelse")
+    _blocks = ("body", "orelse")
+
+    def __str__(self):
+        return f"if condition: {self.condition}"
+
+
+class While(Node):
+    __slots__ = _fields = ("condition", "body")
+    _blocks = ("body",)
+
+    def __str__(self):
+        return f"while condition: {self.condition}"
+
+
+class Quantum(Node):
+    __slots__ = _fields = ("qubit", "operation")
+
+    def __str__(self):
+        return f"Quantum operation on qubit {self.qubit} with operation {self.operation}"
+
+
+class Blockchain(Node):
+    __slots__ = _fields = ("transaction",)
+
+    def __str__(self):
+        return f"Blockchain operation: {self.transaction} executed"
+
+
+class Sync(Node):
+    __slots__ = _fields = ("task",)
+
+    def __str__(self):
+        return f"Synchronicity task for {self.task} added to queue"
+
+
+class Async(Node):
+    __slots__ = _fields = ("task",)
+
+    def __str__(self):
+        return f"Asynchronous task for {self.task} added to queue"
+
+
+class MemoryOp(Node):
+    # ``address`` is filled in once the allocation has been performed
+    __slots__ = _fields = ("action", "operand", "address")
+
+    def __str__(self):
+        if self.action == "allocate":
+            where = "" if self.address is None else f" at {self.address}"
+            return f"Allocated {self.operand} bytes of memory{where}"
+        return f"Deallocated memory at {self.operand}"
+
+
+class Optimize(Node):
+    __slots__ = ()
+
+    def __str__(self):
+        return "AI optimization requested for program"
+
+
+class Import(Node):
+    __slots__ = _fields = ("module",)
+
+    def __str__(self):
+        return f"Imported module {self.module}"
+
+
+def walk(nodes):
+    """Yield every statement of ``nodes`` and of their nested blocks, in source order."""
+    for node in nodes:
+        yield node
+        for block in node._blocks:
+            yield from walk(getattr(node, block))
+
+
+def iter_nodes(nodes):
+    """Yield every node of ``nodes`` including nested statements and expressions."""
+    for node in nodes:
+        yield node
+        for field in node._fields:
+            value = getattr(node, field)
+            if isinstance(value, Node):
+                yield from iter_nodes((value,))
+            elif type(value) is tuple:
+                yield from iter_nodes(item for item in value if isinstance(item, Node))
+
+
+def names(expr):
+    """Yield the variable names read by expression ``expr``."""
+    expr_type = type(expr)
+    if expr_type is Name:
+        yield expr.id
+    elif expr_type is BinOp:
+        yield from names(expr.left)
+        yield from names(expr.right)
+    elif expr_type is UnaryOp:
+        yield from names(expr.operand)
+    elif expr_type is Call:
+        for arg in expr.args:
+            yield from names(arg)
+    elif expr_type is Array:
+        for element in expr.elements:
+            yield from names(element)
+        if expr.repeat is not None:
+            yield from names(expr.repeat)
+    elif expr_type is Index:
+        yield from names(expr.value)
+        yield from names(expr.index)
+    elif expr_type is Slice:
+        yield from names(expr.value)
+        for bound in (expr.start, expr.stop):
+            if bound is not None:
+                yield from names(bound)
@@ -0,0 +1,614 @@
+"""Optimization passes over parsed HTS statements.
+
+Each pass takes a list of statements and returns a new list; nodes are never
+modified in place, so cached or shared trees stay intact.  Passes work one
+scope at a time (the top level and each ``fn`` body) and are conservative
+about control flow: facts learned inside an ``if`` or ``while`` body do not
+survive it, and a call may change any global that some function assigns.
+
+What calls do is summarized by ``FunctionEffects``: the globals the
+program's functions assign and read, and which of them change arrays in
+place.  A pass normally sees the whole
+program; stream compilation (``hts.pipeline``) optimizes one batch at a
+time and threads one incomplete ``FunctionEffects`` through every batch,
+so functions of earlier batches are known, and a call of a function not
+seen yet is assumed to read and change every global.
+
+``PassManager`` runs a pipeline of passes and keeps a ``PassReport`` per
+pass with its run time and how many nodes and statements it removed.
+"""
+import time
+
+from hts.nodes import (
+    Assign, BinOp, Call, ExprStmt, FnDef, If, Index, Let, Name, Num, Return, SetItem, UnaryOp, While,
+    iter_nodes, names, walk,
+)
+from hts.bytecode import BUILTINS
+from hts.vm import _divide, _remainder
+
+_FOLD = {
+    "+": lambda a, b: a + b,
+    "-": lambda a, b: a - b,
+    "*": lambda a, b: a * b,
+    "/": _divide,
+    "%": _remainder,
+    "<": lambda a, b: a < b,
+    "<=": lambda a, b: a <= b,
+    ">": lambda a, b: a > b,
+    ">=": lambda a, b: a >= b,
+    "==": lambda a, b: a == b,
+    "!=": lambda a, b: a != b,
+}
+
+
+def _rebuild(node, **changes):
+    values = [changes.get(field, getattr(node, field)) for field in node._fields]
+    return type(node)(*values, line=node.line)
+
+
+def _is_pure(expr):
+    # Calls may print or change globals; everything else is side-effect free
+    return expr is None or not any(type(node) is Call for node in iter_nodes((expr,)))
+
+
+def _can_trap(expr):
+    # Division and remainder raise on a zero divisor, indexing out of bounds
+    for node in iter_nodes((expr,)):
+        node_type = type(node)
+        if node_type is BinOp and (node.op == "/" or node.op == "%"):
+            if type(node.right) is not Num or not node.right.value:
+                return True
+        elif node_type is Index:
+            return True
+    return False
+
+
+def _removable(expr):
+    # An expression whose evaluation can be dropped without changing the program
+    return expr is None or (_is_pure(expr) and not _can_trap(expr))
+
+
+def _same(new, old):
+    return all(a is b for a, b in zip(new, old))
+
+
+def _stores(statements):
+    return {node.name for node in walk(statements) if type(node) is Let or type(node) is Assign}
+
+
+def _has_call(statements):
+    return any(type(node) is Call for node in iter_nodes(statements))
+
+
+class FunctionEffects:
+    """Globals the functions of a program may change (``clobbered``) and read.
+
+    ``add`` records the functions of more statements.  Unless ``complete``,
+    more functions may follow, and ``unknown_call`` tells whether
+    statements call one that has not been added yet, directly or through
+    the functions they call.  ``mutates_arrays`` tells whether a call may
+    store into an array (``v[i] = x``).
+    """
+    __slots__ = ("functions", "clobbered", "global_reads", "mutators", "complete")
+
+    def __init__(self, statements=(), complete=True):
+        # Function name -> names of the functions it calls
+        self.functions = {}
+        self.clobbered = set()
+        self.global_reads = set()
+        # Functions storing into an array
+        self.mutators = set()
+        self.complete = complete
+        self.add(statements)
+
+    def add(self, statements):
+        for node in walk(statements):
+            if type(node) is FnDef:
+                body = list(walk(node.body))
+                self.functions[node.name] = _callees(node.body)
+                local = set(node.params) | {n.name for n in body if type(n) is Let}
+                self.clobbered.update(n.name for n in body if type(n) is Assign and n.name not in local)
+                self.global_reads.update(_reads(node))
+                if any(type(n) is SetItem for n in body):
+                    self.mutators.add(node.name)
+
+    def _reached(self, nodes):
+        # Functions the calls in ``nodes`` may run, transitively; None if
+        # one of them is unknown
+        pending = list(_callees(nodes))
+        reached = set()
+        while pending:
+            name = pending.pop()
+            if name in reached:
+                continue
+            callees = self.functions.get(name)
+            if callees is None:
+                if self.complete:
+                    continue
+                return None
+            reached.add(name)
+            pending.extend(callees)
+        return reached
+
+    def unknown_call(self, nodes):
+        return not self.complete and self._reached(nodes) is None
+
+    def mutates_arrays(self, nodes):
+        reached = self._reached(nodes)
+        return reached is None or not self.mutators.isdisjoint(reached)
+
+    def summary(self):
+        """Stable text of everything the passes learn from these effects."""
+        functions = sorted((name, sorted(callees)) for name, callees in self.functions.items())
+        return repr((functions, sorted(self.clobbered), sorted(self.global_reads), sorted(self.mutators),
+                     self.complete))
+
+
+def _callees(nodes):
+    return {node.func for node in iter_nodes(nodes) if type(node) is Call and node.func not in BUILTINS}
+
+
+def fold(expr, constants=None):
+    """Fold operators on literal operands; ``constants.get(name)`` returns ``Num`` nodes."""
+    expr_type = type(expr)
+    if expr_type is Name:
+        value = constants.get(expr.id) if constants else None
+        return expr if value is None else Num(value.value, line=expr.line)
+    if expr_type is BinOp:
+        left = fold(expr.left, constants)
+        right = fold(expr.right, constants)
+        if type(left) is Num and type(right) is Num:
+            try:
+                return Num(_FOLD[expr.op](left.value, right.value), line=expr.line)
+            except (ArithmeticError, KeyError):
+                # Division by zero is left to fail at run time
+                pass
+        if left is expr.left and right is expr.right:
+            return expr
+        return BinOp(expr.op, left, right, line=expr.line)
+    if expr_type is UnaryOp:
+        operand = fold(expr.operand, constants)
+        if type(operand) is Num:
+            if expr.op == "-":
+                return Num(-operand.value, line=expr.line)
+            if expr.op == "!":
+                return Num(not operand.value, line=expr.line)
+        return expr if operand is expr.operand else UnaryOp(expr.op, operand, line=expr.line)
+    if expr_type is Call:
+        args = tuple(fold(arg, constants) for arg in expr.args)
+        return expr if _same(args, expr.args) else Call(expr.func, args, line=expr.line)
+    return expr
+
+
+# Pseudo-name read by facts that index an array; killed by calls that may
+# store into one
+_ARRAYS = "[]"
+
+
+class _ForwardPass:
+    """Forward data flow over one scope.
+
+    ``facts`` maps a key to ``(value, reads)``; a fact dies as soon as any
+    name in ``reads`` is stored to.  Subclasses implement ``rewrite`` and
+    ``record``.
+    """
+
+    def __init__(self, effects):
+        self.effects = effects
+        self.facts = {}
+        # name -> keys of facts that read it (may hold stale keys)
+        self.dependents = {}
+
+    def rewrite(self, expr):
+        raise NotImplementedError
+
+    def record(self, name, value):
+        raise NotImplementedError
+
+    def add(self, key, value, reads):
+        self.facts[key] = (value, reads)
+        for name in reads:
+            self.dependents.setdefault(name, set()).add(key)
+
+    def kill(self, name):
+        for key in self.dependents.pop(name, ()):
+            fact = self.facts.get(key)
+            if fact is not None and name in fact[1]:
+                del self.facts[key]
+
+    def kill_stores(self, statements):
+        for name in _stores(statements):
+            self.kill(name)
+        if _has_call(statements):
+            self.kill_calls(statements)
+
+    def kill_calls(self, nodes):
+        if self.effects.unknown_call(nodes):
+            self.facts.clear()
+            self.dependents.clear()
+            return
+        for name in self.effects.clobbered:
+            self.kill(name)
+        if self.effects.mutates_arrays(nodes):
+            self.kill(_ARRAYS)
+
+    def expression(self, expr):
+        if expr is None:
+            return None
+        if not _is_pure(expr):
+            # Conservatively assume the call runs before every read
+            self.kill_calls((expr,))
+        return self.rewrite(expr)
+
+    def block(self, statements):
+        return [self.statement(node) for node in statements]
+
+    def statement(self, node):
+        node_type = type(node)
+        if node_type is Let or node_type is Assign:
+            value = self.expression(node.value)
+            self.kill(node.name)
+            self.record(node.name, value)
+            return node if value is node.value else _rebuild(node, value=value)
+        if node_type is SetItem:
+            index = self.expression(node.index)
+            value = self.expression(node.value)
+            if index is node.index and value is node.value:
+                return node
+            return _rebuild(node, index=index, value=value)
+        if node_type is ExprStmt or node_type is Return:
+            value = self.expression(node.value)
+            return node if value is node.value else _rebuild(node, value=value)
+        if node_type is If:
+            # Every fact learned in a branch reads a name the branch stores,
+            # so killing the branch's stores restores the facts before it
+            condition = self.expression(node.condition)
+            body = self.block(node.body)
+            self.kill_stores(node.body)
+            orelse = self.block(node.orelse)
+            self.kill_stores(node.orelse)
+            return _rebuild(node, condition=condition, body=tuple(body), orelse=tuple(orelse))
+        if node_type is While:
+            # Stores in the body reach the condition through the back edge
+            self.kill_stores(node.body)
+            condition = self.expression(node.condition)
+            body = self.block(node.body)
+            self.kill_stores(node.body)
+            return _rebuild(node, condition=condition, body=tuple(body))
+        if node_type is FnDef:
+            body = type(self)(self.effects).block(node.body)
+            return _rebuild(node, body=tuple(body))
+        return node
+
+    @classmethod
+    def run(cls, statements, effects=None):
+        return cls(effects or FunctionEffects(statements)).block(statements)
+
+
+class _ConstantFolding(_ForwardPass):
+    def rewrite(self, expr):
+        return fold(expr, self)
+
+    def get(self, name):
+        fact = self.facts.get(name)
+        return None if fact is None else fact[0]
+
+    def record(self, name, value):
+        if type(value) is Num:
+            self.add(name, value, {name})
+
+
+class _CopyPropagation(_ForwardPass):
+    def rewrite(self, expr):
+        expr_type = type(expr)
+        if expr_type is Name:
+            fact = self.facts.get(expr.id)
+            return expr if fact is None else Name(fact[0].id, line=expr.line)
+        if expr_type is BinOp:
+            left, right = self.rewrite(expr.left), self.rewrite(expr.right)
+            if left is expr.left and right is expr.right:
+                return expr
+            return BinOp(expr.op, left, right, line=expr.line)
+        if expr_type is UnaryOp:
+            operand = self.rewrite(expr.operand)
+            return expr if operand is expr.operand else UnaryOp(expr.op, operand, line=expr.line)
+        if expr_type is Call:
+            args = tuple(self.rewrite(arg) for arg in expr.args)
+            return expr if _same(args, expr.args) else Call(expr.func, args, line=expr.line)
+        return expr
+
+    def record(self, name, value):
+        if type(value) is Name and value.id != name:
+            self.add(name, value, {name, value.id})
+
+
+class _CommonSubexpressions(_ForwardPass):
+    # Facts map repr(expression) to the variable already holding its value;
+    # repr keeps 1 and 1.0 apart, which compare equal as nodes
+
+    def rewrite(self, expr):
+        expr_type = type(expr)
+        if expr_type is BinOp or expr_type is UnaryOp:
+            fact = self.facts.get(repr(expr))
+            if fact is not None:
+                return Name(fact[0].id, line=expr.line)
+            if expr_type is BinOp:
+                left, right = self.rewrite(expr.left), self.rewrite(expr.right)
+                if left is expr.left and right is expr.right:
+                    return expr
+                return BinOp(expr.op, left, right, line=expr.line)
+            operand = self.rewrite(expr.operand)
+            return expr if operand is expr.operand else UnaryOp(expr.op, operand, line=expr.line)
+        if expr_type is Call:
+            args = tuple(self.rewrite(arg) for arg in expr.args)
+            return expr if _same(args, expr.args) else Call(expr.func, args, line=expr.line)
+        return expr
+
+    def record(self, name, value):
+        if (type(value) is BinOp or type(value) is UnaryOp) and _is_pure(value):
+            reads = set(names(value))
+            if name not in reads:
+                reads.add(name)
+                if any(type(node) is Index for node in iter_nodes((value,))):
+                    reads.add(_ARRAYS)
+                self.add(repr(value), Name(name), reads)
+
+
+def fold_constants(statements, effects=None):
+    """Propagate literal values of variables and fold operators on literals."""
+    return _ConstantFolding.run(statements, effects)
+
+
+def propagate_copies(statements, effects=None):
+    """Replace reads of ``x`` after ``x = y`` with ``y`` while both are unchanged."""
+    return _CopyPropagation.run(statements, effects)
+
+
+def eliminate_common_subexpressions(statements, effects=None):
+    """Reuse a variable that already holds the value of an expression."""
+    # An array changed in place, through any alias or view, changes the value
+    # of every expression reading it without a store to its name
+    if any(type(node) is SetItem for node in walk(statements)):
+        return statements
+    return _CommonSubexpressions.run(statements, effects)
+
+
+def eliminate_dead_code(statements, effects=None):
+    """Drop unreachable statements, constant branches and pure expression statements.
+
+    An expression that can raise (``_can_trap``) is not pure here: dropping
+    it would turn a failing program into one that runs.
+    """
+    result = []
+    for node in statements:
+        node_type = type(node)
+        if node_type is If:
+            if type(node.condition) is Num:
+                result.extend(eliminate_dead_code(node.body if node.condition.value else node.orelse))
+                if result and type(result[-1]) is Return:
+                    break
+                continue
+            body = eliminate_dead_code(node.body)
+            orelse = eliminate_dead_code(node.orelse)
+            if not body and not orelse and _removable(node.condition):
+                continue
+            node = _rebuild(node, body=tuple(body), orelse=tuple(orelse))
+        elif node_type is While:
+            if type(node.condition) is Num and not node.condition.value:
+                continue
+            node = _rebuild(node, body=tuple(eliminate_dead_code(node.body)))
+        elif node_type is ExprStmt:
+            if _removable(node.value):
+                continue
+        elif node_type is FnDef:
+            node = _rebuild(node, body=tuple(eliminate_dead_code(node.body)))
+        result.append(node)
+        if node_type is Return:
+            # Anything after a return in the same block is unreachable
+            break
+    return result
+
+
+class _LiveSet:
+    """Live names kept as changes over the enclosing block's set.
+
+    Branches only pay for the names they touch instead of copying the
+    enclosing set.  ``reset`` marks a block that ends in ``return``, whose
+    live names no longer depend on what follows it.
+    """
+    __slots__ = ("outer", "read", "dead", "reset")
+
+    def __init__(self, outer):
+        self.outer = outer
+        self.read = set()
+        self.dead = set()
+        self.reset = False
+
+    def __contains__(self, name):
+        if name in self.read:
+            return True
+        return not self.reset and name not in self.dead and name in self.outer
+
+    def store(self, name):
+        self.read.discard(name)
+        self.dead.add(name)
+
+    def load(self, loaded):
+        self.read.update(loaded)
+
+    def clear(self):
+        self.read = set()
+        self.dead = set()
+        self.reset = True
+
+
+def _reads(node):
+    return {name for expr in iter_nodes((node,)) for name in names(expr)}
+
+
+class _Liveness:
+    """Backward liveness over one scope, dropping stores nobody reads."""
+
+    def __init__(self, removable, pinned):
+        # A ``let`` is only dropped if the name is never assigned elsewhere,
+        # otherwise the assignment would lose its declaration
+        self.removable = removable
+        self.pinned = pinned
+
+    def block(self, statements, live):
+        result = []
+        for node in reversed(statements):
+            node_type = type(node)
+            if node_type is Let or node_type is Assign:
+                dead = (
+                    node.name not in live
+                    and node.name not in self.pinned
+                    and (node_type is Assign or node.name in self.removable)
+                    and _removable(node.value)
+                )
+                if dead:
+                    continue
+                live.store(node.name)
+                live.load(names(node.value))
+            elif node_type is Return:
+                live.clear()
+                if node.value is not None:
+                    live.load(names(node.value))
+            elif node_type is ExprStmt:
+                live.load(names(node.value))
+            elif node_type is SetItem:
+                live.load(_reads(node))
+                live.load((node.name,))
+            elif node_type is If:
+                body_live, orelse_live = _LiveSet(live), _LiveSet(live)
+                body = self.block(node.body, body_live)
+                orelse = self.block(node.orelse, orelse_live)
+                if body_live.reset and orelse_live.reset:
+                    live.clear()
+                else:
+                    if body_live.reset:
+                        overwritten = orelse_live.dead
+                    elif orelse_live.reset:
+                        overwritten = body_live.dead
+                    else:
+                        overwritten = body_live.dead & orelse_live.dead
+                    for name in overwritten:
+                        live.store(name)
+                live.load(body_live.read)
+                live.load(orelse_live.read)
+                live.load(names(node.condition))
+                node = _rebuild(node, body=tuple(body), orelse=tuple(orelse))
+            elif node_type is While:
+                # Everything the loop reads is live throughout it, and the body
+                # may not run at all, so it cannot kill anything live after it
+                live.load(_reads(node))
+                body = self.block(node.body, _LiveSet(live))
+                node = _rebuild(node, body=tuple(body))
+            elif node_type is FnDef:
+                node = _rebuild(node, body=tuple(_function_liveness(node)))
+            result.append(node)
+        result.reverse()
+        return result
+
+
+def _function_liveness(definition):
+    local = set(definition.params) | {n.name for n in walk(definition.body) if type(n) is Let}
+    assigned = {n.name for n in walk(definition.body) if type(n) is Assign}
+    # Stores to non-local names are globals that outlive the call
+    pinned = _stores(definition.body) - local
+    return _Liveness(local - assigned, pinned).block(list(definition.body), _LiveSet(frozenset()))
+
+
+def eliminate_dead_stores(statements, effects=None):
+    """Drop stores whose value is overwritten or never read before the scope ends."""
+    # Top-level variables stay observable after the program (symbol table,
+    # importing modules), so only stores overwritten before a read go away;
+    # names that functions read must survive every call
+    effects = effects or FunctionEffects(statements)
+    top_level = _stores(statements)
+    global_reads = effects.global_reads
+    if effects.unknown_call(statements):
+        # A function not seen yet may read any of them
+        global_reads = global_reads | top_level
+    assigned = {n.name for n in walk(statements) if type(n) is Assign}
+    liveness = _Liveness(top_level - assigned, global_reads)
+    return liveness.block(list(statements), _LiveSet(top_level))
+
+
+DEFAULT_PASSES = (
+    fold_constants,
+    propagate_copies,
+    eliminate_common_subexpressions,
+    eliminate_dead_code,
+    eliminate_dead_stores,
+)
+
+
+def _count(statements):
+    return sum(1 for _ in walk(statements)), sum(1 for _ in iter_nodes(statements))
+
+
+class PassReport:
+    __slots__ = ("name", "seconds", "statements_before", "statements_after", "nodes_before", "nodes_after")
+
+    def __init__(self, name, seconds, before, after):
+        self.name = name
+        self.seconds = seconds
+        self.statements_before, self.nodes_before = before
+        self.statements_after, self.nodes_after = after
+
+    @property
+    def nodes_removed(self):
+        return self.nodes_before - self.nodes_after
+
+    @property
+    def statements_removed(self):
+        return self.statements_before - self.statements_after
+
+    def as_dict(self):
+        return {
+            "name": self.name, "seconds": self.seconds,
+            "statements_removed": self.statements_removed, "nodes_removed": self.nodes_removed,
+        }
+
+    def __str__(self):
+        return (f"{self.name}: {self.seconds * 1000:.2f} ms, removed {self.nodes_removed} nodes "
+                f"({self.statements_removed} statements)")
+
+
+class PassManager:
+    def __init__(self, passes=DEFAULT_PASSES):
+        self.passes = list(passes)
+        self.reports = []
+
+    def run(self, statements, effects=None, constants=None):
+        """Run every pass in order; reports of this run replace ``reports``.
+
+        Passes are called as ``optimization(statements, effects)``.  Pass
+        the same incomplete ``FunctionEffects`` to every run over the parts
+        of one program; it learns the functions of each part.
+        ``constants`` maps variables to the values they are known to hold
+        when ``statements`` start; the passes see them as ``let``
+        statements that are dropped from the result.
+        """
+        statements = list(statements)
+        if effects is None:
+            effects = FunctionEffects(statements)
+        else:
+            effects.add(statements)
+        seeded = [Let(name, None, Num(value)) for name, value in (constants or {}).items()]
+        if seeded:
+            statements = seeded + statements
+        self.reports = []
+        counts = _count(statements)
+        for optimization in self.passes:
+            start = time.perf_counter()
+            statements = optimization(statements, effects)
+            elapsed = time.perf_counter() - start
+            after = _count(statements)
+            self.reports.append(PassReport(optimization.__name__, elapsed, counts, after))
+            counts = after
+        if seeded:
+            seeded = {id(node) for node in seeded}
+            statements = [node for node in statements if id(node) not in seeded]
+        return statements
@@ -0,0 +1,240 @@
+"""``parallel_exec``: HTS function calls run side by side in worker processes.
+
+``parallel_exec(f(a), g(b), ...)`` evaluates the arguments of every call in
+the caller, runs the calls on a persistent ``hts.distributed.Cluster`` of
+worker processes (one per CPU, started on first use and kept until exit),
+and returns their results as a list, in the order of the calls.  An
+exception raised by any call is re-raised in the caller, after every call
+has finished, with the worker's traceback chained as its cause.
+
+The program is pickled once and each call names it by digest; a worker
+that has not seen the digest answers so, and only then is sent the pickle,
+unpickles it once and keeps a VM for it, with a JIT if the calling VM has
+one, so hot functions stay compiled across calls.  Both sides keep the
+``PROGRAM_CACHE`` most recently used programs.  Arguments are passed by
+value, together with a snapshot of the globals: stores a call makes to
+globals or to its array arguments are not seen by the caller, and its
+effect statements are not run.  Arrays of ``SHARE_THRESHOLD`` bytes or
+more, in either direction, travel through ``multiprocessing.shared_memory``
+instead of being pickled; smaller values are pickled.  Calls made inside a
+worker, including nested ``parallel_exec``, run in that worker.
+"""
+import atexit
+import hashlib
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from multiprocessing import resource_tracker, shared_memory
+
+# Arrays at least this large (in bytes) are passed through shared memory
+SHARE_THRESHOLD = 1 << 16
+# Programs kept pickled by the caller and loaded by each worker
+PROGRAM_CACHE = 8
+
+_pool = None
+_pool_lock = threading.Lock()
+# id(program) -> (program, digest, pickled program), least recently used first
+_serialized = OrderedDict()
+# Set in worker processes
+_in_worker = False
+
+
+def get_pool(workers=None):
+    """The shared worker cluster, started with ``workers`` processes (default: one per CPU)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            from hts.distributed import Cluster
+            # Workers must share the coordinator's resource tracker, or each
+            # would report the shared memory blocks the other side unlinks
+            resource_tracker.ensure_running()
+            _pool = Cluster(workers or os.cpu_count() or 1, retries=0)
+        return _pool
+
+
+@atexit.register
+def shutdown():
+    """Stop the worker cluster; the next ``parallel_exec`` starts a new one."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.close()
+
+
+class SharedArray:
+    """Picklable handle of an array copied into a shared memory block."""
+    __slots__ = ("name", "shape", "dtype")
+
+    def __init__(self, name, shape, dtype):
+        self.name = name
+        self.shape = shape
+        self.dtype = dtype
+
+
+def _share(value, blocks):
+    # A SharedArray for a large array, ``value`` itself otherwise; new blocks are added to ``blocks``
+    if getattr(value, "ndim", 0) == 0 or value.nbytes < SHARE_THRESHOLD:
+        return value
+    import numpy as np
+    block = shared_memory.SharedMemory(create=True, size=value.nbytes)
+    blocks.append(block)
+    np.ndarray(value.shape, value.dtype, buffer=block.buf)[...] = value
+    return SharedArray(block.name, value.shape, value.dtype.str)
+
+
+def _attach(value, blocks):
+    # Zero-copy view of a SharedArray; the block is added to ``blocks``
+    if type(value) is not SharedArray:
+        return value
+    import numpy as np
+    block = shared_memory.SharedMemory(name=value.name)
+    blocks.append(block)
+    return np.ndarray(value.shape, np.dtype(value.dtype), buffer=block.buf)
+
+
+def _take(value):
+    # A result SharedArray as a private array; its block is freed
+    if type(value) is not SharedArray:
+        return value
+    import numpy as np
+    block = shared_memory.SharedMemory(name=value.name)
+    try:
+        return np.ndarray(value.shape, np.dtype(value.dtype), buffer=block.buf).copy()
+    finally:
+        block.close()
+        block.unlink()
+
+
+def _release(blocks):
+    for block in blocks:
+        try:
+            block.close()
+        except BufferError:
+            # An array still points into the block (e.g. from a traceback); it
+            # is unmapped when that array goes away
+            pass
+
+
+def _pickled(program):
+    key = id(program)
+    entry = _serialized.get(key)
+    if entry is None or entry[0] is not program:
+        data = pickle.dumps(program, pickle.HIGHEST_PROTOCOL)
+        entry = _serialized[key] = (program, hashlib.blake2b(data, digest_size=16).digest(), data)
+        if len(_serialized) > PROGRAM_CACHE:
+            _serialized.popitem(last=False)
+    _serialized.move_to_end(key)
+    return entry[1], entry[2]
+
+
+class _Missing:
+    """Answer of a worker asked to run a program it does not have."""
+    __slots__ = ()
+
+
+# Worker side
+
+# digest -> (program, VM), least recently used first
+_programs = OrderedDict()
+
+
+def _call(digest, data, index, args, global_values, tiered):
+    global _in_worker
+    _in_worker = True
+    entry = _programs.get(digest)
+    if entry is not None:
+        _programs.move_to_end(digest)
+    elif data is None:
+        return _Missing()
+    else:
+        from hts.vm import VM
+        jit = None
+        if tiered:
+            from hts.jit import JIT
+            jit = JIT()
+        entry = _programs[digest] = (pickle.loads(data), VM(jit=jit))
+        if len(_programs) > PROGRAM_CACHE:
+            _programs.popitem(last=False)
+    program, vm = entry
+    blocks = []
+    try:
+        vm.globals = [_attach(value, blocks) for value in global_values]
+        args = [_attach(value, blocks) for value in args]
+        result = _invoke(vm, program, program.functions[index], args)
+        # Copy out before the input blocks are closed: the result may be a view into one
+        shared = []
+        packed = _share(result, shared)
+        if packed is result and getattr(result, "ndim", 0):
+            packed = result.copy()
+        for block in shared:
+            block.close()
+        return packed
+    finally:
+        vm.globals = []
+        vm.events.clear()
+        args = result = None
+        _release(blocks)
+
+
+def _invoke(vm, program, unit, args):
+    if vm.jit is not None:
+        return vm.jit.entry(vm, program, unit)(*args)
+    return vm._execute(program, unit, args + [None] * (unit.nregs - unit.arity))
+
+
+# Caller side
+
+def parallel_exec(vm, program, spec, values):
+    """Results of the calls ``spec`` of ``program``, run in parallel; ``values`` are their arguments."""
+    _, calls = spec
+    if _in_worker:
+        results = []
+        offset = 0
+        for index, arity in calls:
+            results.append(_invoke(vm, program, program.functions[index], list(values[offset:offset + arity])))
+            offset += arity
+        return results
+
+    pool = get_pool()
+    digest, data = _pickled(program)
+    tiered = vm.jit is not None
+    blocks = []
+    try:
+        global_values = [_share(value, blocks) for value in vm.globals]
+        requests = []
+        offset = 0
+        for index, arity in calls:
+            args = [_share(value, blocks) for value in values[offset:offset + arity]]
+            offset += arity
+            requests.append((index, args))
+        futures = [pool.submit(_call, digest, None, index, args, global_values, tiered)
+                   for index, args in requests]
+        # Wait for every call before freeing the argument blocks they read;
+        # a worker without the program gets the call again with its pickle
+        results = [None] * len(futures)
+        error = None
+        for resend in (True, False):
+            for position, future in enumerate(futures):
+                if future is None:
+                    continue
+                futures[position] = None
+                try:
+                    result = future.result()
+                except Exception as exc:
+                    if error is None:
+                        error = exc
+                    continue
+                if type(result) is _Missing and resend:
+                    index, args = requests[position]
+                    futures[position] = pool.submit(_call, digest, data, index, args, global_values, tiered)
+                else:
+                    results[position] = _take(result)
+        if error is not None:
+            raise error
+        return results
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
@@ -0,0 +1,333 @@
+"""Parser turning ``hts.lexer`` tokens into ``hts.nodes`` statements.
+
+``parse`` consumes the token stream with a single token of lookahead and
+yields top-level statements as soon as they are complete, so it can be
+chained directly onto ``tokenize`` without materializing the token list.
+Tokens that do not start a known statement are skipped, as before.
+
+Array types are written ``[element; size]``, nested for matrices
+(``[[float; 3]; 2]``), and kept as that text in ``Let.type``;
+``parse_array_type`` splits it into the element type and the shape.
+"""
+from hts.lexer import IDENT, KEYWORD, NUMBER, OP
+from hts.nodes import (
+    Array, Assign, Async, BinOp, Blockchain, Call, ExprStmt, FnDef, If, Import, Index, Let,
+    MemoryOp, Name, Num, Optimize, Quantum, Return, SetItem, Slice, Sync, UnaryOp, While,
+)
+
+# Binding power of binary operators; all of them are left associative
+BINARY_PRECEDENCE = {
+    "==": 1, "!=": 1,
+    "<": 2, "<=": 2, ">": 2, ">=": 2,
+    "+": 3, "-": 3,
+    "*": 4, "/": 4, "%": 4,
+}
+
+
+# Element types of arrays (hts.array maps them to NumPy dtypes)
+ARRAY_ELEMENT_TYPES = frozenset({"int", "float", "bool", "i8", "i16", "i32", "i64", "u8", "f32", "f64"})
+
+
+class ParseError(SyntaxError):
+    pass
+
+
+def parse_array_type(text):
+    """``(element type, shape)`` of an array type such as ``"[[float; 3]; 2]"``.
+
+    The shape is None if any dimension has no size; scalar types give None.
+    """
+    if not text or text[0] != "[":
+        return None
+    shape = []
+    while text[:1] == "[":
+        if text[-1:] != "]":
+            raise ParseError(f"invalid array type {text!r}")
+        text, separator, size = text[1:-1].rpartition(";")
+        if not separator:
+            text, size = size, None
+        elif not size.strip().isdigit():
+            raise ParseError(f"invalid array size {size.strip()!r}")
+        text = text.strip()
+        shape.append(None if size is None else int(size))
+    if text not in ARRAY_ELEMENT_TYPES:
+        raise ParseError(f"unknown array element type {text!r}")
+    return text, None if None in shape else tuple(shape)
+
+
+class Parser:
+    def __init__(self, tokens):
+        self._tokens = iter(tokens)
+        self._peek = next(self._tokens, None)
+
+    def _next(self):
+        token = self._peek
+        if token is None:
+            raise ParseError("unexpected end of input")
+        self._peek = next(self._tokens, None)
+        return token
+
+    def _accept(self, text):
+        # Consume the next token if it is ``text``
+        if self._peek is not None and self._peek.text == text:
+            return self._next()
+        return None
+
+    def _expect(self, text):
+        token = self._next()
+        if token.text != text:
+            raise ParseError(f"line {token.line}: expected {text!r}, got {token.text!r}")
+        return token
+
+    def statements(self):
+        while self._peek is not None:
+            node = self._statement()
+            if node is not None:
+                yield node
+
+    def _statement(self):
+        token = self._next()
+        if token.kind == IDENT:
+            return self._name_statement(token)
+        if token.kind != KEYWORD:
+            return None
+        handler = self._handlers.get(token.text)
+        if handler is None:
+            return None
+        return handler(self, token)
+
+    # name = expr;  name[index] = expr;  or  name(args);
+    def _name_statement(self, token):
+        if self._accept("="):
+            node = Assign(token.text, self._expression(), line=token.line)
+        elif self._accept("["):
+            index = self._expression()
+            self._expect("]")
+            self._expect("=")
+            node = SetItem(token.text, index, self._expression(), line=token.line)
+        elif self._accept("("):
+            node = ExprStmt(self._call(token), line=token.line)
+        else:
+            return None
+        self._accept(";")
+        return node
+
+    # Expressions: precedence climbing over BINARY_PRECEDENCE
+    def _expression(self, min_precedence=1):
+        left = self._unary()
+        while True:
+            token = self._peek
+            if token is None or token.kind != OP:
+                return left
+            precedence = BINARY_PRECEDENCE.get(token.text)
+            if precedence is None or precedence < min_precedence:
+                return left
+            self._next()
+            right = self._expression(precedence + 1)
+            left = BinOp(token.text, left, right, line=token.line)
+
+    def _unary(self):
+        token = self._peek
+        if token is not None and token.text in ("-", "!"):
+            self._next()
+            return UnaryOp(token.text, self._unary(), line=token.line)
+        return self._postfix(self._primary())
+
+    # value[index]  value[start:stop]
+    def _postfix(self, value):
+        while self._peek is not None and self._peek.text == "[":
+            token = self._next()
+            start = None
+            if self._peek is None or self._peek.text != ":":
+                start = self._expression()
+                if self._accept("]"):
+                    value = Index(value, start, line=token.line)
+                    continue
+            self._expect(":")
+            stop = None
+            if self._peek is None or self._peek.text != "]":
+                stop = self._expression()
+            self._expect("]")
+            value = Slice(value, start, stop, line=token.line)
+        return value
+
+    def _primary(self):
+        token = self._next()
+        if token.kind == NUMBER:
+            text = token.text
+            try:
+                value = float(text) if "." in text else int(text)
+            except ValueError:
+                raise ParseError(f"line {token.line}: invalid number {text!r}") from None
+            return Num(value, line=token.line)
+        if token.kind == IDENT:
+            if self._accept("("):
+                return self._call(token)
+            return Name(token.text, line=token.line)
+        if token.text == "(":
+            expr = self._expression()
+            self._expect(")")
+            return expr
+        if token.text == "[":
+            return self._array(token)
+        raise ParseError(f"line {token.line}: unexpected {token.text!r} in expression")
+
+    def _call(self, token):
+        # The opening parenthesis has been consumed
+        args = []
+        if not self._accept(")"):
+            args.append(self._expression())
+            while self._accept(","):
+                args.append(self._expression())
+            self._expect(")")
+        return Call(token.text, tuple(args), line=token.line)
+
+    # [a, b, ...]  or  [value; repeat]; the opening bracket has been consumed
+    def _array(self, token):
+        elements = []
+        repeat = None
+        if not self._accept("]"):
+            elements.append(self._expression())
+            if self._accept(";"):
+                repeat = self._expression()
+            else:
+                while self._accept(","):
+                    elements.append(self._expression())
+            self._expect("]")
+        return Array(tuple(elements), repeat, line=token.line)
+
+    # name  or  [type; size]  or  [type]
+    def _type(self):
+        if not self._accept("["):
+            return self._next().text
+        element = self._type()
+        if not self._accept(";"):
+            self._expect("]")
+            return f"[{element}]"
+        size = self._next()
+        if size.kind != NUMBER:
+            raise ParseError(f"line {size.line}: array size must be a number, got {size.text!r}")
+        self._expect("]")
+        return f"[{element}; {size.text}]"
+
+    def _block(self):
+        if not self._accept("{"):
+            return ()
+        body = []
+        while True:
+            if self._peek is None:
+                raise ParseError("unterminated block, expected '}'")
+            if self._accept("}"):
+                return tuple(body)
+            node = self._statement()
+            if node is not None:
+                body.append(node)
+
+    # let name[: type] = expr;
+    def _let(self, token):
+        name = self._next().text
+        var_type = None
+        if self._accept(":") or self._peek is not None and self._peek.text != "=":
+            var_type = self._type()
+        self._expect("=")
+        value = self._expression()
+        self._accept(";")
+        if var_type is not None and var_type[0] == "[":
+            value = self._typed_array(var_type, value, token.line)
+        return Let(name, var_type, value, line=token.line)
+
+    # Attach a declared array type to an array literal (other values keep their own type)
+    def _typed_array(self, var_type, value, line):
+        try:
+            _, shape = parse_array_type(var_type)
+        except ParseError as exc:
+            raise ParseError(f"line {line}: {exc}") from None
+        if type(value) is not Array:
+            return value
+        if shape is not None and value.repeat is None and len(value.elements) != shape[0]:
+            raise ParseError(f"line {line}: {var_type} array given {len(value.elements)} elements")
+        return Array(value.elements, value.repeat, var_type, line=value.line)
+
+    # fn name(param[: type], ...) [-> type] { body }
+    def _fn(self, token):
+        name = self._next().text
+        params = []
+        returns = None
+        if self._accept("("):
+            while not self._accept(")"):
+                params.append(self._next().text)
+                if self._accept(":"):
+                    self._type()
+                self._accept(",")
+        if self._accept("->"):
+            returns = self._type()
+        return FnDef(name, tuple(params), self._block(), returns, line=token.line)
+
+    def _return(self, token):
+        value = None
+        if self._peek is not None and self._peek.text not in (";", "}"):
+            value = self._expression()
+        self._accept(";")
+        return Return(value, line=token.line)
+
+    # if condition { body } else { body }
+    def _if(self, token):
+        condition = self._expression()
+        body = self._block()
+        orelse = ()
+        if self._accept("else"):
+            if self._peek is not None and self._peek.text == "if":
+                orelse = (self._if(self._next()),)
+            else:
+                orelse = self._block()
+        return If(condition, body, orelse, line=token.line)
+
+    def _while(self, token):
+        condition = self._expression()
+        return While(condition, self._block(), line=token.line)
+
+    def _quantum(self, token):
+        qubit = self._next().text
+        return Quantum(qubit, self._next().text, line=token.line)
+
+    def _blockchain(self, token):
+        return Blockchain(self._next().text, line=token.line)
+
+    def _sync(self, token):
+        return Sync(self._next().text, line=token.line)
+
+    def _async(self, token):
+        return Async(self._next().text, line=token.line)
+
+    def _memory(self, token):
+        action = self._next().text
+        if action not in ("allocate", "deallocate"):
+            raise ParseError(f"line {token.line}: unknown memory operation {action!r}")
+        return MemoryOp(action, self._next().text, line=token.line)
+
+    def _optimize(self, token):
+        return Optimize(line=token.line)
+
+    def _import(self, token):
+        return Import(self._next().text, line=token.line)
+
+    _handlers = {
+        "let": _let,
+        "fn": _fn,
+        "return": _return,
+        "if": _if,
+        "while": _while,
+        "loop": _while,
+        "quantum": _quantum,
+        "blockchain": _blockchain,
+        "sync": _sync,
+        "async": _async,
+        "memory": _memory,
+        "optimize": _optimize,
+        "import": _import,
+    }
+
+
+def parse(tokens):
+    """Yield the top-level statements of a token stream."""
+    return Parser(tokens).statements()
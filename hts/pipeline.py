@@ -0,0 +1,99 @@
+"""Bounded-memory pipelined compilation.
+
+``compile_file`` memory-maps the source and chains lexing, parsing,
+declaration, optimization and code generation as generator stages.  Only
+one batch of statements is alive at a time and generated code is written to
+the sink as soon as its batch completes, so peak memory does not grow with
+the size of the input.
+"""
+import mmap
+import os
+from contextlib import contextmanager
+from itertools import islice
+
+from hts.lexer import tokenize
+from hts.nodes import walk
+from hts.parser import parse
+
+# Statements handed to the declare/optimize/generate stages at a time
+BATCH_SIZE = 256
+
+
+class MappedReader:
+    """Sequential ``read(n)`` over an mmap that releases pages once consumed.
+
+    Without the release, every page of the input stays resident and counts
+    towards the process RSS until the mapping is closed.
+    """
+
+    def __init__(self, mapped):
+        self._mapped = mapped
+        self._position = 0
+        self._released = 0
+        self._can_release = hasattr(mapped, "madvise") and hasattr(mmap, "MADV_DONTNEED")
+
+    def read(self, size):
+        start = self._position
+        data = self._mapped[start:start + size]
+        self._position = start + len(data)
+        if self._can_release:
+            end = start - start % mmap.PAGESIZE
+            if end > self._released:
+                self._mapped.madvise(mmap.MADV_DONTNEED, self._released, end - self._released)
+                self._released = end
+        return data
+
+
+@contextmanager
+def map_source(path):
+    """Memory-map ``path`` read-only; yields an object with ``read(n)``."""
+    with open(path, "rb") as handle:
+        if os.fstat(handle.fileno()).st_size == 0:
+            yield handle
+            return
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield MappedReader(mapped)
+
+
+def batches(items, size=BATCH_SIZE):
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def describe(statements):
+    # Default code generator: one description line per statement
+    return [str(node) for node in walk(statements)]
+
+
+@contextmanager
+def _unmeasured(name):
+    yield
+
+
+def compile_file(path, sink, declare=list, optimize=list, generate=describe, batch_size=BATCH_SIZE,
+                 measure=_unmeasured):
+    """Stream-compile ``path``, writing each generated line to ``sink``.
+
+    ``declare``, ``optimize`` and ``generate`` are the compiler phases; each
+    receives a list of statements (one batch) and returns the next stage's
+    input.  Lexing and parsing of each batch run inside ``measure("parse")``.
+    Returns the number of lines written.
+    """
+    written = 0
+    write = sink.write
+    with map_source(path) as source:
+        pending = batches(parse(tokenize(source)), batch_size)
+        while True:
+            with measure("parse"):
+                batch = next(pending, None)
+            if batch is None:
+                break
+            for line in generate(optimize(declare(batch))):
+                write(line)
+                write("\n")
+                written += 1
+    return written
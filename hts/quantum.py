@@ -0,0 +1,291 @@
+"""Statevector quantum simulator.
+
+The state of ``n`` qubits is one complex NumPy vector of length ``2**n``;
+qubit ``q`` is bit ``q`` of the basis-state index.  A gate is applied by
+reshaping the vector so that the qubit becomes its own axis and combining
+the two halves along that axis in place, so every gate is a handful of
+vectorized operations over the whole state with one preallocated scratch
+buffer and no per-amplitude Python work.  Diagonal gates only scale slices.
+
+Single-qubit gates are not applied immediately: consecutive gates on the
+same qubit are multiplied into one 2x2 matrix and applied when the qubit is
+next touched by a multi-qubit gate, a measurement or a state read.
+
+The default ``complex64`` amplitudes put 25 qubits at 256 MiB (plus the same
+again for scratch); pass ``dtype=numpy.complex128`` for double precision.
+"""
+import cmath
+import math
+
+import numpy as np
+
+MAX_QUBITS = 32
+
+# Shots are sampled block by block so no cumulative sum of the whole state is kept
+SAMPLE_BLOCK = 1 << 16
+
+_SQRT_HALF = 1 / math.sqrt(2)
+
+GATES = {
+    "i": np.eye(2),
+    "x": np.array([[0, 1], [1, 0]]),
+    "y": np.array([[0, -1j], [1j, 0]]),
+    "z": np.array([[1, 0], [0, -1]]),
+    "h": np.array([[_SQRT_HALF, _SQRT_HALF], [_SQRT_HALF, -_SQRT_HALF]]),
+    "s": np.array([[1, 0], [0, 1j]]),
+    "sdg": np.array([[1, 0], [0, -1j]]),
+    "t": np.array([[1, 0], [0, cmath.exp(1j * math.pi / 4)]]),
+    "tdg": np.array([[1, 0], [0, cmath.exp(-1j * math.pi / 4)]]),
+    "sx": np.array([[1 + 1j, 1 - 1j], [1 - 1j, 1 + 1j]]) / 2,
+}
+
+
+def rx(theta):
+    c, s = math.cos(theta / 2), math.sin(theta / 2)
+    return np.array([[c, -1j * s], [-1j * s, c]])
+
+
+def ry(theta):
+    c, s = math.cos(theta / 2), math.sin(theta / 2)
+    return np.array([[c, -s], [s, c]])
+
+
+def rz(theta):
+    return np.array([[cmath.exp(-0.5j * theta), 0], [0, cmath.exp(0.5j * theta)]])
+
+
+def phase(theta):
+    return np.array([[1, 0], [0, cmath.exp(1j * theta)]])
+
+
+class Statevector:
+    def __init__(self, num_qubits=0, dtype=np.complex64, fuse=True, seed=None):
+        if num_qubits > MAX_QUBITS:
+            raise ValueError(f"at most {MAX_QUBITS} qubits are supported")
+        self.num_qubits = num_qubits
+        self.dtype = np.dtype(dtype)
+        self.fuse = fuse
+        self.rng = np.random.default_rng(seed)
+        self._state = np.zeros(1 << num_qubits, self.dtype)
+        self._state[0] = 1
+        self._scratch = None
+        # qubit -> fused 2x2 matrix not yet applied
+        self._pending = {}
+        # Gates requested, and state sweeps actually performed
+        self.gates = 0
+        self.kernels = 0
+
+    # State access
+
+    @property
+    def state(self):
+        self.flush()
+        return self._state
+
+    def add_qubit(self):
+        """Append a qubit in state |0>; returns its index."""
+        if self.num_qubits >= MAX_QUBITS:
+            raise ValueError(f"at most {MAX_QUBITS} qubits are supported")
+        size = len(self._state)
+        state = np.zeros(2 * size, self.dtype)
+        state[:size] = self._state
+        self._state = state
+        self._scratch = None
+        self.num_qubits += 1
+        return self.num_qubits - 1
+
+    def _check(self, *qubits):
+        for qubit in qubits:
+            if not 0 <= qubit < self.num_qubits:
+                raise ValueError(f"qubit {qubit} out of range for {self.num_qubits} qubits")
+        if len(set(qubits)) != len(qubits):
+            raise ValueError(f"gate qubits must be distinct: {qubits}")
+
+    def _buffers(self, shape):
+        # Two scratch arrays of ``shape`` carved out of one reusable buffer
+        if self._scratch is None:
+            self._scratch = np.empty(len(self._state), self.dtype)
+        size = math.prod(shape)
+        return self._scratch[:size].reshape(shape), self._scratch[size:2 * size].reshape(shape)
+
+    # Kernels
+
+    def _kernel(self, a0, a1, matrix):
+        # In place: (a0, a1) <- matrix @ (a0, a1) along the gate's qubit axis
+        self.kernels += 1
+        # Scalars in the state's precision keep NumPy on the single-precision loops
+        (m00, m01), (m10, m11) = matrix.astype(self.dtype)
+        if m01 == 0 and m10 == 0:
+            if m00 != 1:
+                a0 *= m00
+            if m11 != 1:
+                a1 *= m11
+            return
+        t0, t1 = self._buffers(a0.shape)
+        if m00 == 0 and m11 == 0:
+            np.copyto(t0, a0)
+            np.multiply(a1, m01, out=a0)
+            np.multiply(t0, m10, out=a1)
+            return
+        np.multiply(a1, m01, out=t0)
+        np.multiply(a1, m11, out=t1)
+        np.multiply(a0, m10, out=a1)
+        a1 += t1
+        a0 *= m00
+        a0 += t0
+
+    def _halves(self, qubit):
+        view = self._state.reshape(-1, 2, 1 << qubit)
+        return view[:, 0, :], view[:, 1, :]
+
+    def _pair(self, first, second):
+        # 5-d view with one axis per qubit; returns (view, axis of first, axis of second)
+        high, low = max(first, second), min(first, second)
+        view = self._state.reshape(-1, 2, 1 << (high - low - 1), 2, 1 << low)
+        return (view, 1, 3) if first == high else (view, 3, 1)
+
+    @staticmethod
+    def _select(view, axes_values):
+        index = [slice(None)] * view.ndim
+        for axis, value in axes_values:
+            index[axis] = value
+        return view[tuple(index)]
+
+    def _apply_now(self, matrix, qubit):
+        a0, a1 = self._halves(qubit)
+        self._kernel(a0, a1, matrix)
+
+    # Gates
+
+    def apply(self, matrix, qubit):
+        """Apply the 2x2 unitary ``matrix`` (or a name in ``GATES``) to ``qubit``."""
+        if isinstance(matrix, str):
+            matrix = GATES[matrix]
+        self._check(qubit)
+        self.gates += 1
+        matrix = np.asarray(matrix, dtype=np.complex128)
+        if not self.fuse:
+            self._apply_now(matrix, qubit)
+            return
+        pending = self._pending.get(qubit)
+        self._pending[qubit] = matrix if pending is None else matrix @ pending
+
+    def flush(self, qubits=None):
+        """Apply fused gates waiting on ``qubits`` (default: all)."""
+        if not self._pending:
+            return
+        for qubit in list(self._pending) if qubits is None else qubits:
+            matrix = self._pending.pop(qubit, None)
+            if matrix is not None:
+                self._apply_now(matrix, qubit)
+
+    def controlled(self, matrix, control, target):
+        """Apply ``matrix`` to ``target`` where ``control`` is 1."""
+        if isinstance(matrix, str):
+            matrix = GATES[matrix]
+        self._check(control, target)
+        self.gates += 1
+        self.flush((control, target))
+        view, control_axis, target_axis = self._pair(control, target)
+        a0 = self._select(view, ((control_axis, 1), (target_axis, 0)))
+        a1 = self._select(view, ((control_axis, 1), (target_axis, 1)))
+        self._kernel(a0, a1, np.asarray(matrix, dtype=np.complex128))
+
+    def cx(self, control, target):
+        self.controlled(GATES["x"], control, target)
+
+    def cz(self, control, target):
+        self._check(control, target)
+        self.gates += 1
+        self.flush((control, target))
+        view, control_axis, target_axis = self._pair(control, target)
+        self._select(view, ((control_axis, 1), (target_axis, 1)))[...] *= -1
+        self.kernels += 1
+
+    def swap(self, first, second):
+        self._check(first, second)
+        self.gates += 1
+        self.flush((first, second))
+        view, first_axis, second_axis = self._pair(first, second)
+        a = self._select(view, ((first_axis, 0), (second_axis, 1)))
+        b = self._select(view, ((first_axis, 1), (second_axis, 0)))
+        t0, _ = self._buffers(a.shape)
+        np.copyto(t0, a)
+        np.copyto(a, b)
+        np.copyto(b, t0)
+        self.kernels += 1
+
+    # Measurement
+
+    def probabilities(self):
+        state = self.state
+        return np.square(state.real) + np.square(state.imag)
+
+    def probability(self, qubit):
+        """Probability of measuring 1 on ``qubit``."""
+        self._check(qubit)
+        self.flush((qubit,))
+        _, a1 = self._halves(qubit)
+        return float(np.vdot(a1, a1).real)
+
+    def measure(self, qubit):
+        """Measure ``qubit``, collapse the state and return 0 or 1."""
+        p1 = self.probability(qubit)
+        outcome = int(self.rng.random() < p1)
+        a0, a1 = self._halves(qubit)
+        keep, drop = (a1, a0) if outcome else (a0, a1)
+        drop[...] = 0
+        keep *= 1 / math.sqrt(p1 if outcome else 1 - p1)
+        return outcome
+
+    def sample(self, shots):
+        """Sample ``shots`` measurements of all qubits without collapsing; returns {bitstring: count}."""
+        probabilities = self.probabilities()
+        block = min(SAMPLE_BLOCK, len(probabilities))
+        blocks = probabilities.reshape(-1, block)
+        weights = blocks.sum(axis=1, dtype=np.float64)
+        weights /= weights.sum()
+        per_block = self.rng.multinomial(shots, weights)
+        outcomes = []
+        for index in np.flatnonzero(per_block):
+            cdf = np.cumsum(blocks[index], dtype=np.float64)
+            cdf /= cdf[-1]
+            draws = np.searchsorted(cdf, self.rng.random(per_block[index]), side="right")
+            outcomes.append(np.minimum(draws, block - 1) + index * block)
+        values, counts = np.unique(np.concatenate(outcomes), return_counts=True)
+        width = self.num_qubits
+        return {format(int(value), f"0{width}b"): int(count) for value, count in zip(values, counts)}
+
+
+class QuantumSimulator:
+    """Named-qubit front end used by the compilers' ``quantum`` statements.
+
+    Qubits are allocated on first use.  ``operation`` is a gate name from
+    ``GATES``, ``measure`` or ``reset``.
+    """
+
+    def __init__(self, dtype=np.complex64, seed=None):
+        self.register = Statevector(dtype=dtype, seed=seed)
+        self.qubits = {}
+
+    def qubit(self, name):
+        index = self.qubits.get(name)
+        if index is None:
+            index = self.qubits[name] = self.register.add_qubit()
+        return index
+
+    def execute(self, qubit, operation):
+        """Run ``operation`` on the named ``qubit``; returns the outcome of a measurement, else None."""
+        index = self.qubit(qubit)
+        name = operation.lower()
+        if name == "measure":
+            return self.register.measure(index)
+        if name == "reset":
+            if self.register.measure(index):
+                self.register.apply("x", index)
+            return None
+        if name not in GATES:
+            raise ValueError(f"unknown quantum operation {operation!r}; expected one of "
+                             f"{', '.join(sorted(GATES))}, measure, reset")
+        self.register.apply(GATES[name], index)
+        return None
@@ -0,0 +1,171 @@
+"""Bounded task scheduler for ``sync`` and ``async`` statements.
+
+``TaskScheduler`` runs blocking callables on a fixed-size thread pool and
+coroutines on a single event loop thread, so the number of OS threads does
+not grow with the number of scheduled tasks.  At most ``max_pending`` tasks
+may be in flight; ``submit`` blocks (or raises ``queue.Full`` when
+``block=False``) until a slot frees up.  Every task records how long it
+waited for a worker and how long it ran.
+"""
+import asyncio
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait
+
+DEFAULT_MAX_PENDING = 1024
+
+# Latency samples kept for percentiles
+WINDOW = 10000
+
+
+class TaskStats:
+    __slots__ = ("submitted", "completed", "failed", "in_flight", "max_in_flight",
+                 "blocked", "waits", "runs", "_lock")
+
+    def __init__(self):
+        self.submitted = self.completed = self.failed = 0
+        self.in_flight = self.max_in_flight = self.blocked = 0
+        self.waits = deque(maxlen=WINDOW)
+        self.runs = deque(maxlen=WINDOW)
+        self._lock = threading.Lock()
+
+    def _started(self):
+        with self._lock:
+            self.submitted += 1
+            self.in_flight += 1
+            if self.in_flight > self.max_in_flight:
+                self.max_in_flight = self.in_flight
+
+    def _finished(self, waited, ran, failed):
+        with self._lock:
+            self.in_flight -= 1
+            self.completed += 1
+            self.failed += failed
+            self.waits.append(waited)
+            self.runs.append(ran)
+
+    @staticmethod
+    def _percentiles(samples):
+        if not samples:
+            return {"mean": 0.0, "p50": 0.0, "p95": 0.0, "max": 0.0}
+        ordered = sorted(samples)
+        last = len(ordered) - 1
+        return {
+            "mean": sum(ordered) / len(ordered),
+            "p50": ordered[last // 2],
+            "p95": ordered[last * 95 // 100],
+            "max": ordered[last],
+        }
+
+    def as_dict(self):
+        with self._lock:
+            waits, runs = list(self.waits), list(self.runs)
+            counts = {
+                "submitted": self.submitted, "completed": self.completed,
+                "failed": self.failed, "in_flight": self.in_flight,
+                "max_in_flight": self.max_in_flight, "blocked": self.blocked,
+            }
+        counts["wait"] = self._percentiles(waits)
+        counts["run"] = self._percentiles(runs)
+        return counts
+
+    def __repr__(self):
+        return f"TaskStats({self.as_dict()})"
+
+
+class TaskScheduler:
+    def __init__(self, max_workers=None, max_pending=DEFAULT_MAX_PENDING):
+        self.max_pending = max_pending
+        self.stats = TaskStats()
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix="hts-task")
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._futures = set()
+        self._lock = threading.Lock()
+        self._loop = None
+        self._loop_thread = None
+
+    def _acquire(self, block, timeout):
+        if self._slots.acquire(blocking=False):
+            return
+        # Backpressure: the caller waits for a running task to finish
+        self.stats.blocked += 1
+        if not block or not self._slots.acquire(timeout=timeout):
+            raise queue.Full(f"{self.max_pending} tasks already in flight")
+
+    def _track(self, future):
+        with self._lock:
+            self._futures.add(future)
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, future):
+        with self._lock:
+            self._futures.discard(future)
+        self._slots.release()
+
+    def _run(self, func, args, queued):
+        started = time.perf_counter()
+        failed = True
+        try:
+            result = func(*args)
+            failed = False
+            return result
+        finally:
+            self.stats._finished(started - queued, time.perf_counter() - started, failed)
+
+    async def _run_async(self, func, args, queued):
+        started = time.perf_counter()
+        failed = True
+        try:
+            result = await func(*args)
+            failed = False
+            return result
+        finally:
+            self.stats._finished(started - queued, time.perf_counter() - started, failed)
+
+    def _event_loop(self):
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._loop_thread = threading.Thread(
+                    target=self._loop.run_forever, name="hts-async", daemon=True
+                )
+                self._loop_thread.start()
+            return self._loop
+
+    def submit(self, func, *args, block=True, timeout=None):
+        """Run ``func(*args)`` on the worker pool; returns a Future."""
+        self._acquire(block, timeout)
+        self.stats._started()
+        return self._track(self._executor.submit(self._run, func, args, time.perf_counter()))
+
+    def submit_async(self, func, *args, block=True, timeout=None):
+        """Run coroutine function ``func(*args)`` on the event loop; returns a Future."""
+        self._acquire(block, timeout)
+        self.stats._started()
+        coroutine = self._run_async(func, args, time.perf_counter())
+        return self._track(asyncio.run_coroutine_threadsafe(coroutine, self._event_loop()))
+
+    def drain(self, timeout=None):
+        """Wait for every submitted task; returns the finished futures."""
+        with self._lock:
+            futures = list(self._futures)
+        done, _ = wait(futures, timeout)
+        return done
+
+    def shutdown(self):
+        self.drain()
+        self._executor.shutdown()
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop_thread.join()
+            self._loop.close()
+            self._loop = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
@@ -0,0 +1,218 @@
+"""Register-based HTS virtual machine.
+
+``VM.run`` executes a ``hts.bytecode.Program`` in a single dispatch loop.
+Calls push an explicit frame instead of recursing in Python, so deep HTS
+recursion is bounded by memory rather than the interpreter's stack.
+Arrays are NumPy arrays (``hts.array``), whose operators are vectorized.
+``parallel_exec`` runs its calls in worker processes (``hts.parallel``).
+Statements with side effects outside the VM (quantum, blockchain, memory,
+sync/async) are handed to the handler registered for their node type in
+``effects``; unhandled ones are recorded in ``VM.events``.
+
+With a ``hts.jit.JIT``, calls are counted and hot functions run as
+compiled Python code instead of in the dispatch loop (tiered execution).
+"""
+from hts.bytecode import (
+    ADD, CALL, DIV, EFFECT, EQ, GE, GT, INDEX, JUMP, JUMP_IF_FALSE, JUMP_IF_NOT_EQ, JUMP_IF_NOT_GE,
+    JUMP_IF_NOT_GT, JUMP_IF_NOT_LE, JUMP_IF_NOT_LT, JUMP_IF_NOT_NE, LE, LOAD_CONST,
+    LOAD_GLOBAL, LT, MAKE_ARRAY, MOD, MOVE, MUL, NE, NEG, NOT, PARALLEL, RETURN, SETITEM, SLICE,
+    STORE_GLOBAL, SUB, CodeObject, compile_program,
+)
+from hts.lexer import tokenize
+from hts.parser import parse
+
+
+class VMError(RuntimeError):
+    pass
+
+
+# Returned by a compiled function whose type guards failed: the call is interpreted instead
+DEOPT = object()
+
+
+def _divide(left, right):
+    # Integer operands divide like C (truncating); anything else is true division
+    if type(left) is int and type(right) is int:
+        quotient = abs(left) // abs(right)
+        return quotient if (left < 0) == (right < 0) else -quotient
+    if getattr(left, "ndim", 0) or getattr(right, "ndim", 0):
+        from hts.array import divide
+        return divide(left, right)
+    return left / right
+
+
+def _remainder(left, right):
+    # Integer operands take the sign of the dividend like C, so that
+    # (a / b) * b + a % b == a; anything else is Python's modulo
+    if type(left) is int and type(right) is int:
+        remainder = abs(left) % abs(right)
+        return remainder if left >= 0 else -remainder
+    if getattr(left, "ndim", 0) or getattr(right, "ndim", 0):
+        from hts.array import remainder
+        return remainder(left, right)
+    return left % right
+
+
+def _index(container, key):
+    # An array element as a Python number; rows and other values unchanged
+    value = container[key]
+    return value.item() if getattr(value, "ndim", None) == 0 else value
+
+
+class VM:
+    def __init__(self, effects=None, jit=None):
+        self.effects = dict(effects or {})
+        # hts.jit.JIT compiling hot functions; None interprets every call
+        self.jit = jit
+        self.events = []
+        self.variables = {}
+        self.globals = []
+        # Instructions interpreted by the last run (compiled functions are not counted)
+        self.instructions = 0
+
+    def run(self, program):
+        """Execute ``program``; returns the value of a top-level ``return``."""
+        self.globals = [None] * len(program.global_names)
+        self.instructions = 0
+        main = program.main
+        registers = [None] * main.nregs
+        try:
+            result = self._execute(program, main, registers)
+        except ZeroDivisionError:
+            raise VMError("division by zero") from None
+        self.variables = {name: registers[register] for name, register in main.varnames.items()}
+        for name, value in zip(program.global_names, self.globals):
+            self.variables[name] = value
+        return result
+
+    def _effect(self, node):
+        handler = self.effects.get(type(node))
+        if handler is None:
+            self.events.append(node)
+        else:
+            handler(node)
+
+    def _execute(self, program, unit, registers):
+        functions = program.functions
+        global_values = self.globals
+        jit = self.jit
+        frames = []
+        code = unit.quads()
+        consts = unit.consts
+        pc = 0
+        executed = 0
+        while True:
+            op, a, b, c = code[pc]
+            pc += 1
+            executed += 1
+            if op == MOVE:
+                registers[a] = registers[b]
+            elif op == ADD:
+                registers[a] = registers[b] + registers[c]
+            elif op == JUMP_IF_NOT_LT:
+                if not registers[a] < registers[b]:
+                    pc = c
+            elif op == LOAD_CONST:
+                registers[a] = consts[b]
+            elif op == SUB:
+                registers[a] = registers[b] - registers[c]
+            elif op == MUL:
+                registers[a] = registers[b] * registers[c]
+            elif op == JUMP:
+                pc = a
+            elif op == JUMP_IF_NOT_EQ:
+                if not registers[a] == registers[b]:
+                    pc = c
+            elif op == JUMP_IF_NOT_NE:
+                if not registers[a] != registers[b]:
+                    pc = c
+            elif op == JUMP_IF_NOT_LE:
+                if not registers[a] <= registers[b]:
+                    pc = c
+            elif op == JUMP_IF_NOT_GT:
+                if not registers[a] > registers[b]:
+                    pc = c
+            elif op == JUMP_IF_NOT_GE:
+                if not registers[a] >= registers[b]:
+                    pc = c
+            elif op == JUMP_IF_FALSE:
+                if not registers[a]:
+                    pc = b
+            elif op == MOD:
+                registers[a] = _remainder(registers[b], registers[c])
+            elif op == DIV:
+                registers[a] = _divide(registers[b], registers[c])
+            elif op == CALL:
+                callee = functions[b]
+                if type(callee) is CodeObject:
+                    arity = callee.arity
+                    if jit is not None:
+                        args = registers[c:c + arity]
+                        native = jit.lookup(self, program, callee, args)
+                        if native is not None:
+                            value = native(*args)
+                            if value is not DEOPT:
+                                registers[a] = value
+                                continue
+                            jit.deoptimize(callee)
+                    frames.append((code, consts, registers, pc, a))
+                    args = registers[c:c + arity]
+                    registers = args + [None] * (callee.nregs - arity)
+                    code = callee.quads()
+                    consts = callee.consts
+                    pc = 0
+                else:
+                    registers[a] = callee.func(*registers[c:c + callee.arity])
+            elif op == RETURN:
+                value = None if a < 0 else registers[a]
+                if not frames:
+                    # += : compiled functions re-enter the interpreter for cold callees
+                    self.instructions += executed
+                    return value
+                code, consts, registers, pc, target = frames.pop()
+                registers[target] = value
+            elif op == LOAD_GLOBAL:
+                registers[a] = global_values[b]
+            elif op == STORE_GLOBAL:
+                global_values[a] = registers[b]
+            elif op == LT:
+                registers[a] = registers[b] < registers[c]
+            elif op == LE:
+                registers[a] = registers[b] <= registers[c]
+            elif op == GT:
+                registers[a] = registers[b] > registers[c]
+            elif op == GE:
+                registers[a] = registers[b] >= registers[c]
+            elif op == EQ:
+                registers[a] = registers[b] == registers[c]
+            elif op == NE:
+                registers[a] = registers[b] != registers[c]
+            elif op == NEG:
+                registers[a] = -registers[b]
+            elif op == NOT:
+                registers[a] = not registers[b]
+            elif op == EFFECT:
+                self._effect(consts[a])
+            elif op == INDEX:
+                registers[a] = _index(registers[b], registers[c])
+            elif op == SLICE:
+                registers[a] = registers[b][registers[c]:registers[c + 1]]
+            elif op == SETITEM:
+                registers[a][registers[b]] = registers[c]
+            elif op == MAKE_ARRAY:
+                from hts.array import make_array
+                spec = consts[b]
+                registers[a] = make_array(registers[c:c + spec[0]], spec)
+            elif op == PARALLEL:
+                from hts.parallel import parallel_exec
+                spec = consts[b]
+                registers[a] = parallel_exec(self, program, spec, registers[c:c + spec[0]])
+            else:
+                raise VMError(f"unknown opcode {op} at {pc - 1}")
+
+
+def run_source(source, effects=None, jit=None):
+    """Compile and run HTS source text; returns the ``VM`` after execution."""
+    vm = VM(effects, jit)
+    vm.run(compile_program(parse(tokenize(source))))
+    return vm
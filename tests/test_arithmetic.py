@@ -0,0 +1,52 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from hts.evaluate import evaluate
+from hts.jit import JIT
+from hts.lexer import tokenize
+from hts.optimizer import fold
+from hts.parser import parse
+from hts.vm import run_source
+
+PAIRS = [(a, b) for a, b in itertools.product((-7, -6, -1, 0, 1, 6, 7), (-3, -2, 2, 3))]
+
+KERNEL = """
+fn check(a, b) {
+    return (a / b) * b + a % b;
+}
+fn rem(a, b) {
+    return a % b;
+}
+"""
+
+
+def expression(source):
+    return next(parse(tokenize(f"let x = {source};"))).value
+
+
+@pytest.mark.parametrize("a, b", PAIRS)
+def test_division_and_remainder_agree(a, b):
+    vm = run_source(f"let q = {a} / {b}; let r = {a} % {b}; let a = {a}; let b = {b}; let s = a / b * b + a % b;")
+    assert vm.variables["s"] == a
+    assert vm.variables["r"] == int(np.fmod(a, b))
+    assert fold(expression(f"{a} % {b}")).value == vm.variables["r"]
+    assert evaluate(expression("a % b"), {"a": a, "b": b}) == vm.variables["r"]
+
+
+def test_compiled_remainder_matches_interpreter():
+    calls = "".join(f"let c{i} = check({a}, {b}); let r{i} = rem({a}, {b});" for i, (a, b) in enumerate(PAIRS * 3))
+    source = KERNEL + calls
+    interpreted = run_source(source).variables
+    jit = JIT(threshold=2)
+    compiled = run_source(source, jit=jit).variables
+    assert jit.stats.compiled
+    assert compiled == interpreted
+    assert all(interpreted[f"c{i}"] == a for i, (a, _) in enumerate(PAIRS))
+
+
+def test_integer_array_remainder():
+    vm = run_source("let v = [-7, 7, -6]; let r = v % 2; let s = v / 2 * 2 + v % 2;")
+    assert list(vm.variables["r"]) == [-1, 1, 0]
+    assert list(vm.variables["s"]) == [-7, 7, -6]
@@ -0,0 +1,67 @@
+import pytest
+
+from hts.build import BuildError, build, scan_imports
+from hts.bytecode import CodeObject, compile_program
+from hts.lexer import tokenize
+from hts.nodes import Import
+from hts.parser import parse
+from hts.vm import VM
+
+MODULES = {
+    "base": """let scale = 3;
+fn twice(x) { return x * 2; }
+fn scaled(x) { return x * scale; }
+""",
+    "mid": """import base;
+let offset = twice(scale) + 1;
+fn shift(x) { if (x > offset) { return x - offset; } return scaled(x) + offset; }
+""",
+    "main": """import base;
+import mid;
+let total = 0;
+let i = 0;
+while (i < 10) { total = total + shift(i); i = i + 1; }
+let pair = parallel_exec(twice(4), shift(20));
+let again = parallel_exec(twice(4), shift(20));
+sync flush;
+""",
+}
+
+
+def test_linked_build_runs_like_one_program(tmp_path):
+    for name, source in MODULES.items():
+        (tmp_path / f"{name}.hts").write_text(source)
+    result = build([str(tmp_path / "main.hts")], jobs=1)
+    # Lowered in the workers
+    assert all(type(module.program.main) is CodeObject for module in result.modules.values())
+
+    statements = [
+        node for name in result.order for node in parse(tokenize(MODULES[name])) if type(node) is not Import
+    ]
+    expected = VM()
+    expected.run(compile_program(statements))
+    linked = VM()
+    linked.run(result.program)
+    assert linked.variables == expected.variables
+    assert linked.variables["total"] == expected.variables["total"] != 0
+    assert list(linked.variables["pair"]) == list(linked.variables["again"]) == [8, 13]
+    assert [type(event).__name__ for event in linked.events] == [type(event).__name__ for event in expected.events]
+
+
+def test_module_errors_are_reported_by_module(tmp_path):
+    (tmp_path / "lib.hts").write_text("fn f(x) { return x; }\n")
+    (tmp_path / "main.hts").write_text("import lib;\nlet y = f(1, 2);\n")
+    with pytest.raises(BuildError, match="main: line 2: f\\(\\) takes 1 arguments"):
+        build([str(tmp_path / "main.hts")], jobs=1)
+
+
+def test_scan_imports_after_other_statements():
+    source = "let x = 1; import util;\n// import commented;\nimport base; import util;\n"
+    assert scan_imports(source) == ["util", "base"]
+
+
+def test_parse_errors_name_the_module(tmp_path):
+    (tmp_path / "lib.hts").write_text("let x = ;\n")
+    (tmp_path / "main.hts").write_text("let y = 1; import lib;\n")
+    with pytest.raises(BuildError, match="lib: line 1: unexpected ';'"):
+        build([str(tmp_path / "main.hts")], jobs=1)
@@ -0,0 +1,70 @@
+from hts.cache import CompileCache, split_units
+from hts.compiler import HTSCompiler
+from hts.lexer import tokenize
+from hts.parser import parse
+from hts.vm import VM
+
+ARRAYS = """let a: [int; 3] = [1, 2, 3];
+let m: [[float; 2]; 2] = [[1.0, 2.0], [3.0, 4.0]];
+let z = [0; 4];
+fn total(v: [int; 3]) -> int {
+    return v[0] + v[1] + v[2];
+}
+z[1] = total(a);
+"""
+
+
+def test_split_units_keeps_array_semicolons():
+    units = [text.strip() for text, _ in split_units(ARRAYS)]
+    assert units[0] == "let a: [int; 3] = [1, 2, 3];"
+    assert units[2] == "let z = [0; 4];"
+    assert len(units) == 5
+
+
+def test_array_program_round_trip(tmp_path):
+    expected = list(parse(tokenize(ARRAYS)))
+    cache = CompileCache(str(tmp_path))
+    assert cache.parse(ARRAYS) == expected
+    # A fresh cache reads the stored entries back
+    cache = CompileCache(str(tmp_path))
+    assert cache.parse(ARRAYS) == expected
+    assert cache.stats.hits == 1
+    vm = VM()
+    vm.run(cache.program(ARRAYS))
+    assert list(vm.variables["z"]) == [0, 6, 0, 0]
+
+
+def test_else_after_a_comment_stays_in_its_unit():
+    source = "if (a > 1) { b = 1; } // why\n// and why not\nelse { b = 2; }\nlet c = 3;\n"
+    units = [text.strip() for text, _ in split_units(source)]
+    assert len(units) == 2
+    assert units[0].endswith("else { b = 2; }")
+
+
+PROGRAM = """let a = 2;
+let b = a * 3;
+fn f(x) { let y = x + 1; return y * b; }
+if (b > 5) { quantum q1 h; } else { let c = 1; }
+let d = f(b) + a;
+"""
+
+
+def test_generated_code_is_reused_per_file_and_unit(tmp_path):
+    expected = HTSCompiler(quiet=True).compile(PROGRAM)
+
+    compiler = HTSCompiler(quiet=True, cache=CompileCache(str(tmp_path)))
+    assert compiler.compile(PROGRAM) == expected
+    assert compiler.optimizations
+
+    # Unchanged file: nothing is optimized again
+    compiler = HTSCompiler(quiet=True, cache=CompileCache(str(tmp_path)))
+    assert compiler.compile(PROGRAM) == expected
+    assert not compiler.optimizations
+
+    # One changed unit: only it is optimized again, and it still sees b's value
+    edited = PROGRAM.replace("let d = f(b) + a;", "let d = b + 1;")
+    compiler = HTSCompiler(quiet=True, cache=CompileCache(str(tmp_path)))
+    code = compiler.compile(edited)
+    assert code == HTSCompiler(quiet=True).compile(edited)
+    assert code[-1] == "Declare Variable: Declared d of type None with value 7"
+    assert len(compiler.optimizations) == len(compiler.ai_optimizer.pass_manager.passes)
@@ -0,0 +1,71 @@
+from hts import pipeline
+from hts.compiler import HTSCompiler
+
+
+class RecordingCompiler(HTSCompiler):
+    def __init__(self):
+        super().__init__(quiet=True)
+        self.ran = []
+
+    def run_task(self, task):
+        self.ran.append(task)
+
+
+class Lines:
+    def __init__(self):
+        self.lines = []
+
+    def write(self, text):
+        if text != "\n":
+            self.lines.append(text)
+
+
+def test_compile_file_runs_tasks_batch_by_batch(tmp_path, monkeypatch):
+    compile_file = pipeline.compile_file
+    monkeypatch.setattr(pipeline, "compile_file", lambda *args, **kwargs: compile_file(*args, batch_size=4, **kwargs))
+    path = tmp_path / "tasks.hts"
+    path.write_text("".join(f"let v{i} = {i};\nsync task{i};\nasync job{i};\n" for i in range(10)))
+    backlog = []
+    with RecordingCompiler() as compiler:
+        original = compiler.run_pending_tasks
+
+        def run_pending_tasks():
+            backlog.append(len(compiler.pending_tasks))
+            original()
+
+        compiler.run_pending_tasks = run_pending_tasks
+        sink = Lines()
+        compiler.compile_file(str(path), sink)
+    assert compiler.pending_tasks == []
+    assert sorted(compiler.ran) == sorted([f"task{i}" for i in range(10)] + [f"job{i}" for i in range(10)])
+    # Never more than one batch of tasks waits
+    assert max(backlog) <= 4
+    assert len(compiler.optimizations) == len(compiler.ai_optimizer.pass_manager.passes)
+
+
+def test_compile_file_rejects_what_compile_rejects(tmp_path, monkeypatch):
+    compile_file = pipeline.compile_file
+    monkeypatch.setattr(pipeline, "compile_file", lambda *args, **kwargs: compile_file(*args, batch_size=2, **kwargs))
+    # ``late`` is declared two batches after it is read
+    path = tmp_path / "forward.hts"
+    path.write_text("let a = late;\nlet b = 1;\nlet c = 2;\nlet late = 3;\nlet d = undefined_var;\n")
+    with HTSCompiler(quiet=True) as compiler:
+        expected = compiler.compile(path.read_text())
+        errors = compiler.semantic_errors
+    with HTSCompiler(quiet=True) as compiler:
+        assert compiler.compile_file(str(path), Lines()) is expected is None
+        assert compiler.semantic_errors == errors == ["Semantic Error: line 5: undefined variable undefined_var"]
+        assert compiler.compile_stats["semantic_analysis"].items == 1
+
+
+def test_compile_file_measures_phases_over_batches(tmp_path, monkeypatch):
+    compile_file = pipeline.compile_file
+    monkeypatch.setattr(pipeline, "compile_file", lambda *args, **kwargs: compile_file(*args, batch_size=4, **kwargs))
+    path = tmp_path / "lets.hts"
+    path.write_text("".join(f"let v{i} = {i};\n" for i in range(10)))
+    with HTSCompiler(quiet=True) as compiler:
+        lines = compiler.compile_file(str(path), Lines())
+    stats = compiler.compile_stats
+    assert lines == stats.lines == stats["generate_code"].items == 10
+    assert stats["parse"].items == 10
+    assert list(stats.phases) == ["parse", "semantic_analysis", "optimize", "generate_code"]
@@ -0,0 +1,17 @@
+import os
+
+from hts.diba import HTSCompiler
+
+SCRIPT = os.path.join(os.path.dirname(__file__), os.pardir, "Syntax.hts")
+
+
+def trace(seed):
+    compiler = HTSCompiler(echo=False, seed=seed)
+    compiler.run_file(SCRIPT, simulate=True)
+    return list(compiler.trace)
+
+
+def test_seeded_simulated_runs_trace_alike():
+    first = trace(3)
+    assert any("Evolved" in message for _, message in first)
+    assert trace(3) == first
@@ -0,0 +1,89 @@
+import os
+import time
+
+import pytest
+
+from hts.distributed import Cluster, NodeLost, RemoteError
+
+
+def fail_once(marker, value):
+    # Fails on the first attempt only; the marker file records that it ran
+    if not os.path.exists(marker):
+        open(marker, "w").close()
+        raise ValueError("first attempt")
+    return value
+
+
+def die_once(marker, value):
+    if not os.path.exists(marker):
+        open(marker, "w").close()
+        os._exit(1)
+    return value
+
+
+def always_fail():
+    raise ValueError("always")
+
+
+def pause(seconds, value):
+    time.sleep(seconds)
+    return value, os.getpid()
+
+
+def test_failed_task_is_retried_on_another_node(tmp_path):
+    with Cluster(2, retries=1) as cluster:
+        assert cluster.submit(fail_once, str(tmp_path / "marker"), 42).result(30) == 42
+        stats = cluster.stats()
+    assert stats["retried"] == 1
+    assert sorted(node["failed"] for node in stats["nodes"]) == [0, 1]
+    assert sorted(node["completed"] for node in stats["nodes"]) == [0, 1]
+
+
+def test_retries_run_out():
+    with Cluster(2, retries=1) as cluster:
+        future = cluster.submit(always_fail)
+        with pytest.raises(ValueError, match="always") as info:
+            future.result(30)
+        assert cluster.stats()["retried"] == 1
+    assert type(info.value.__cause__) is RemoteError
+
+
+def test_lost_node_is_replaced_and_its_task_retried(tmp_path):
+    with Cluster(2, retries=1) as cluster:
+        pids = {node.process.pid for node in cluster.nodes}
+        assert cluster.submit(die_once, str(tmp_path / "marker"), 7).result(30) == 7
+        assert cluster.lost == 1
+        assert {node.process.pid for node in cluster.nodes} != pids
+        assert all(node.alive for node in cluster.nodes)
+    with Cluster(1, retries=0) as cluster:
+        with pytest.raises(NodeLost):
+            cluster.submit(die_once, str(tmp_path / "other"), 7).result(30)
+
+
+def test_idle_node_steals_queued_tasks():
+    with Cluster(2, prefetch=1) as cluster:
+        slow = cluster.submit(pause, 1.5, "slow")
+        fast = [cluster.submit(pause, 0, index) for index in range(10)]
+        assert [future.result(30)[0] for future in fast] == list(range(10))
+        assert slow.result(30)[0] == "slow"
+        slow_pid = slow.result()[1]
+        stats = cluster.stats()
+    # The node running the slow task ran none of the fast ones queued behind it
+    assert all(future.result()[1] != slow_pid for future in fast)
+    assert sum(node["stolen"] for node in stats["nodes"]) > 0
+
+
+def test_pinned_and_unstealable_tasks_stay_on_their_node():
+    with Cluster(2, prefetch=1, steal=False) as cluster:
+        slow = cluster.submit(pause, 1.0, "slow")
+        # Long enough that no task finishes while the others are placed
+        fast = [cluster.submit(pause, 0.2, index) for index in range(10)]
+        cluster.wait()
+        assert sum(node["stolen"] for node in cluster.stats()["nodes"]) == 0
+        # Half of the fast tasks waited behind the slow one
+        assert sum(future.result()[1] == slow.result()[1] for future in fast) == 5
+    with Cluster(2, prefetch=1) as cluster:
+        pinned = [cluster.submit(pause, 0.05, index, node=0) for index in range(6)]
+        cluster.wait()
+        assert len({future.result()[1] for future in pinned}) == 1
+        assert sum(node["stolen"] for node in cluster.stats()["nodes"]) == 0
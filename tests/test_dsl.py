@@ -0,0 +1,33 @@
+import asyncio
+
+import pytest
+
+from hts.dsl import DSLError, compile_plan, parse, run_steps
+
+SCRIPT = """EXECUTE "Start"
+IF SystemLoad > 80% THEN
+    EXECUTE "ScaleUp"
+ELSE
+    EXECUTE "Idle"
+"""
+
+
+def run(source, env):
+    ran = []
+
+    async def execute(runtime, env, operand, clauses):
+        ran.append(operand)
+
+    plan = compile_plan(parse(source), {"EXECUTE": execute})
+    asyncio.run(run_steps([(handler, args) for handler, args, _ in plan.steps], None, env))
+    return ran
+
+
+def test_condition_reads_bound_names():
+    assert run(SCRIPT, {"SystemLoad": 95}) == ["Start", "ScaleUp"]
+    assert run(SCRIPT, {"SystemLoad": 10}) == ["Start", "Idle"]
+
+
+def test_unbound_name_in_condition_is_a_dsl_error():
+    with pytest.raises(DSLError, match="line 2: SystemLoad is not bound"):
+        run(SCRIPT, {})
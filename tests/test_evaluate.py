@@ -0,0 +1,44 @@
+import pytest
+
+from hts import evaluate as evaluation
+from hts.compiler import HTSCompiler
+from hts.lexer import tokenize
+from hts.parser import parse
+from hts.vm import run_source
+
+
+def expression(source):
+    return next(parse(tokenize(f"let x = {source};"))).value
+
+
+def test_expression_is_compiled_once(monkeypatch):
+    expr = expression("a * 2 + max(a, 3)")
+    compiled = []
+    compile_expression = evaluation.compile_expression
+
+    def counting(*args):
+        compiled.append(args)
+        return compile_expression(*args)
+
+    monkeypatch.setattr(evaluation, "compile_expression", counting)
+    assert [evaluation.evaluate(expr, {"a": a}) for a in range(5)] == [3, 5, 7, 9, 12]
+    assert len(compiled) == 1
+
+
+@pytest.mark.parametrize("source", [
+    "fn f() { x = 2; } let x = 1; f(); let y = x;",
+    "let x = 1; g(); let y = x; fn g() { x = 2; }",
+    "fn f() { x = 2; } let x = 1; if x > 0 { f(); } let y = x;",
+])
+def test_calls_forget_the_globals_they_assign(source):
+    compiler = HTSCompiler(quiet=True)
+    compiler.compile(source)
+    expected = run_source(source).variables["y"]
+    assert compiler.symbol_table["y"]["result"] in (None, expected)
+    assert "y" not in compiler.values or compiler.values["y"] == expected
+
+
+def test_calls_keep_unrelated_values():
+    compiler = HTSCompiler(quiet=True)
+    compiler.compile("fn f() { let x = 2; return x; } let x = 1; f(); let y = x + 1;")
+    assert compiler.symbol_table["y"]["result"] == 2
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from hts.genetic import GeneticAlgorithm
+
+
+def closeness(population):
+    return -((population - 0.5) ** 2).sum(axis=1)
+
+
+def test_seeded_runs_are_reproducible():
+    runs = [GeneticAlgorithm(closeness, genes=4, size=20, seed=7) for _ in range(2)]
+    (first, first_score), (second, second_score) = (ga.run(generations=15) for ga in runs)
+    assert np.array_equal(first, second)
+    assert first_score == second_score
+    assert runs[0].stats.evaluations == runs[1].stats.evaluations
+
+
+def test_elites_keep_their_scores():
+    evaluated = []
+
+    def fitness(population):
+        evaluated.append(len(population))
+        return closeness(population)
+
+    ga = GeneticAlgorithm(fitness, genes=3, size=10, elite=2, seed=1)
+    ga.run(generations=5)
+    # Only offspring are evaluated after the first generation
+    assert evaluated == [10] + [8] * 5
+    assert ga.stats.evaluations == 50
+    # The best score never gets worse as the same seeded run goes on
+    bests = [GeneticAlgorithm(closeness, genes=3, size=10, elite=2, seed=1).run(generations=n)[1] for n in range(6)]
+    assert bests == sorted(bests)
+
+
+def test_stops_at_target():
+    ga = GeneticAlgorithm(closeness, genes=2, size=30, target=-0.01, seed=3)
+    _, score = ga.run(generations=500)
+    assert ga.stats.stopped == "target"
+    assert score >= -0.01
+    assert ga.stats.generations < 500
+
+
+def test_stops_without_improvement():
+    ga = GeneticAlgorithm(lambda population: np.zeros(len(population)), genes=2, size=10, patience=4, seed=0)
+    ga.run(generations=100)
+    assert ga.stats.stopped == "patience"
+    assert ga.stats.generations == 4
+
+
+def test_stops_after_generations():
+    ga = GeneticAlgorithm(closeness, genes=2, size=10, seed=0)
+    ga.run(generations=3)
+    assert (ga.stats.stopped, ga.stats.generations) == ("generations", 3)
+
+
+def test_evaluate_rejects_scores_of_the_wrong_shape():
+    ga = GeneticAlgorithm(lambda population: population, genes=2, size=10, seed=0)
+    with pytest.raises(ValueError, match=r"fitness returned shape \(10, 2\) for 10 individuals"):
+        ga.evaluate(ga.initialize())
@@ -0,0 +1,78 @@
+from hts.inference import RuleEngine
+
+
+def counting_engine(reads=("system_state.load",), cache_size=16):
+    engine = RuleEngine(cache_size=cache_size)
+    calls = []
+
+    def balance(task, context):
+        calls.append(task)
+        return "scale" if context["system_state"]["load"] > 80 else "idle"
+
+    engine.add("Balance", balance, reads)
+    return engine, calls
+
+
+def test_result_is_reused_until_a_read_field_changes():
+    engine, calls = counting_engine()
+    context = {"system_state": {"load": 90, "temperature": 40}, "tick": 1}
+    assert engine.infer("Balance", context) == "scale"
+    # Fields the rule does not read do not invalidate it
+    context["tick"] = 2
+    context["system_state"]["temperature"] = 99
+    assert engine.infer("Balance", context) == "scale"
+    assert calls == ["Balance"]
+    context["system_state"]["load"] = 10
+    assert engine.infer("Balance", context) == "idle"
+    assert len(calls) == 2
+    stats = engine.stats()["rules"]["Balance"]
+    assert (stats.calls, stats.hits, stats.evaluations) == (3, 1, 2)
+
+
+def test_mutable_values_are_fingerprinted_by_content():
+    engine = RuleEngine()
+    calls = []
+    engine.add("Count", lambda task, context: calls.append(task) or len(context["queue"]), ["queue"])
+    context = {"queue": [1, 2]}
+    assert engine.infer("Count", context) == 2
+    context["queue"].append(3)
+    assert engine.infer("Count", context) == 3
+    assert len(calls) == 2
+
+
+def test_replacing_or_invalidating_a_rule_drops_its_results():
+    engine, calls = counting_engine()
+    context = {"system_state": {"load": 90}}
+    engine.infer("Balance", context)
+    engine.invalidate("Balance")
+    engine.infer("Balance", context)
+    assert len(calls) == 2
+    engine.add("Balance", lambda task, context: "replaced", ["system_state.load"])
+    assert engine.infer("Balance", context) == "replaced"
+    engine.remove("Balance")
+    assert engine.infer("Balance", context) == "Unknown task: Balance"
+    assert engine.stats()["memoized"] == 1
+
+
+def test_rules_without_reads_always_run():
+    engine, calls = counting_engine(reads=None)
+    context = {"system_state": {"load": 90}}
+    for _ in range(3):
+        engine.infer("Balance", context)
+    assert len(calls) == 3
+    assert engine.stats()["memoized"] == 0
+
+
+def test_least_recently_used_results_are_evicted():
+    engine, calls = counting_engine(cache_size=2)
+    contexts = [{"system_state": {"load": load}} for load in (10, 50, 90)]
+    for context in contexts[:2]:
+        engine.infer("Balance", context)
+    engine.infer("Balance", contexts[0])
+    engine.infer("Balance", contexts[2])
+    assert len(calls) == 3
+    # 50 was least recently used; 10 is still memoized
+    engine.infer("Balance", contexts[0])
+    assert len(calls) == 3
+    engine.infer("Balance", contexts[1])
+    assert len(calls) == 4
@@ -0,0 +1,50 @@
+from hts.jit import JIT
+from hts.vm import run_source
+
+HALF = """
+fn half(x) { return x / 2; }
+let total = 0;
+let round = 0;
+while (round < {rounds}) {
+    let i = 0;
+    while (i < 10) { total = total + half(i); i = i + 1; }
+    total = total + half(5.0);
+    round = round + 1;
+}
+let last = half(7.0);
+"""
+
+
+def run(rounds, jit=None):
+    return run_source(HALF.replace("{rounds}", str(rounds)), jit=jit)
+
+
+def test_failed_guard_falls_back_to_the_interpreter():
+    jit = JIT(threshold=5, max_deopts=10)
+    vm = run(1, jit)
+    expected = run(1)
+    assert vm.variables == expected.variables
+    assert vm.variables["last"] == 3.5
+    # Compiled for int arguments; the float call failed the guard and ran interpreted
+    assert "type(v_x) is not int" in jit.sources["half"]
+    assert jit.stats.deopts >= 1
+    assert jit.stats.generic == 0
+
+
+def test_deopted_function_is_recounted_and_recompiled():
+    jit = JIT(threshold=5, max_deopts=10)
+    vm = run(3, jit)
+    assert vm.variables == run(3).variables
+    # Every round's float call deopts the int version, which becomes hot again
+    assert jit.stats.compiled == jit.stats.deopts == 3
+
+
+def test_repeated_deopts_compile_a_generic_version():
+    jit = JIT(threshold=5, max_deopts=2)
+    vm = run(6, jit)
+    assert vm.variables == run(6).variables
+    assert jit.stats.deopts == 2
+    assert jit.stats.generic == 1
+    assert "DEOPT" not in jit.sources["half"].split("\n", 2)[2]
+    # The generic version serves both argument types without falling back
+    assert "half" in {unit.name for unit in jit.natives}
@@ -0,0 +1,38 @@
+import sys
+import threading
+
+from hts.compiler import HTSCompiler
+from hts.ledger import Ledger, leaf_hash
+
+
+def test_concurrent_appends_keep_the_chain(tmp_path):
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        with Ledger(str(tmp_path), block_size=7) as ledger:
+            def work(thread):
+                for index in range(500):
+                    ledger.append(f"{thread}:{index}")
+                    if index % 50 == 0:
+                        ledger.seal()
+
+            threads = [threading.Thread(target=work, args=(thread,)) for thread in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            ledger.flush()
+            assert len(ledger) == ledger.sealed == 4000
+            assert ledger.verify()
+            assert all(ledger.locate(leaf_hash(f"{thread}:499".encode())) is not None for thread in range(8))
+    finally:
+        sys.setswitchinterval(interval)
+
+
+def test_close_closes_the_ledger():
+    compiler = HTSCompiler(quiet=True)
+    processor = compiler.blockchain_processor
+    processor.execute("transaction1")
+    ledger = processor.ledger
+    compiler.close()
+    assert ledger._writer is None and processor.ledger is None
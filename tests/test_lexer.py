@@ -0,0 +1,42 @@
+import io
+import random
+import tracemalloc
+
+import pytest
+
+from hts.lexer import tokenize
+
+PIECES = ["let", " ", "x1", "12", ".", "5", "3.25", "=", "==", "<", "<=", "-", "->", "/", "//", "note ", "\n",
+          "(", ")", ";", ",", "[", "]", "_a", "é", "\t", "!", "!="]
+
+
+@pytest.mark.parametrize("seed", range(20))
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64])
+def test_stream_matches_string(seed, chunk_size):
+    rng = random.Random(seed)
+    source = "".join(rng.choice(PIECES) for _ in range(400))
+    expected = list(tokenize(source))
+    assert list(tokenize(io.StringIO(source), chunk_size)) == expected
+    assert list(tokenize(io.BytesIO(source.encode()), chunk_size)) == expected
+
+
+@pytest.mark.parametrize("unit", ["let a = 1; ", "a+b*c-", "// a long comment without an end "])
+def test_long_line_memory_is_bounded(unit):
+    # Large enough that allocations of other threads stay in the noise
+    size = len(unit) * 100_000
+    stream = io.StringIO(unit * 100_000)
+    tracemalloc.start()
+    try:
+        for _ in tokenize(stream, 1 << 12):
+            pass
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert peak < size // 20, peak
+
+
+def test_stream_ending_inside_a_character_is_an_error():
+    source = "let café = 1;".encode()
+    assert [token.text for token in tokenize(io.BytesIO(source), 4)] == ["let", "café", "=", "1", ";"]
+    with pytest.raises(UnicodeDecodeError):
+        list(tokenize(io.BytesIO(source + "é".encode()[:1]), 4))
@@ -0,0 +1,67 @@
+import json
+import os
+
+from hts.logs import INFO, BackgroundWriter, Logger, Record, RotatingFileSink
+
+
+def records(count, start=0):
+    return [Record(0.0, INFO, "test", f"message {index:04}", {}) for index in range(start, start + count)]
+
+
+def messages(path):
+    with open(path) as handle:
+        return [json.loads(line)["message"] for line in handle]
+
+
+def test_files_roll_over_at_max_bytes(tmp_path):
+    path = str(tmp_path / "run.log")
+    line = len(json.dumps(records(1)[0].as_dict()) + "\n")
+    sink = RotatingFileSink(path, max_bytes=3 * line, backups=2)
+    sink.write(records(4))
+    sink.write(records(4, 4))
+    sink.close()
+    # Newest records in the live file, older ones shifted to .1 and .2
+    assert messages(path) == ["message 0006", "message 0007"]
+    assert messages(path + ".1") == ["message 0003", "message 0004", "message 0005"]
+    assert messages(path + ".2") == ["message 0000", "message 0001", "message 0002"]
+    assert all(os.path.getsize(name) <= 3 * line for name in (path, path + ".1", path + ".2"))
+
+
+def test_oldest_backup_is_discarded(tmp_path):
+    path = str(tmp_path / "run.log")
+    line = len(json.dumps(records(1)[0].as_dict()) + "\n")
+    sink = RotatingFileSink(path, max_bytes=line, backups=2)
+    sink.write(records(5))
+    sink.close()
+    assert messages(path) == ["message 0004"]
+    assert messages(path + ".1") == ["message 0003"]
+    assert messages(path + ".2") == ["message 0002"]
+    assert not os.path.exists(path + ".3")
+
+
+def test_reopened_file_continues_its_size(tmp_path):
+    path = str(tmp_path / "run.log")
+    line = len(json.dumps(records(1)[0].as_dict()) + "\n")
+    sink = RotatingFileSink(path, max_bytes=2 * line, backups=1)
+    sink.write(records(1))
+    sink.close()
+    sink = RotatingFileSink(path, max_bytes=2 * line, backups=1)
+    sink.write(records(2, 1))
+    sink.close()
+    assert messages(path + ".1") == ["message 0000", "message 0001"]
+    assert messages(path) == ["message 0002"]
+
+
+def test_logger_writes_through_a_rotating_file(tmp_path):
+    path = str(tmp_path / "run.log")
+    writer = BackgroundWriter(RotatingFileSink(path, max_bytes=1000, backups=3), batch_size=7)
+    logger = Logger("test", writers=[writer])
+    for index in range(100):
+        logger.info(f"message {index:04}", index=index)
+    writer.close()
+    written = []
+    for name in (path + ".3", path + ".2", path + ".1", path):
+        written.extend(messages(name))
+    # Only the records that fit in the live file and three backups remain, in order
+    assert written == [f"message {index:04}" for index in range(100 - len(written), 100)]
+    assert writer.written == 100 and writer.dropped == 0
@@ -0,0 +1,71 @@
+import random
+
+import pytest
+
+from hts.memory import SLAB_SIZE, Arena
+
+
+def test_freed_neighbours_coalesce_into_one_extent():
+    arena = Arena(1 << 20, use_mmap=False)
+    blocks = [arena.allocate(100_000) for _ in range(4)]
+    # Free the middle blocks out of order, then the outer ones
+    for handle in (blocks[2], blocks[1], blocks[3], blocks[0]):
+        arena.free(handle)
+    stats = arena.stats()
+    assert stats.free == stats.largest_free == arena.capacity
+    assert stats.external_fragmentation == 0
+    assert arena.allocate(arena.capacity) in arena
+
+
+def test_hole_is_reused_for_a_request_that_fits():
+    arena = Arena(1 << 20, use_mmap=False)
+    first, middle, last = (arena.allocate(4096) for _ in range(3))
+    offset = arena.address(middle)
+    arena.free(middle)
+    assert arena.address(arena.allocate(4000)) == offset
+    assert arena.address(first) < offset < arena.address(last)
+
+
+def test_small_blocks_share_slabs_and_empty_slabs_are_returned():
+    arena = Arena(1 << 20, use_mmap=False)
+    per_slab = SLAB_SIZE // 64
+    handles = [arena.allocate(50) for _ in range(3 * per_slab)]
+    assert arena.stats().slabs == 3
+    assert arena.stats().internal_fragmentation == pytest.approx(1 - 50 / 64)
+    for handle in handles:
+        arena.free(handle)
+    # The last slab of a size class is kept for the next request
+    stats = arena.stats()
+    assert (stats.slabs, stats.live, stats.allocated) == (1, 0, 0)
+    assert stats.free == arena.capacity - SLAB_SIZE
+
+
+def test_views_of_live_blocks_do_not_overlap():
+    arena = Arena(16 << 20)
+    rng = random.Random(4)
+    live = {}
+    for step in range(2000):
+        if live and rng.random() < 0.45:
+            handle = rng.choice(sorted(live))
+            assert bytes(arena.view(handle)) == live.pop(handle)
+            arena.free(handle)
+        else:
+            size = rng.choice([rng.randint(1, 2048), rng.randint(2049, 20_000)])
+            handle = arena.allocate(size)
+            data = bytes([step % 251]) * size
+            arena.view(handle)[:] = data
+            live[handle] = data
+    for handle, data in live.items():
+        assert bytes(arena.view(handle)) == data
+
+
+def test_double_free_and_exhaustion_are_errors():
+    arena = Arena(1 << 16, use_mmap=False)
+    handle = arena.allocate(10_000)
+    arena.free(handle)
+    with pytest.raises(ValueError, match="already freed"):
+        arena.free(handle)
+    with pytest.raises(MemoryError, match="arena exhausted"):
+        arena.allocate(1 << 17)
+    with pytest.raises(ValueError, match="must be positive"):
+        arena.allocate(0)
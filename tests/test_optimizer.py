@@ -0,0 +1,71 @@
+import pytest
+
+from hts.bytecode import compile_program
+from hts.compiler import HTSCompiler
+from hts.lexer import tokenize
+from hts.optimizer import FunctionEffects, PassManager
+from hts.parser import parse
+from hts.vm import VM, VMError
+
+
+def statements(source):
+    return list(parse(tokenize(source)))
+
+
+@pytest.mark.parametrize("source", [
+    "let a = 0; let x = 1 / a; x = 2;",
+    "let a = 0; let x = 7 % a; x = 2;",
+    "let a = 0; if 1 / a { }",
+])
+def test_division_by_zero_survives(source):
+    optimized = PassManager().run(statements(source))
+    with pytest.raises(VMError):
+        VM().run(compile_program(optimized))
+
+
+def test_nonzero_literal_divisor_is_removable():
+    optimized = PassManager().run(statements("fn f(a, b) { let x = b; x = a / 2; x = a / b; return x; }"))
+    assert [str(node) for node in optimized[0].body] == [
+        "Declared x of type None with value b", "Assigned x = a / b", "Returned x",
+    ]
+
+
+@pytest.mark.parametrize("source, expected", [
+    # f is defined in an earlier batch than the call
+    ("fn f() { x = 2; } let q = 1; let r = 1; let x = 5; f(); let y = x;", "value x"),
+    # g is defined in a later batch than the call
+    ("let x = 5; g(); let y = x; fn g() { x = 2; }", "value x"),
+    # f is known but calls g, defined in a later batch
+    ("fn f() { g(); } let q = 1; let r = 1; let x = 5; f(); let y = x; fn g() { x = 2; }", "value x"),
+])
+def test_stream_batches_see_other_functions(tmp_path, monkeypatch, source, expected):
+    from hts import pipeline
+    compile_file = pipeline.compile_file
+    monkeypatch.setattr(pipeline, "compile_file", lambda *args, **kwargs: compile_file(*args, batch_size=3, **kwargs))
+    path = tmp_path / "program.hts"
+    path.write_text(source)
+    lines = []
+
+    class Sink:
+        def write(self, text):
+            lines.append(text)
+
+    with HTSCompiler(quiet=True) as compiler:
+        compiler.compile_file(str(path), Sink())
+    declarations = [line for line in lines if line.startswith("Declare Variable: Declared y")]
+    assert declarations and declarations[0].endswith(expected)
+
+
+def test_call_in_item_assignment_kills_facts():
+    source = "let a = 1; let arr = [0, 0]; fn f() { a = 5; return 7; } arr[0] = f(); let b = a;"
+    vm = VM()
+    vm.run(compile_program(PassManager().run(statements(source))))
+    assert vm.variables["b"] == 5
+
+
+def test_index_is_not_reused_across_a_mutating_call():
+    effects = FunctionEffects(statements("fn bump(v) { v[0] = 9; return 0; }"), complete=False)
+    source = "let v = [1, 2]; let a = v[0] + 1; let z = bump(v); let b = v[0] + 1;"
+    optimized = PassManager().run(statements(source), effects)
+    assert str(optimized[-1]) != "Declared b of type None with value a"
+    assert "v[0]" in str(optimized[-1])
@@ -0,0 +1,51 @@
+from hts import parallel
+from hts.bytecode import compile_program
+from hts.lexer import tokenize
+from hts.parser import parse
+from hts.vm import VM
+
+SOURCE = """
+fn work(n) {
+    return n * {k};
+}
+let r = parallel_exec(work(2), work(3));
+"""
+
+
+def program(k):
+    return compile_program(parse(tokenize(SOURCE.replace("{k}", str(k)))))
+
+
+def cached_programs():
+    return len(parallel._programs)
+
+
+def test_program_is_shipped_only_to_workers_without_it(monkeypatch):
+    pool = parallel.get_pool()
+    sent = []
+    submit = pool.submit
+
+    def recording(func, *args, **kwargs):
+        if func is parallel._call:
+            sent.append(args[1] is not None)
+        return submit(func, *args, **kwargs)
+
+    monkeypatch.setattr(pool, "submit", recording)
+    code = program(7)
+    for _ in range(5):
+        vm = VM()
+        vm.run(code)
+        assert vm.variables["r"] == [14, 21]
+    assert sent.count(True) <= 2 * len(pool.nodes)
+    assert sent.count(False) == 10
+
+
+def test_program_caches_are_bounded():
+    for k in range(parallel.PROGRAM_CACHE + 4):
+        vm = VM()
+        vm.run(program(k))
+        assert vm.variables["r"] == [2 * k, 3 * k]
+    assert len(parallel._serialized) <= parallel.PROGRAM_CACHE
+    pool = parallel.get_pool()
+    for node in range(len(pool.nodes)):
+        assert pool.submit(cached_programs, node=node).result() <= parallel.PROGRAM_CACHE
@@ -0,0 +1,50 @@
+import pytest
+
+from hts.lexer import tokenize
+from hts.nodes import BinOp, Call, Index, Name, Num, UnaryOp
+from hts.parser import ParseError, parse
+
+
+def value(source):
+    (statement,) = parse(tokenize(f"let x = {source};"))
+    return statement.value
+
+
+def test_multiplication_binds_tighter_than_addition():
+    assert value("1 + 2 * 3 - 4 / 2") == BinOp(
+        "-", BinOp("+", Num(1), BinOp("*", Num(2), Num(3))), BinOp("/", Num(4), Num(2))
+    )
+
+
+def test_binary_operators_are_left_associative():
+    assert value("1 - 2 - 3") == BinOp("-", BinOp("-", Num(1), Num(2)), Num(3))
+    assert value("8 / 4 % 3") == BinOp("%", BinOp("/", Num(8), Num(4)), Num(3))
+
+
+def test_comparisons_bind_looser_than_arithmetic_and_equality_loosest():
+    assert value("a + 1 < b == c") == BinOp("==", BinOp("<", BinOp("+", Name("a"), Num(1)), Name("b")), Name("c"))
+
+
+def test_unary_and_postfix_bind_tightest():
+    assert value("-a * b") == BinOp("*", UnaryOp("-", Name("a")), Name("b"))
+    assert value("-f(1)[2]") == UnaryOp("-", Index(Call("f", (Num(1),)), Num(2)))
+
+
+def test_parentheses_override_precedence():
+    assert value("(1 + 2) * 3") == BinOp("*", BinOp("+", Num(1), Num(2)), Num(3))
+
+
+@pytest.mark.parametrize("source, message", [
+    ("let a = 1 +;", "line 1: unexpected ';' in expression"),
+    ("let b = (1;", r"line 1: expected '\)', got ';'"),
+    ("let c = 1a;", "line 1: invalid number '1a'"),
+    ("let d = x[1;", "line 1: expected ':', got ';'"),
+    ("\nmemory frob x;", "line 2: unknown memory operation 'frob'"),
+    ("let e: [int; 2] = [1, 2, 3];", r"line 1: \[int; 2\] array given 3 elements"),
+    ("let f: [str; 2] = [1, 2];", "unknown array element type 'str'"),
+    ("fn g(x) { return x;", "unterminated block"),
+    ("let h = ", "unexpected end of input"),
+])
+def test_errors(source, message):
+    with pytest.raises(ParseError, match=message):
+        list(parse(tokenize(source)))
@@ -0,0 +1,112 @@
+import numpy as np
+import pytest
+
+from hts.quantum import GATES, QuantumSimulator, Statevector, rx, rz
+
+
+def dense(matrix, qubit, count):
+    # Full operator of a single-qubit gate; qubit q is bit q of the basis index
+    factors = [matrix if q == qubit else np.eye(2) for q in reversed(range(count))]
+    result = np.eye(1)
+    for factor in factors:
+        result = np.kron(result, factor)
+    return result
+
+
+def dense_controlled(matrix, control, target, count):
+    result = np.zeros((1 << count, 1 << count), complex)
+    for column in range(1 << count):
+        if column >> control & 1:
+            bit = column >> target & 1
+            for out in (0, 1):
+                row = column & ~(1 << target) | out << target
+                result[row, column] += matrix[out, bit]
+        else:
+            result[column, column] = 1
+    return result
+
+
+@pytest.mark.parametrize("fuse", [True, False])
+def test_gates_match_dense_matrices(fuse):
+    rng = np.random.default_rng(5)
+    count = 4
+    register = Statevector(count, dtype=np.complex128, fuse=fuse)
+    expected = np.zeros(1 << count, complex)
+    expected[0] = 1
+    for _ in range(60):
+        kind = rng.integers(4)
+        first, second = (int(q) for q in rng.choice(count, 2, replace=False))
+        if kind == 0:
+            name = rng.choice(sorted(GATES))
+            register.apply(name, first)
+            expected = dense(GATES[name], first, count) @ expected
+        elif kind == 1:
+            matrix = rx(rng.random()) @ rz(rng.random())
+            register.apply(matrix, first)
+            expected = dense(matrix, first, count) @ expected
+        elif kind == 2:
+            register.cx(first, second)
+            expected = dense_controlled(GATES["x"], first, second, count) @ expected
+        else:
+            register.cz(first, second)
+            expected = dense_controlled(GATES["z"], first, second, count) @ expected
+    np.testing.assert_allclose(register.state, expected, atol=1e-9)
+
+
+def test_fusion_applies_fewer_kernels():
+    register = Statevector(1)
+    for name in ("h", "t", "h", "s"):
+        register.apply(name, 0)
+    register.flush()
+    assert (register.gates, register.kernels) == (4, 1)
+
+
+def test_swap_exchanges_qubits():
+    register = Statevector(3, dtype=np.complex128)
+    register.apply("x", 0)
+    register.swap(0, 2)
+    assert register.probabilities()[0b100] == pytest.approx(1)
+
+
+def test_bell_pair_measurements_agree():
+    for seed in range(20):
+        register = Statevector(2, seed=seed)
+        register.apply("h", 0)
+        register.cx(0, 1)
+        assert register.probability(1) == pytest.approx(0.5, abs=1e-6)
+        first = register.measure(0)
+        # The state collapsed: the other qubit is now certain
+        assert register.probability(1) == pytest.approx(first, abs=1e-6)
+        assert register.measure(1) == first
+        assert np.sum(register.probabilities()) == pytest.approx(1, abs=1e-6)
+
+
+def test_sample_does_not_collapse():
+    register = Statevector(2, seed=0)
+    register.apply("h", 0)
+    register.cx(0, 1)
+    counts = register.sample(2000)
+    assert set(counts) == {"00", "11"}
+    assert sum(counts.values()) == 2000
+    assert 800 < counts["00"] < 1200
+    assert register.probability(0) == pytest.approx(0.5, abs=1e-6)
+
+
+def test_invalid_qubits_are_rejected():
+    register = Statevector(2)
+    with pytest.raises(ValueError, match="out of range"):
+        register.apply("x", 2)
+    with pytest.raises(ValueError, match="distinct"):
+        register.cx(1, 1)
+
+
+def test_simulator_allocates_named_qubits_and_resets():
+    simulator = QuantumSimulator(seed=1)
+    simulator.execute("a", "X")
+    simulator.execute("b", "h")
+    assert simulator.qubits == {"a": 0, "b": 1}
+    assert simulator.execute("a", "measure") == 1
+    simulator.execute("a", "reset")
+    assert simulator.execute("a", "measure") == 0
+    with pytest.raises(ValueError, match="unknown quantum operation 'spin'"):
+        simulator.execute("a", "spin")
@@ -0,0 +1,63 @@
+import asyncio
+import queue
+import threading
+
+import pytest
+
+from hts.scheduler import TaskScheduler
+
+
+def test_full_scheduler_rejects_or_times_out():
+    release = threading.Event()
+    with TaskScheduler(max_workers=2, max_pending=2) as scheduler:
+        futures = [scheduler.submit(release.wait) for _ in range(2)]
+        with pytest.raises(queue.Full):
+            scheduler.submit(release.wait, block=False)
+        with pytest.raises(queue.Full):
+            scheduler.submit(release.wait, timeout=0.05)
+        assert scheduler.stats.blocked == 2
+        assert scheduler.stats.submitted == 2
+        release.set()
+        assert all(future.result(5) for future in futures)
+        assert scheduler.submit(len, "abc").result(5) == 3
+    assert scheduler.stats.max_in_flight == 2
+    assert scheduler.stats.completed == 3
+
+
+def test_blocked_submit_resumes_when_a_slot_frees():
+    release = threading.Event()
+    submitted = threading.Event()
+    with TaskScheduler(max_workers=1, max_pending=1) as scheduler:
+        first = scheduler.submit(release.wait)
+
+        def submit():
+            scheduler.submit(len, "ab")
+            submitted.set()
+
+        thread = threading.Thread(target=submit)
+        thread.start()
+        # The second submit waits for the first task
+        assert not submitted.wait(0.1)
+        release.set()
+        assert submitted.wait(5)
+        thread.join()
+        assert first.result(5)
+    assert scheduler.stats.blocked == 1
+    assert scheduler.stats.max_in_flight == 1
+
+
+def test_async_tasks_share_the_slots():
+    release = threading.Event()
+
+    async def wait():
+        while not release.is_set():
+            await asyncio.sleep(0.01)
+        return "done"
+
+    with TaskScheduler(max_workers=1, max_pending=1) as scheduler:
+        future = scheduler.submit_async(wait)
+        with pytest.raises(queue.Full):
+            scheduler.submit(len, "a", block=False)
+        release.set()
+        assert future.result(5) == "done"
+        assert scheduler.submit(len, "a").result(5) == 1
@@ -0,0 +1,6 @@
+from benchmarks import startup
+
+
+def test_import_budgets():
+    # Fails if an entry point imports a forbidden module or exceeds its budget
+    assert startup.main(["--check", "--repeat", "3"]) == 0